@@ -7,12 +7,22 @@ Read lines, find first digit and last digit, combine to a number, and total. See
 test.dat for sample data and calibrate.dat for full data.
 
 For part 2, a digit may be spelled out, except for 'zero'. The tricky part was
-that you could have overlap, like "eighthree" should be 83, so had to use regex lookahead.
+that you could have overlap, like "eighthree" should be 83. Rather than regex
+lookahead over the whole line, an Aho-Corasick automaton of the digits and digit
+words scans forward to the first match and another of the reversed words scans
+back from the end to the last. The same scan gives both parts at once when
+both are wanted; part 1 on its own only looks for digit characters.
 
 Author: Tim Behrendsen
 """
 
-import re
+import os
+import sys
+import mmap
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, stream
 
 fn = 'calibrate.dat'
 
@@ -28,22 +38,243 @@ tran = {
     'nine': '9'
 }
 
+digits = '0123456789'
+
+#
+# Aho-Corasick automaton matching any of a set of words. A state stands for
+# the longest end of the text so far that starts one of the words, and 'goto'
+# is filled in for every character used by the words, so each character scanned
+# is a single dict lookup (characters in no word go back to the start). 'out'
+# is the value of the word ending at a state, or None.
+#
+class Automaton:
+    def __init__(self, words):
+        self.goto = [ { } ]
+        self.out = [ None ]
+        for word, value in words.items():
+            state = 0
+            for c in word:
+                if c not in self.goto[state]:
+                    self.goto[state][c] = len(self.goto)
+                    self.goto.append({ })
+                    self.out.append(None)
+                state = self.goto[state][c]
+            self.out[state] = value
+
+        # Breadth first, so the failure state (longest proper suffix that is
+        # also a state) of each state has all its moves filled in before it's used
+        alphabet = set(''.join(words))
+        fail = [0] * len(self.goto)
+        q = deque(self.goto[0].values())
+        while q:
+            state = q.popleft()
+            fail_goto = self.goto[fail[state]]
+            for c in alphabet:
+                next_state = self.goto[state].get(c)
+                if next_state == None:
+                    self.goto[state][c] = fail_goto.get(c, 0)
+                else:
+                    fail[next_state] = fail_goto.get(c, 0)
+                    if self.out[next_state] == None:
+                        self.out[next_state] = self.out[fail[next_state]]
+                    q.append(next_state)
+
+    def __repr__(self):
+        return f"Automaton({len(self.goto)} states)"
+
+    #
+    # Scan characters up to the first match. Returns the value of the first
+    # digit character, and of the first digit or word, stopping as soon as both
+    # are known. If need_digit is False, stops at the first match of any kind.
+    # None of the words appear inside another, so the first match to end is
+    # also the first to start, which keeps overlaps like "eighthree" right.
+    #
+    def scan(self, chars, need_digit = True):
+        goto, out = self.goto, self.out
+        state = 0
+        first = None
+        for c in chars:
+            state = goto[state].get(c, 0)
+            value = out[state]
+            if value != None:
+                if first == None:
+                    first = value
+                    if not need_digit:
+                        return None, first
+                if c in digits:
+                    return value, first
+
+        return None, first
+
+# Digits and digit words, forwards to find the first, and reversed to scan
+# back from the end of the line for the last
+words = { **{ c: int(c) for c in digits }, **{ word: int(n) for word, n in tran.items() } }
+forward = Automaton(words)
+backward = Automaton({ word[::-1]: n for word, n in words.items() })
+
+# Value of the first digit character, or None if there isn't one
+def get_digit(chars):
+    for c in chars:
+        if c in digits:
+            return int(c)
+    return None
+
+#
+# Running calibration total, adding one line at a time (see aoc/stream.py).
+# Each line is scanned from the front up to its first digit, and from the back
+# up to its last. With no part given, both parts are scanned for at once and
+# result() is the totals of both.
+#
+class Calibration:
+    def __init__(self, part = None):
+        self.part = part
+        self.totals = [0, 0]
+        self.num_lines = 0
+
+    def __repr__(self):
+        return f"Calibration(part {self.part}: {self.totals} from {self.num_lines} lines)"
+
+    def add(self, line):
+        self.num_lines += 1
+        if self.part == 1:
+            # Digits only, so no need for the automaton
+            self.totals[0] += get_digit(line) * 10 + get_digit(reversed(line))
+            return
+
+        need_digit = self.part != 2
+        first1, first2 = forward.scan(line, need_digit)
+        last1, last2 = backward.scan(reversed(line), need_digit)
+        if need_digit:
+            self.totals[0] += first1 * 10 + last1
+        self.totals[1] += first2 * 10 + last2
+
+    def result(self):
+        return self.totals if self.part == None else self.totals[self.part-1]
+
 def get_total(lines, part):
+    calibration = Calibration(part)
+    with instrument.phase('scan'):
+        for line in lines:
+            calibration.add(line)
+
+    instrument.count('lines scanned', calibration.num_lines)
+    return calibration.result()
+
+#
+# Part 1 total of a whole file without a Python loop over the lines, for very
+# large inputs. The file is memory mapped and taken a block of whole lines at
+# a time. In each block, NumPy byte masks find the digits and newlines, and
+# minimum/maximum.reduceat over the digit positions of each line give its first
+# and last digit. Empty lines are skipped, as when streaming.
+#
+BLOCK_SIZE = 1 << 22
+
+def get_block_total(np, block):
+    size = len(block)
+    is_digit = (block - ord('0')) < 10              # Bytes below '0' wrap around
+    newlines = np.flatnonzero(block == ord('\n'))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.append(newlines, size)
+    starts = starts[starts < ends]
+    if len(starts) == 0:
+        return 0, 0
+
+    pos = np.arange(size, dtype=np.int32)
+    first = np.minimum.reduceat(np.where(is_digit, pos, size), starts)
+    last = np.maximum.reduceat(np.where(is_digit, pos, -1), starts)
+    if (last < 0).any():
+        raise Exception("Line with no digit")
+
+    values = (block[first] - ord('0')).astype(np.int64) * 10 + (block[last] - ord('0'))
+    return int(values.sum()), len(starts)
+
+#
+# Memory map a file for reading, or None if it's empty (which can't be mapped)
+#
+def map_file(path):
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+#
+# Split bytes start..end of a buffer into blocks of whole lines, each ending
+# after its last newline, or the first one past block_size for a line longer
+# than a block. 'start' should be the start of a line.
+#
+def iter_blocks(buf, start, end, block_size = BLOCK_SIZE):
+    while start < end:
+        block_end = end
+        if start + block_size < end:
+            block_end = buf.rfind(b'\n', start, start + block_size) + 1
+            if block_end <= start:
+                block_end = buf.find(b'\n', start + block_size, end) + 1 or end
+
+        yield start, block_end
+        start = block_end
+
+def get_total_mapped(path, block_size = BLOCK_SIZE):
+    import numpy as np
+
+    buf = map_file(path)
+    if buf == None:
+        return 0
+
     total = 0
-    for line in lines:
-        if part == 1:
-            matches = re.findall(r'\d', line)
-            first = matches[0]
-            last = matches[-1]
-        else:
-            matches = re.findall(r'(?=(\d|one|two|three|four|five|six|seven|eight|nine))', line)
-            first = tran.get(matches[0], matches[0])
-            last = tran.get(matches[-1], matches[-1])
-
-        total += int(first + last)
+    num_lines = 0
+    num_blocks = 0
+    with instrument.phase('scan'):
+        for start, end in iter_blocks(buf, 0, len(buf), block_size):
+            block_total, block_lines = get_block_total(np, np.frombuffer(buf, dtype=np.uint8, count=end-start, offset=start))
+            total += block_total
+            num_lines += block_lines
+            num_blocks += 1
 
+    instrument.count('lines scanned', num_lines)
+    instrument.count('blocks mapped', num_blocks)
     return total
 
-lines = [ line.strip() for line in open(fn, 'r') ]
-print(f"Part 1 is {get_total(lines, part=1)}")
-print(f"Part 2 is {get_total(lines, part=2)}")
+#
+# Totals of both parts for the lines in bytes start..end of a file. Runs in a
+# worker process for get_totals_parallel().
+#
+def get_range_totals(path, start, end):
+    calibration = Calibration()
+    buf = map_file(path)
+    for block_start, block_end in iter_blocks(buf, start, end):
+        for line in buf[block_start:block_end].decode('ascii').split('\n'):
+            line = line.rstrip('\r')
+            if line:
+                calibration.add(line)
+    return calibration.result()
+
+#
+# Totals of both parts for a whole file, with the lines split into byte ranges
+# that are scored in a pool of 'jobs' worker processes (defaults to the CPU
+# count). The last file's totals are kept, so asking for the other part of the
+# same file doesn't do it all again.
+#
+last_parallel = (None, None)
+
+def get_totals_parallel(path, jobs = None):
+    global last_parallel
+    from aoc import parallel
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if last_parallel[0] == key:
+        return last_parallel[1]
+
+    with instrument.phase('scan'):
+        results = parallel.map_file_ranges(__file__, 'get_range_totals', path, jobs)
+    totals = [ sum(result[0] for result in results), sum(result[1] for result in results) ]
+    instrument.count('ranges scored', len(results))
+
+    last_parallel = (key, totals)
+    return totals
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total1, total2 = stream.fold(Calibration(), stream.iter_records(file))
+    print(f"Part 1 is {total1}")
+    print(f"Part 2 is {total2}")
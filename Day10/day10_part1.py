@@ -5,17 +5,21 @@ https://adventofcode.com/2023/day/10
 
 Given a series of pipes on a map and starting position, figure out what pipes
 form a loop and return the furthest distance from the start. The starting position
-is an unknown type of pipe. This implementation uses Dijkstra's Algorithm to figure
-the distances.
+is an unknown type of pipe. This implementation uses a breadth-first search (Dijkstra's
+Algorithm with every step costing 1) to figure the distances.
 
 See test1.dat, test2.dat and test3.dat for sample data and pipes.dat for full data.
 
 Author: Tim Behrendsen
 """
 
-import re
+import os
 import sys
-import heapq
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, paths
+from aoc.grid import Grid, DIRS, N, E, S, W
+from aoc.paths import INF
 
 fn = 'test1.dat'
 fn = 'test2.dat'
@@ -23,204 +27,96 @@ fn = 'test3.dat'
 fn = 'pipes.dat'
 
 #
-# Class to hold position on map with a pipe
+# Directions each type of pipe connects
 #
-class Node:
-    def __init__(self, row, col, type):
-        self.row = row
-        self.col = col
-        self.type = type
-
-        # Visited flag and tentative distance for Dijkstra
-        self.visited = False
-        self.tent_dist = 0
-
-        # Routes to other nodes
-        self.routes = []
-
-    def __repr__(self):
-        dist = "inf" if self.tent_dist == sys.maxsize else self.tent_dist
-        return f"[{self.row}, {self.col}: {self.type}, dist={dist}]"
-
-    def __lt__(self, other):
-        return self.tent_dist < other.tent_dist
+#     | is a vertical pipe connecting north and south.
+#     - is a horizontal pipe connecting east and west.
+#     L is a 90-degree bend connecting north and east.
+#     J is a 90-degree bend connecting north and west.
+#     7 is a 90-degree bend connecting south and west.
+#     F is a 90-degree bend connecting south and east.
+#     . is ground; there is no pipe in this tile.
+#     S is starting position
+#
+pipe_dirs = {
+    ord('|'): [ N, S ],
+    ord('-'): [ W, E ],
+    ord('L'): [ N, E ],
+    ord('J'): [ N, W ],
+    ord('7'): [ S, W ],
+    ord('F'): [ S, E ],
+}
+ground = ord('.')
 
 #
-# Class to map of pipes and map processing
+# Class to map of pipes and map processing. Positions on the map are grid indexes.
 #
 class PipeMap:
-    def __init__(self, pipe_map):
-        self.pipe_map = pipe_map
-        self.start_row = 0
-        self.start_col = 0
+    def __init__(self, grid):
+        self.grid = grid
+        self.start = grid.find('S')
+        self.start_row, self.start_col = grid.coords(self.start)
+        self.start_routes = []
+
+        # Distance of each grid index from the start, INF if not reached
+        self.dist = []
 
     def dump_map(self):
-        for pipe_row in self.pipe_map:
-            for node in pipe_row:
-                print(node, end='')
-            print("")
+        print(self.grid)
 
     def dump_dist(self):
-        for pipe_row in self.pipe_map:
-            for node in pipe_row:
-                if node.tent_dist == sys.maxsize:
-                    dist = 'I'
-                elif node.tent_dist < 10:
-                    dist = node.tent_dist
-                elif node.tent_dist > 10 and node.tent_dist < 36:
-                    dist = chr(ord('A') + node.tent_dist - 10)
-                else:
-                    dist = '#'
-                print(dist, end='')
+        for row in range(self.grid.rows):
+            for col in range(self.grid.cols):
+                d = self.dist[self.grid.index(row, col)]
+                if d == INF:
+                    d = 'I'
+                elif d > 10 and d < 36:
+                    d = chr(ord('A') + d - 10)
+                elif d >= 10:
+                    d = '#'
+                print(d, end='')
             print("")
 
-    # Build routes based on character values at each node and form a graph
-    # of the nodes. First parameter is the direction to search from the
-    # starting position.
     #
-    #     | is a vertical pipe connecting north and south.
-    #     - is a horizontal pipe connecting east and west.
-    #     L is a 90-degree bend connecting north and east.
-    #     J is a 90-degree bend connecting north and west.
-    #     7 is a 90-degree bend connecting south and west.
-    #     F is a 90-degree bend connecting south and east.
-    #     . is ground; there is no pipe in this tile.
-    #     S is starting position
+    # Build routes from the starting position, which is an unknown type of
+    # pipe. Parameter is the direction to search from the starting position.
     #
     def build_routes(self, start_dir):
-        max_row = len(self.pipe_map)-1
-        max_col = len(self.pipe_map[0])-1
-
-        for pipe_row in self.pipe_map:
-            for node in pipe_row:
-                row = node.row
-                col = node.col
-                type = node.type
-                node.routes = []
-                if type == '|':
-                    if row > 0:
-                        node.routes.append(self.pipe_map[row-1][col])
-                    if row < max_row:
-                        node.routes.append(self.pipe_map[row+1][col])
-
-                elif type == '-':
-                    if col > 0:
-                        node.routes.append(self.pipe_map[row][col-1])
-                    if col < max_col:
-                        node.routes.append(self.pipe_map[row][col+1])
-
-                elif type == 'L':
-                    if row > 0:
-                        node.routes.append(self.pipe_map[row-1][col])
-                    if col < max_col:
-                        node.routes.append(self.pipe_map[row][col+1])
-
-                elif type == 'J':
-                    if row > 0:
-                        node.routes.append(self.pipe_map[row-1][col])
-                    if col > 0:
-                        node.routes.append(self.pipe_map[row][col-1])
-
-                elif type == '7':
-                    if row < max_row:
-                        node.routes.append(self.pipe_map[row+1][col])
-                    if col > 0:
-                        node.routes.append(self.pipe_map[row][col-1])
-
-                elif type == 'F':
-                    if row < max_row:
-                        node.routes.append(self.pipe_map[row+1][col])
-                    if col < max_col:
-                        node.routes.append(self.pipe_map[row][col+1])
-
-                elif type == '.':
-                    pass
-
-                elif type == 'S':
-                    self.start_row = row
-                    self.start_col = col
-
-                    # Starting position potentially can go four routes
-                    if start_dir == 'N' and row > 0:
-                        if self.pipe_map[row-1][col].type != '.':
-                            node.routes.append(self.pipe_map[row-1][col])
-                    if start_dir == 'S' and row < max_row:
-                        if self.pipe_map[row+1][col].type != '.':
-                            node.routes.append(self.pipe_map[row+1][col])
-                    if start_dir == 'W' and col > 0:
-                        if self.pipe_map[row][col-1].type != '.':
-                            node.routes.append(self.pipe_map[row][col-1])
-                    if start_dir == 'E' and col < max_col:
-                        if self.pipe_map[row][col+1].type != '.':
-                            node.routes.append(self.pipe_map[row][col+1])
+        idx = self.grid.move(self.start, DIRS[start_dir])
+        if idx != None and self.grid.buf[idx] != ground:
+            self.start_routes = [ idx ]
+        else:
+            self.start_routes = []
 
     #
-    # Search route using Dijkstra's Algorithm.
+    # Routes to other positions, based on the pipe character at a position
     #
-    def search_routes(self):
-        cur_row = self.start_row
-        cur_col = self.start_col
-
-        # Initialize tentative distances for the nodes
-        for pipe_row in self.pipe_map:
-            for node in pipe_row:
-                node.visited = False
-                node.tent_dist = sys.maxsize
+    def get_routes(self, idx):
+        if idx == self.start:
+            return self.start_routes
 
-        start_node = self.pipe_map[self.start_row][self.start_col]
-        start_node.tent_dist = 0
+        routes = []
+        for d in pipe_dirs.get(self.grid.buf[idx], []):
+            next_idx = self.grid.move(idx, d)
+            if next_idx != None:
+                routes.append(next_idx)
+        return routes
 
-        # Unvisited set, which will be a priority queue
-        unv_set = [ start_node ]
-
-        while unv_set:
-            cur_node = heapq.heappop(unv_set)
-
-            # Mark distances of neighbor nodes
-            new_dist = cur_node.tent_dist + 1
-            for node in cur_node.routes:
-                if not node.visited:
-                    if new_dist < node.tent_dist:
-                        # If first examination of node, add to priority queue
-                        if node.tent_dist == sys.maxsize:
-                            heapq.heappush(unv_set, node)
-
-                        node.tent_dist = new_dist
-
-            cur_node.visited = True
+    #
+    # Search routes breadth first, returning the greatest distance
+    #
+    def search_routes(self):
+        with instrument.phase('search'):
+            self.dist = dist = paths.bfs(self.grid.size, [ (self.start, 0) ], self.get_routes)
 
         # Find greatest distance
-        dist = 0
-        for pipe_row in self.pipe_map:
-            for node in pipe_row:
-                if (node.tent_dist != sys.maxsize):
-                    dist = max(dist, node.tent_dist)
-
-        return dist
-
+        return max(d for d in dist if d != INF)
 
 #
 # Main processing. Returns furthest distance.
 #
-def main():
-    # Read the map of pipes
-    build_map = []
-    total = 0
-    with open(fn, 'r') as file:
-        row = 0
-        for line in file:
-            pipe_row = []
-            line = line.rstrip('\n')
-            col = 0
-            for c in line:
-                node = Node(row, col, c)
-                pipe_row.append(node)
-                col += 1
-
-            build_map.append(pipe_row)
-            row += 1
-
-    pipe_map = PipeMap(build_map)
+def main(grid):
+    pipe_map = PipeMap(grid)
 
     # Try each direction. The loop should have two of the same direction and the distance will
     # be all the way around. So our furthest distance is (dist + 1)/2.
@@ -238,5 +134,6 @@ def main():
 
     return real_dist
 
-dist = main()
-print(f"Longest distance is {dist}")
+if __name__ == '__main__':
+    dist = main(Grid.from_file(fn))
+    print(f"Longest distance is {dist}")
@@ -16,16 +16,22 @@ Author: Tim Behrendsen
 fn = 'test.dat'
 fn = 'image.dat'
 
+import os
+import sys
 from types import SimpleNamespace as Galaxy
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 # Main processing. Return total of distances between pairs of galaxies
-def calc(adj_factor):
+def calc(lines, adj_factor):
     # Read the map of galaxies
     galaxies = []
-    for row, line in enumerate(line.rstrip() for line in open(fn, 'r')):
-        for col, c in enumerate(line):
-            if c == '#':
-                galaxies.append(Galaxy(row=row, col=col))
+    with instrument.phase('parse'):
+        for row, line in enumerate(line.rstrip() for line in lines):
+            for col, c in enumerate(line):
+                if c == '#':
+                    galaxies.append(Galaxy(row=row, col=col))
 
     row_set = set(g.row for g in galaxies)
     col_set = set(g.col for g in galaxies)
@@ -54,18 +60,23 @@ def calc(adj_factor):
 
     # Calculate taxi distance between each pair of galaxies and total
     total = 0
-    for idx1 in range(len(galaxies)):
-        node1 = galaxies[idx1]
-        start_row, start_col = node1.row, node1.col
-        for idx2 in range(idx1+1, len(galaxies)):
-            node2 = galaxies[idx2]
-            end_row, end_col = node2.row, node2.col
-            total += abs(end_row - start_row) + abs(end_col - start_col)
-
+    with instrument.phase('distances'):
+        for idx1 in range(len(galaxies)):
+            node1 = galaxies[idx1]
+            start_row, start_col = node1.row, node1.col
+            for idx2 in range(idx1+1, len(galaxies)):
+                node2 = galaxies[idx2]
+                end_row, end_col = node2.row, node2.col
+                total += abs(end_row - start_row) + abs(end_col - start_col)
+
+    instrument.count('galaxy pairs', len(galaxies) * (len(galaxies)-1) // 2)
     return total
 
-# Part 1 adjusts by 2
-print(f"Total distance is {calc(2)}")
+if __name__ == '__main__':
+    lines = [ line.rstrip() for line in open(fn, 'r') ]
+
+    # Part 1 adjusts by 2
+    print(f"Total distance is {calc(lines, 2)}")
 
-# Part 2 adjusts by 1M
-print(f"Total distance is {calc(1_000_000)}")
+    # Part 2 adjusts by 1M
+    print(f"Total distance is {calc(lines, 1_000_000)}")
@@ -14,6 +14,12 @@ See test.dat for sample data and image.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, stream
+
 fn = 'test.dat'
 fn = 'records.dat'
 
@@ -59,12 +65,33 @@ def calc_combos(s):
     a = s.split(' ')
     springs = a[0]
     counts = list(map(int, a[1].split(',')))
+    instrument.count('patterns checked', 1 << springs.count('?'))
     return do_combos(bytearray(springs, encoding='ascii'), counts)
 
+#
+# Running total of combinations, adding one record (line) at a time (see
+# aoc/stream.py)
+#
+class Arrangements:
+    def __init__(self):
+        self.total = 0
+
+    def __repr__(self):
+        return f"Arrangements({self.total})"
+
+    def add(self, line):
+        self.total += calc_combos(line.rstrip())
+
+    def result(self):
+        return self.total
+
 # Main processing. Return total number of pattern matches.
-def main():
+def main(file):
     # Read each spring map, calculate combos and total them up
-    return sum(calc_combos(line.rstrip()) for line in open(fn, 'r'))
+    with instrument.phase('search'):
+        return stream.fold(Arrangements(), file)
 
-total = main()
-print(f"Total combinations is {total}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total = main(file)
+    print(f"Total combinations is {total}")
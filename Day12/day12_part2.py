@@ -16,6 +16,12 @@ See test.dat for sample data and image.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, stream
+
 fn = 'test.dat'
 fn = 'records.dat'
 
@@ -138,18 +144,44 @@ def calc_combos(springs, counts):
     # Reset the cache
     global cache
     cache = {}
-    return do_combos(bytearray(springs, encoding='ascii'), counts)
+    total = do_combos(bytearray(springs, encoding='ascii'), counts)
+
+    # Counted once per record, nothing is counted inside the recursion
+    instrument.count('memo entries', len(cache))
+    return total
+
+# Unfold a record line into the springs pattern and counts, repeated five times
+def get_params(line):
+    a = line.split(' ')
+    springs = a[0] + '?' + a[0] + '?' + a[0] + '?' + a[0] + '?' + a[0]
+    counts = list(map(int, a[1].split(',')))
+    counts = counts + counts + counts + counts + counts
+    return springs, counts
+
+#
+# Running total of combinations, adding one record (line) at a time (see
+# aoc/stream.py). The memo cache is reset for each record, so memory stays
+# bounded.
+#
+class Arrangements:
+    def __init__(self):
+        self.total = 0
+
+    def __repr__(self):
+        return f"Arrangements({self.total})"
+
+    def add(self, line):
+        self.total += calc_combos(*get_params(line.rstrip()))
+
+    def result(self):
+        return self.total
 
 # Main processing. Return total number of pattern matches.
-def main():
-    def get_params(line):
-        a = line.split(' ')
-        springs = a[0] + '?' + a[0] + '?' + a[0] + '?' + a[0] + '?' + a[0]
-        counts = list(map(int, a[1].split(',')))
-        counts = counts + counts + counts + counts + counts
-        return springs, counts
-
-    return sum(calc_combos(s, c) for s, c in (get_params(line.rstrip()) for line in open(fn, 'r')))
-
-total = main()
-print(f"Total combinations is {total}")
+def main(file):
+    with instrument.phase('search'):
+        return stream.fold(Arrangements(), file)
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total = main(file)
+    print(f"Total combinations is {total}")
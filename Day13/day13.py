@@ -14,14 +14,16 @@ See test.dat for sample data and image.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+from aoc.grid import Grid
+
 fn = 'test.dat'
 fn = 'maps.dat'
 
-# Given a list of strings, rotate char grid 90 degrees
-def rotate_map(cur_map):
-    # Python trickery for rotating a list of strings
-    return [''.join(row) for row in zip(*cur_map[::-1])]
-
 # Check for a vertical reflection among lines
 def check_ref1(cur_map):
     # Test each number as a mid-point
@@ -80,36 +82,43 @@ def check_ref2(cur_map):
 
     return None
 
-# Open file and read each map one at a time
-def get_next_map():
+# Read each map one at a time
+def get_next_map(lines):
     cur_map = []
-    for line in (line.strip() for line in open(fn, 'r')):
+    for line in (line.strip() for line in lines):
         if line == '':
-            yield cur_map
+            if cur_map:
+                yield Grid.from_lines(cur_map)
             cur_map = []
         else:
             cur_map.append(line)
     if cur_map:
-        yield cur_map
+        yield Grid.from_lines(cur_map)
 
 # Main processing. Read maps and calculate answer.
-def main(part):
+def main(lines, part):
     # Figure out any row / column reflections and calculate summary answer
     check_ref = check_ref1 if part == 1 else check_ref2
     total = 0
-    for cur_map in get_next_map():
-        # First check row reflection
-        row = check_ref(cur_map)
-        if row != None:
-            total += 100 * (row + 1)
-
-        # Second check column reflection
-        flipped_map = rotate_map(cur_map)
-        col = check_ref(flipped_map)
-        if col != None:
-            total += (col + 1)
-
+    num_maps = 0
+    with instrument.phase('reflect'):
+        for cur_map in get_next_map(lines):
+            # First check row reflection
+            row = check_ref(cur_map.get_rows())
+            if row != None:
+                total += 100 * (row + 1)
+
+            # Second check column reflection
+            flipped_map = cur_map.transpose()
+            col = check_ref(flipped_map.get_rows())
+            if col != None:
+                total += (col + 1)
+            num_maps += 1
+
+    instrument.count('maps checked', num_maps)
     return total
 
-print(f"Total summary number is {main(1)}")
-print(f"Total summary number is {main(2)}")
+if __name__ == '__main__':
+    lines = [ line.strip() for line in open(fn, 'r') ]
+    print(f"Total summary number is {main(lines, 1)}")
+    print(f"Total summary number is {main(lines, 2)}")
@@ -11,9 +11,14 @@ See test.dat for sample data and platform.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+from aoc.grid import Grid
+
 fn = 'test.dat'
 fn = 'platform.dat'
 
@@ -21,46 +26,49 @@ round_rock = ord('O')
 square_rock = ord('#')
 space = ord('.')
 
-def roll_north(platform):
-    num_rows = len(platform)
-    num_cols = len(platform[0])
+#
+# Roll the round rocks along each lane of grid indexes, toward the start of
+# the lane. Rocks stop at a square rock or the first free space.
+#
+def roll(platform, lanes):
+    buf = platform.buf
+    moved = 0
+    for lane in lanes:
+        free = 0
+        for n, idx in enumerate(lane):
+            c = buf[idx]
+            if c == square_rock:
+                free = n + 1
+            elif c == round_rock:
+                if free != n:
+                    buf[idx] = space
+                    buf[lane[free]] = round_rock
+                    moved += 1
+                free += 1
+
+    instrument.count('rocks moved', moved)
 
-    for col in range(0, num_cols):
-        for row in range(1, num_rows):
-            if platform[row][col] == round_rock:
-                for chk_row in range(row-1, -2, -1):
-                    if chk_row < 0 or platform[chk_row][col] != space:
-                        platform[row][col] = space
-                        platform[chk_row+1][col] = round_rock
-                        break
+def north_lanes(platform):
+    return [ range(col, platform.size, platform.stride) for col in range(platform.cols) ]
 
 def calc_north_load(platform):
-    num_rows = len(platform)
-    num_cols = len(platform[0])
+    num_rows = platform.rows
     total_load = 0
     for row in range(num_rows):
-        for col in range(num_cols):
-            if (platform[row][col] == round_rock):
-                total_load += (num_rows - row)
+        total_load += platform.get_row(row).count(round_rock) * (num_rows - row)
 
     return total_load
 
 #
-# Main processing. Read rock map and calculate answer.
+# Main processing. Roll rock map and calculate answer.
 #
-def main():
-    # Read in the grid of rocks
-    total = 0
-    with open(fn, 'r') as file:
-        platform = []
-        for line in file:
-            line = line.rstrip('\n')
-            platform.append(bytearray(line, encoding='ascii'))
-
-    roll_north(platform)
+def main(platform):
+    with instrument.phase('roll'):
+        roll(platform, north_lanes(platform))
     load = calc_north_load(platform)
 
     return load
 
-load = main()
-print(f"Total load number is {load}")
+if __name__ == '__main__':
+    load = main(Grid.from_file(fn))
+    print(f"Total load number is {load}")
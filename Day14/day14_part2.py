@@ -15,9 +15,14 @@ See test.dat for sample data and platform.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+from aoc.grid import Grid
+
 fn = 'test.dat'
 fn = 'platform.dat'
 
@@ -26,103 +31,76 @@ square_rock = ord('#')
 space = ord('.')
 
 def print_plat(platform):
-    for line in platform:
-        print(line)
-
-def roll_north(platform):
-    num_rows = len(platform)
-    num_cols = len(platform[0])
-
-    for col in range(0, num_cols):
-        for row in range(1, num_rows):
-            if platform[row][col] == round_rock:
-                for chk_row in range(row-1, -2, -1):
-                    if chk_row < 0 or platform[chk_row][col] != space:
-                        platform[row][col] = space
-                        platform[chk_row+1][col] = round_rock
-                        break
-
-def roll_south(platform):
-    num_rows = len(platform)
-    num_cols = len(platform[0])
-
-    for col in range(0, num_cols):
-        for row in range(num_rows-2, -1, -1):
-            if platform[row][col] == round_rock:
-                for chk_row in range(row+1, num_rows+1):
-                    if chk_row == num_rows or platform[chk_row][col] != space:
-                        platform[row][col] = space
-                        platform[chk_row-1][col] = round_rock
-                        break
-
-def roll_west(platform):
-    num_rows = len(platform)
-    num_cols = len(platform[0])
-
-    for row in range(0, num_rows):
-        for col in range(1, num_cols):
-            if platform[row][col] == round_rock:
-                for chk_col in range(col-1, -2, -1):
-                    if chk_col < 0 or platform[row][chk_col] != space:
-                        platform[row][col] = space
-                        platform[row][chk_col+1] = round_rock
-                        break
-
-def roll_east(platform):
-    num_rows = len(platform)
-    num_cols = len(platform[0])
-
-    for row in range(0, num_rows):
-        for col in range(num_cols-2, -1, -1):
-            if platform[row][col] == round_rock:
-                for chk_col in range(col+1, num_cols+1):
-                    if chk_col == num_cols or platform[row][chk_col] != space:
-                        platform[row][col] = space
-                        platform[row][chk_col-1] = round_rock
-                        break
+    print(platform)
+
+#
+# Roll the round rocks along each lane of grid indexes, toward the start of
+# the lane. Rocks stop at a square rock or the first free space.
+#
+def roll(platform, lanes):
+    buf = platform.buf
+    moved = 0
+    for lane in lanes:
+        free = 0
+        for n, idx in enumerate(lane):
+            c = buf[idx]
+            if c == square_rock:
+                free = n + 1
+            elif c == round_rock:
+                if free != n:
+                    buf[idx] = space
+                    buf[lane[free]] = round_rock
+                    moved += 1
+                free += 1
+
+    instrument.count('rocks moved', moved)
+
+def north_lanes(platform):
+    return [ range(col, platform.size, platform.stride) for col in range(platform.cols) ]
+
+def south_lanes(platform):
+    last_row = (platform.rows-1) * platform.stride
+    return [ range(last_row + col, -1, -platform.stride) for col in range(platform.cols) ]
+
+def west_lanes(platform):
+    return [ range(row, row + platform.cols) for row in range(0, platform.size, platform.stride) ]
+
+def east_lanes(platform):
+    return [ range(row + platform.cols-1, row-1, -1) for row in range(0, platform.size, platform.stride) ]
 
 def calc_north_load(platform):
-    num_rows = len(platform)
-    num_cols = len(platform[0])
+    num_rows = platform.rows
     total_load = 0
     for row in range(num_rows):
-        for col in range(num_cols):
-            if (platform[row][col] == round_rock):
-                total_load += (num_rows - row)
+        total_load += platform.get_row(row).count(round_rock) * (num_rows - row)
 
     return total_load
 
 #
-# Main processing. Read rock map and calculate answer.
+# Main processing. Roll rock map and calculate answer.
 #
-def main():
-    # Read in the grid of rocks
-    total = 0
-    with open(fn, 'r') as file:
-        platform = []
-        for line in file:
-            line = line.rstrip('\n')
-            platform.append(bytearray(line, encoding='ascii'))
+def main(platform):
+    # One cycle rolls north, west, south and east
+    cycle_lanes = [ north_lanes(platform), west_lanes(platform),
+        south_lanes(platform), east_lanes(platform) ]
 
     cycles_to_calc = 1000000000
 
     # The nature of the problem is that the cycles will be cyclical after a
     # period to calm down. Run 100 cycles then figure out the repeating pattern.
-    for cycle in range(100):
-        roll_north(platform)
-        roll_west(platform)
-        roll_south(platform)
-        roll_east(platform)
+    with instrument.phase('settle'):
+        for cycle in range(100):
+            for lanes in cycle_lanes:
+                roll(platform, lanes)
 
     # Get 50 more to check the pattern
     pattern = []
-    for cycle in range(50):
-        roll_north(platform)
-        roll_west(platform)
-        roll_south(platform)
-        roll_east(platform)
-        load = calc_north_load(platform)
-        pattern.append(load)
+    with instrument.phase('find pattern'):
+        for cycle in range(50):
+            for lanes in cycle_lanes:
+                roll(platform, lanes)
+            load = calc_north_load(platform)
+            pattern.append(load)
 
     first_four = pattern[0:4]
     for idx in range(1, len(pattern)-3):
@@ -142,5 +120,6 @@ def main():
 
     return load
 
-load = main()
-print(f"Total load number is {load}")
+if __name__ == '__main__':
+    load = main(Grid.from_file(fn))
+    print(f"Total load number is {load}")
@@ -16,9 +16,14 @@ See test.dat for sample data and sequence.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
 from functools import reduce
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, stream
+
 fn = 'test.dat'
 fn = 'sequence.dat'
 
@@ -26,20 +31,46 @@ fn = 'sequence.dat'
 def calc_hash(s):
     return reduce(lambda h, c: ((h + ord(c)) * 17) % 256, (c for c in s), 0)
 
-def part1(s_list):
-    return sum(calc_hash(s) for s in s_list)
+#
+# Running total of hash values, adding one step at a time (see aoc/stream.py)
+#
+class HashTotal:
+    def __init__(self):
+        self.total = 0
+        self.num_hashes = 0
 
-def part2(s_list):
-    boxes = [ [] for _ in range(256) ]
+    def __repr__(self):
+        return f"HashTotal({self.total} from {self.num_hashes} steps)"
+
+    def add(self, s):
+        self.total += calc_hash(s)
+        self.num_hashes += 1
+
+    def result(self):
+        return self.total
+
+#
+# Boxes of lenses, applying one step at a time (see aoc/stream.py). Memory
+# grows only with the number of different labels, not the number of steps.
+#
+class LensBoxes:
+    def __init__(self):
+        self.boxes = [ [] for _ in range(256) ]
+        self.num_hashes = 0
+
+    def __repr__(self):
+        return f"LensBoxes({sum(len(box) for box in self.boxes)} lenses)"
 
     # Find label within a box
-    def find(box, label):
-        return next((idx for idx in range(len(boxes[box])-1, -1, -1) if boxes[box][idx][0] == label), None)
+    def find(self, box, label):
+        return next((idx for idx in range(len(self.boxes[box])-1, -1, -1) if self.boxes[box][idx][0] == label), None)
 
-    for s in s_list:
+    def add(self, s):
+        boxes = self.boxes
         label, op, lens = re.findall(r'(\w+)(-|=)(\d*)', s)[0]
         box = calc_hash(label)
-        idx = find(box, label)
+        idx = self.find(box, label)
+        self.num_hashes += 1
 
         if op == '-':
             # Remove lens, if exists
@@ -53,9 +84,26 @@ def part2(s_list):
                 boxes[box].append((label, lens))        # Add new
 
     # Add up "focusing power" using formula
-    return sum((box_num+1) * (slot+1) * int(lens[1])
-        for box_num, box in enumerate(boxes) for slot, lens in enumerate(box))
+    def result(self):
+        return sum((box_num+1) * (slot+1) * int(lens[1])
+            for box_num, box in enumerate(self.boxes) for slot, lens in enumerate(box))
 
-s_list = open(fn, 'r').readline().rstrip().split(',')
-print(f"Total of hash numbers is {part1(s_list)}")
-print(f"Total of hash numbers is {part2(s_list)}")
+def part1(s_list):
+    instrument.count('hashes', len(s_list))
+    with instrument.phase('hash'):
+        return stream.fold(HashTotal(), s_list)
+
+def part2(s_list):
+    lens_boxes = LensBoxes()
+    with instrument.phase('place lenses'):
+        for s in s_list:
+            lens_boxes.add(s)
+    instrument.count('hashes', lens_boxes.num_hashes)
+
+    return lens_boxes.result()
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total1, total2 = stream.fold_all([ HashTotal(), LensBoxes() ], stream.iter_records(file, ','))
+    print(f"Total of hash numbers is {total1}")
+    print(f"Total of hash numbers is {total2}")
@@ -16,18 +16,35 @@ See test.dat for sample data and sequence.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+from aoc.grid import Grid, ORTHOGONAL, SEP
+
 fn = 'test.dat'
 fn = 'grid.dat'
 
+# Directions are numbered N, E, S, W
+dir_nums = { 'N': 0, 'E': 1, 'S': 2, 'W': 3 }
+north, east, south, west = 0, 1, 2, 3
+
+# New direction after a mirror, indexed by current direction
 movement = {
-    '/':  { 'N': 'E', 'S': 'W', 'E': 'N', 'W': 'S' },
-    '\\': { 'N': 'W', 'S': 'E', 'E': 'S', 'W': 'N' },
+    ord('/'):  [ east, north, west, south ],
+    ord('\\'): [ west, south, east, north ],
 }
+vert_split = ord('|')
+horz_split = ord('-')
 
-class Grid:
+class MirrorGrid:
     def __init__(self, grid):
         self.grid = grid
-        self.num_rows, self.num_cols = len(grid), len(grid[0])
+        self.num_rows, self.num_cols = grid.rows, grid.cols
+
+        # Index offset for a step in each direction
+        self.offsets = [ grid.offset(d) for d in ORTHOGONAL ]
         self.reset_counts()
 
     def reset_counts(self):
@@ -46,55 +63,59 @@ class Grid:
     #
     # If a ray exits the grid, it just exits.
     #
-    def scan_nodes(self, row, col, d):
-        while 0 <= row < self.num_rows and 0 <= col < self.num_cols:
-            key = (row, col, d)
+    def scan_nodes(self, idx, d):
+        buf, size = self.grid.buf, self.grid.size
+        while 0 <= idx < size and buf[idx] != SEP:
+            key = idx * 4 + d
             if key in self.cache:
                 return                      # Already seen this location + direction
             self.cache.add(key)
 
-            c = self.grid[row][col]
-            if c == '/':
+            c = buf[idx]
+            if c in movement:
                 d = movement[c][d]
-            elif c == '\\':
-                d = movement[c][d]
-            elif c == '|':
-                if d == 'E' or d == 'W':
-                    self.scan_nodes(row, col, 'N')
-                    self.scan_nodes(row, col, 'S')
+            elif c == vert_split:
+                if d == east or d == west:
+                    self.scan_nodes(idx, north)
+                    self.scan_nodes(idx, south)
                     return
-            elif c == '-':
-                if d == 'N' or d == 'S':
-                    self.scan_nodes(row, col, 'E')
-                    self.scan_nodes(row, col, 'W')
+            elif c == horz_split:
+                if d == north or d == south:
+                    self.scan_nodes(idx, east)
+                    self.scan_nodes(idx, west)
                     return
 
-            self.visited.add((row, col))     # Mark visited
-            dr, dc = {'N':(-1, 0), 'S':(1, 0), 'E':(0, 1), 'W':(0, -1)}[d]
-            row, col = row+dr, col+dc
+            self.visited.add(idx)           # Mark visited
+            idx += self.offsets[d]
 
     # Do the ray processing, then count how many tiles were crossed.
     def count_energized(self, start_row, start_col, start_d):
-        grid.reset_counts()
-        self.scan_nodes(start_row, start_col, start_d)
+        self.reset_counts()
+        self.scan_nodes(self.grid.index(start_row, start_col), dir_nums[start_d])
+
+        instrument.count('beams traced')
+        instrument.count('beam steps', len(self.cache))
         return len(self.visited)
 
 def part1(grid):
-    return grid.count_energized(0, 0, 'E')
+    with instrument.phase('trace'):
+        return grid.count_energized(0, 0, 'E')
 
 def part2(grid):
     # Figure out optimal count, depending on which direction we come from
     max_count = 0
-    for col in range(grid.num_cols):
-        max_count = max(max_count, grid.count_energized(0, col, 'S'),
-            grid.count_energized(grid.num_rows-1, col, 'N'))
+    with instrument.phase('trace'):
+        for col in range(grid.num_cols):
+            max_count = max(max_count, grid.count_energized(0, col, 'S'),
+                grid.count_energized(grid.num_rows-1, col, 'N'))
 
-    for row in range(grid.num_rows):
-        max_count = max(max_count, grid.count_energized(row, 0, 'E'),
-            grid.count_energized(row, grid.num_cols-1, 'W'))
+        for row in range(grid.num_rows):
+            max_count = max(max_count, grid.count_energized(row, 0, 'E'),
+                grid.count_energized(row, grid.num_cols-1, 'W'))
 
     return max_count
 
-grid = Grid([ line.rstrip() for line in open(fn, 'r') ])
-print(f"Part 1: Total number energized tiles is {part1(grid)}")
-print(f"Part 2: Maximum number energized tiles is {part2(grid)}")
+if __name__ == '__main__':
+    grid = MirrorGrid(Grid.from_file(fn))
+    print(f"Part 1: Total number energized tiles is {part1(grid)}")
+    print(f"Part 2: Maximum number energized tiles is {part2(grid)}")
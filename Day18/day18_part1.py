@@ -12,9 +12,13 @@ See test.dat for sample data and plan.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'plan.dat'
 
@@ -123,63 +127,69 @@ class DigMap:
 
     # Calculate area
     def calc_area(self):
-        image = self.make_raster()
+        with instrument.phase('raster'):
+            image = self.make_raster()
         num_rows, num_cols = len(image), len(image[0])
         marker = ord('#')
+        instrument.count('segments', len(self.seg_list))
+        instrument.count('raster cells', num_rows * num_cols)
 
         # Figure out any interior point
         x, y = self.find_interior_point(image)
 
         # Do flood fill
-        self.flood_fill(image, x, y)
+        with instrument.phase('flood fill'):
+            self.flood_fill(image, x, y)
         #self.dsp_raster(image)
 
         # Count up the region filled
         area = 0
-        for y in range(len(image)):
-            for x in range(len(image[0])):
-                if image[y][x] != ord('.'):
-                    area += 1
+        with instrument.phase('count'):
+            for y in range(len(image)):
+                for x in range(len(image[0])):
+                    if image[y][x] != ord('.'):
+                        area += 1
 
         return area
 
 #
 # Main processing.
 #
-def main():
+def main(file):
     # Read in all the entries
 
     dig_map = DigMap()
     cur_x = 0
     cur_y = 0
-    with open(fn, 'r') as file:
-        for line in file:
-            line = line.rstrip('\n')
+    for line in file:
+        line = line.rstrip('\n')
 
-            matches = re.findall(r'(.) (\d+) \(#(.{6})', line)
-            d = matches[0][0]
-            steps = int(matches[0][1])
+        matches = re.findall(r'(.) (\d+) \(#(.{6})', line)
+        d = matches[0][0]
+        steps = int(matches[0][1])
 
-            x2 = cur_x
-            y2 = cur_y
+        x2 = cur_x
+        y2 = cur_y
 
-            if d == 'U':
-                y2 -= steps
-            elif d == 'D':
-                y2 += steps
-            elif d == 'L':
-                x2 -= steps
-            elif d == 'R':
-                x2 += steps
+        if d == 'U':
+            y2 -= steps
+        elif d == 'D':
+            y2 += steps
+        elif d == 'L':
+            x2 -= steps
+        elif d == 'R':
+            x2 += steps
 
-            dig_map.add_segment(cur_x, cur_y, x2, y2)
-            cur_x = x2
-            cur_y = y2
+        dig_map.add_segment(cur_x, cur_y, x2, y2)
+        cur_x = x2
+        cur_y = y2
 
     #dig_map.dump_map()
     area = dig_map.calc_area()
 
     return area
 
-area = main()
-print(f"Total area is {area}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        area = main(file)
+    print(f"Total area is {area}")
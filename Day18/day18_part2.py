@@ -22,9 +22,13 @@ See test.dat for sample data and plan.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'plan.dat'
 
@@ -140,7 +144,7 @@ class DigMap:
 #
 # Main processing.
 #
-def main():
+def main(file):
     # Read in all the entries
 
     dirs = {
@@ -153,41 +157,46 @@ def main():
     dig_map = DigMap()
     cur_x = 0
     cur_y = 0
-    with open(fn, 'r') as file:
-        for line in file:
-            line = line.rstrip('\n')
+    for line in file:
+        line = line.rstrip('\n')
 
-            matches = re.findall(r'(.) (\d+) \(#(.{6})', line)
-            steps = int(matches[0][2][0:5], 16)
-            d = dirs[matches[0][2][5]]
+        matches = re.findall(r'(.) (\d+) \(#(.{6})', line)
+        steps = int(matches[0][2][0:5], 16)
+        d = dirs[matches[0][2][5]]
 
-            x2 = cur_x
-            y2 = cur_y
+        x2 = cur_x
+        y2 = cur_y
 
-            if d == 'U':
-                y2 -= steps
-            elif d == 'D':
-                y2 += steps
-            elif d == 'L':
-                x2 -= steps
-            elif d == 'R':
-                x2 += steps
+        if d == 'U':
+            y2 -= steps
+        elif d == 'D':
+            y2 += steps
+        elif d == 'L':
+            x2 -= steps
+        elif d == 'R':
+            x2 += steps
 
-            dig_map.add_segment(cur_x, cur_y, x2, y2)
-            cur_x = x2
-            cur_y = y2
+        dig_map.add_segment(cur_x, cur_y, x2, y2)
+        cur_x = x2
+        cur_y = y2
 
     #dig_map.dump_segs()
 
+    instrument.count('segments', len(dig_map.seg_list))
+
     # Calculate basic area of the shape
-    area = dig_map.calc_area()
+    with instrument.phase('shoelace'):
+        area = dig_map.calc_area()
 
     # Need to include the outfacing edges on the right and on the
     # bottom, which didn't get included  in the shoelace calculation.
-    extra = dig_map.identify_outfacing()
+    with instrument.phase('outfacing edges'):
+        extra = dig_map.identify_outfacing()
 
     # Plus one for the final uncounted vertex
     return area + extra + 1
 
-area = main()
-print(f"Total area is {area}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        area = main(file)
+    print(f"Total area is {area}")
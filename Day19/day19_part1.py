@@ -11,9 +11,13 @@ See test.dat for sample data and rules.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'rules.dat'
 
@@ -21,10 +25,8 @@ fn = 'rules.dat'
 # A "part", which has four attribute values (x, m, a, s)
 #
 class Part:
-    def __init__(self, line):
-        matches = re.findall(r'\{x=(\d+),m=(\d+),a=(\d+),s=(\d+)\}', line)
-        self.x, self.m, self.a, self.s = [ int(n) for n in matches[0] ]
-        pass
+    def __init__(self, x, m, a, s):
+        self.x, self.m, self.a, self.s = x, m, a, s
 
     def __repr__(self):
         return f"[x={self.x},m={self.m},a={self.a},s={self.s}]"
@@ -57,32 +59,10 @@ class Rule:
 # Class to represent a "workflow", which is a set of rules
 #
 class Workflow:
-    def __init__(self, line):
-        matches = re.findall(r'(\w+)\{(.*)\}', line)
-
-        self.name = matches[0][0]
-        rules_s = matches[0][1]
+    def __init__(self, name):
+        self.name = name
         self.rules = []
 
-        for r_s in rules_s.split(','):
-            # Check for [A]ccept or [R]eject
-            if r_s == 'R' or r_s == 'A':
-                rule = Rule(r_s)
-                self.rules.append(rule)
-                continue
-
-            # Check for rule like: s<1351:px
-            matches = re.findall(r'(.)(\<|\>)(\d+):(\w+)', r_s)
-            if len(matches) > 0:
-                attr, op, value, next_rule = matches[0]
-                rule = Rule(op, next_rule, attr, int(value))
-                self.rules.append(rule)
-                continue
-
-            # Must be redirect to next rule
-            rule = Rule('NEXT', r_s)
-            self.rules.append(rule)
-
     def __repr__(self):
         return f"Workflow {self.name}: {self.rules}"
 
@@ -90,81 +70,144 @@ class Workflow:
         return self.name
 
 #
-# Main processing.
+# Names are kept as ints (the bytes of the name) so rules can be stored as rows
+# of numbers. Zero is no name.
 #
-def main():
-    # Read in all the entries
+def pack_name(name):
+    return int.from_bytes(name.encode(), 'big') if name else 0
+
+def unpack_name(n):
+    return n.to_bytes((n.bit_length() + 7) // 8, 'big').decode() if n else None
 
+#
+# Parse a workflow line like px{a<2006:qkq,m>2090:A,rfg} into rows of
+# (workflow, op, attribute, value, next workflow)
+#
+def parse_workflow(line):
+    matches = re.findall(r'(\w+)\{(.*)\}', line)
+    name = pack_name(matches[0][0])
+    rules_s = matches[0][1]
+    rows = []
+
+    for r_s in rules_s.split(','):
+        # Check for [A]ccept or [R]eject
+        if r_s == 'R' or r_s == 'A':
+            rows.append((name, pack_name(r_s), 0, 0, 0))
+            continue
+
+        # Check for rule like: s<1351:px
+        matches = re.findall(r'(.)(\<|\>)(\d+):(\w+)', r_s)
+        if len(matches) > 0:
+            attr, op, value, next_rule = matches[0]
+            rows.append((name, pack_name(op), pack_name(attr), int(value), pack_name(next_rule)))
+            continue
+
+        # Must be redirect to next rule
+        rows.append((name, pack_name('NEXT'), 0, 0, pack_name(r_s)))
+
+    return rows
+
+#
+# Create the workflows from rows of rules
+#
+def make_workflows(rules):
     workflows = { }
-    part_list = []
+    for flow, op, attr, value, next_rule in rules:
+        name, op = unpack_name(flow), unpack_name(op)
+        if name not in workflows:
+            workflows[name] = Workflow(name)
 
-    with open(fn, 'r') as file:
-        # First read workflows
-        while True:
-            line = file.readline()
-            if line == '\n':
-                break
+        if op not in ('<', '>'):
+            value = None
+        workflows[name].rules.append(Rule(op, unpack_name(next_rule), unpack_name(attr), value))
 
-            workflow = Workflow(line)
-            workflows[workflow.get_name()] = workflow
+    return workflows
 
-        # Next read parts
-        while True:
-            line = file.readline()
-            if line == '':
-                break
+#
+# Parse input into tables of workflow rules, and parts (x, m, a, s)
+#
+def parse_rules(lines):
+    rules = []
+    parts = []
+    lines = iter(lines)
+
+    # First read workflows
+    for line in lines:
+        if line == '':
+            break
+        rules += parse_workflow(line)
+
+    # Next read parts
+    for line in lines:
+        if line != '':
+            matches = re.findall(r'\{x=(\d+),m=(\d+),a=(\d+),s=(\d+)\}', line)
+            parts.append(tuple(int(n) for n in matches[0]))
+
+    return { 'rules': rules, 'parts': parts }
 
-            part = Part(line)
-            part_list.append(part)
+#
+# Main processing.
+#
+def main(tables):
+    with instrument.phase('build'):
+        workflows = make_workflows(tables['rules'])
+        part_list = [ Part(*row) for row in tables['parts'] ]
 
     # Process each part, determining if it's accepted by the rules.
     # If so, total up the "part rating"
     total = 0
-    for part in part_list:
-        cur_flow = 'in'
-        result = ''
-        while cur_flow != None:
-            workflow = workflows[cur_flow]
-            for rule in workflow.rules:
-                # A = accept part, R = Reject part
-                if rule.op in ('A', 'R'):
-                    result = rule.op
-                    cur_flow = None
-                    break
-
-                # NEXT = Move to to next workflow
-                elif rule.op == 'NEXT':
-                    cur_flow = rule.next_rule
-                    break
-
-                # Compare attribute less than number
-                elif rule.op == '<':
-                    n = part.get_num(rule.attr)
-                    if n < rule.value:
-                        if rule.next_rule in ('A', 'R'):
-                            result = rule.next_rule
-                            cur_flow = None
-                            break
-                        else:
-                            cur_flow = rule.next_rule
-                            break
-
-                # Compare attribute greater than number
-                elif rule.op == '>':
-                    n = part.get_num(rule.attr)
-                    if n > rule.value:
-                        if rule.next_rule in ('A', 'R'):
-                            result = rule.next_rule
-                            cur_flow = None
-                            break
-                        else:
-                            cur_flow = rule.next_rule
-                            break
-                        
-        if result == 'A':
-            total += part.get_rating()
-
+    num_visited = 0
+    with instrument.phase('sort parts'):
+        for part in part_list:
+            cur_flow = 'in'
+            result = ''
+            while cur_flow != None:
+                workflow = workflows[cur_flow]
+                num_visited += 1
+                for rule in workflow.rules:
+                    # A = accept part, R = Reject part
+                    if rule.op in ('A', 'R'):
+                        result = rule.op
+                        cur_flow = None
+                        break
+
+                    # NEXT = Move to to next workflow
+                    elif rule.op == 'NEXT':
+                        cur_flow = rule.next_rule
+                        break
+
+                    # Compare attribute less than number
+                    elif rule.op == '<':
+                        n = part.get_num(rule.attr)
+                        if n < rule.value:
+                            if rule.next_rule in ('A', 'R'):
+                                result = rule.next_rule
+                                cur_flow = None
+                                break
+                            else:
+                                cur_flow = rule.next_rule
+                                break
+
+                    # Compare attribute greater than number
+                    elif rule.op == '>':
+                        n = part.get_num(rule.attr)
+                        if n > rule.value:
+                            if rule.next_rule in ('A', 'R'):
+                                result = rule.next_rule
+                                cur_flow = None
+                                break
+                            else:
+                                cur_flow = rule.next_rule
+                                break
+
+            if result == 'A':
+                total += part.get_rating()
+
+    instrument.count('parts sorted', len(part_list))
+    instrument.count('workflows visited', num_visited)
     return total
 
-total = main()
-print(f"Total ratings is {total}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total = main(parse_rules(line.strip() for line in file))
+    print(f"Total ratings is {total}")
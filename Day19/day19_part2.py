@@ -16,9 +16,13 @@ See test.dat for sample data and rules.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'rules.dat'
 
@@ -45,31 +49,10 @@ class Rule:
 # Class to represent a "workflow", which is a set of rules
 #
 class Workflow:
-    def __init__(self, line):
-        matches = re.findall(r'(\w+)\{(.*)\}', line)
-        self.name = matches[0][0]
-        rules_s = matches[0][1]
+    def __init__(self, name):
+        self.name = name
         self.rules = []
 
-        for r_s in rules_s.split(','):
-            # Check for [A]ccept or [R]eject
-            if r_s == 'R' or r_s == 'A':
-                rule = Rule(r_s)
-                self.rules.append(rule)
-                continue
-
-            # Check for rule like: s<1351:px
-            matches = re.findall(r'(.)(\<|\>)(\d+):(\w+)', r_s)
-            if len(matches) > 0:
-                attr, op, value, next_rule = matches[0]
-                rule = Rule(op, next_rule, attr, int(value))
-                self.rules.append(rule)
-                continue
-
-            # Must be redirect to next rule
-            rule = Rule('NEXT', r_s)
-            self.rules.append(rule)
-
     def __repr__(self):
         return f"Workflow {self.name}: {self.rules}"
 
@@ -143,6 +126,7 @@ def recurse_rule(flow, rule_num, rating_ranges, level):
 
             elif n > rg[0] and n <= rg[1]:
                 # Need to recurse two paths
+                instrument.count('range splits')
                 total = 0
                 rr_copy = rating_ranges.copy()
 
@@ -193,6 +177,7 @@ def recurse_rule(flow, rule_num, rating_ranges, level):
 
             elif n >= rg[0] and n < rg[1]:
                 # Need to recurse two paths
+                instrument.count('range splits')
                 total = 0
                 rr_copy = rating_ranges.copy()
 
@@ -225,28 +210,84 @@ def calc_combos():
     return total
 
 #
-# Main processing.
+# Names are kept as ints (the bytes of the name) so rules can be stored as rows
+# of numbers. Zero is no name.
 #
-def main():
-    # Read in all the entries
+def pack_name(name):
+    return int.from_bytes(name.encode(), 'big') if name else 0
 
-    global workflows
+def unpack_name(n):
+    return n.to_bytes((n.bit_length() + 7) // 8, 'big').decode() if n else None
 
-    with open(fn, 'r') as file:
-        # First read workflows
-        while True:
-            line = file.readline()
-            if line == '\n':
-                break
+#
+# Parse a workflow line like px{a<2006:qkq,m>2090:A,rfg} into rows of
+# (workflow, op, attribute, value, next workflow)
+#
+def parse_workflow(line):
+    matches = re.findall(r'(\w+)\{(.*)\}', line)
+    name = pack_name(matches[0][0])
+    rules_s = matches[0][1]
+    rows = []
+
+    for r_s in rules_s.split(','):
+        # Check for [A]ccept or [R]eject
+        if r_s == 'R' or r_s == 'A':
+            rows.append((name, pack_name(r_s), 0, 0, 0))
+            continue
+
+        # Check for rule like: s<1351:px
+        matches = re.findall(r'(.)(\<|\>)(\d+):(\w+)', r_s)
+        if len(matches) > 0:
+            attr, op, value, next_rule = matches[0]
+            rows.append((name, pack_name(op), pack_name(attr), int(value), pack_name(next_rule)))
+            continue
 
-            workflow = Workflow(line)
-            workflows[workflow.get_name()] = workflow
+        # Must be redirect to next rule
+        rows.append((name, pack_name('NEXT'), 0, 0, pack_name(r_s)))
 
-        # Rest is parts, which is no longer needed
-        pass
+    return rows
+
+#
+# Create the workflows from rows of rules
+#
+def make_workflows(rules):
+    workflows = { }
+    for flow, op, attr, value, next_rule in rules:
+        name, op = unpack_name(flow), unpack_name(op)
+        if name not in workflows:
+            workflows[name] = Workflow(name)
 
-    total = calc_combos()
+        if op not in ('<', '>'):
+            value = None
+        workflows[name].rules.append(Rule(op, unpack_name(next_rule), unpack_name(attr), value))
+
+    return workflows
+
+#
+# Parse input into rows of workflow rules. Rest is parts, which is no longer needed.
+#
+def parse_rules(lines):
+    rules = []
+    for line in lines:
+        if line == '':
+            break
+        rules += parse_workflow(line)
+
+    return rules
+
+#
+# Main processing.
+#
+def main(rules):
+    global workflows
+    with instrument.phase('build'):
+        workflows = make_workflows(rules)
+
+    with instrument.phase('split ranges'):
+        total = calc_combos()
     return total
 
-total = main()
-print(f"Total valid combinations is {total}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total = main(parse_rules(line.strip() for line in file))
+    print(f"Total valid combinations is {total}")
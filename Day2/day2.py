@@ -14,42 +14,191 @@ See test.dat for sample data and games.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
+import bisect
+from array import array
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, stream
+
 fn = 'games.dat'
 
-# Generate game number + list of games
-def gen_games(lines):
-    for line in lines:
-        matches = re.findall("Game (\d+): (.*)", line)[0]
-        game_num, game_list = matches[0], matches[1].split('; ')
-        yield game_num, game_list
-
-def part1(lines):
-    total = 0
-    max_count = { 'red': 12, 'green': 13, 'blue': 14 }
-    for game_num, game_list in gen_games(lines):
-        color_count = { 'red': 0, 'green': 0, 'blue': 0 }
-        is_poss = any(int(round[0]) > max_count[round[1]]
-            for game in game_list for round in re.findall('(\d+) (\w+)', game))
-        if (is_poss):
-            total += int(game_num)
-
-    return total
-
-def part2(lines):
-    total = 0
-    for game_num, game_list in gen_games(lines):
-        count = { 'red': 0, 'green': 0, 'blue': 0 }
-        for game in game_list:
-            rounds = re.findall('(\d+) (\w+)', game)
-            for round in rounds:
-                count[round[1]] = max(count[round[1]], int(round[0]))
-
-        power = count['red'] * count['green'] * count['blue']
-        total += power
-
-    return total
-
-lines = [ line.strip() for line in open(fn, 'r') ]
-print(f"Total of possible game IDs: {part1(lines)}")
-print(f"Total cube power: {part2(lines)}")
+# Cubes in the bag for part 1: red, green, blue
+BAG_LIMITS = (12, 13, 14)
+
+#
+# Parse one game into (game number, most red, most green, most blue) shown in
+# any of its rounds. Only the most of each color matters to either part, so
+# the rounds aren't kept.
+#
+def parse_game(line):
+    game_num, rounds = re.findall(r'Game (\d+): (.*)', line)[0]
+    most = { 'red': 0, 'green': 0, 'blue': 0 }
+    for n, color in re.findall(r'(\d+) (red|green|blue)', rounds):
+        most[color] = max(most[color], int(n))
+    return (int(game_num), most['red'], most['green'], most['blue'])
+
+#
+# Parse all games into rows, as above
+#
+def parse_games(lines):
+    return [ parse_game(line) for line in lines ]
+
+#
+# Columnar store of the games, one entry per game: arrays of game number and
+# most red, green and blue. Built once, it answers any number of queries for
+# different bag limits, singly or as a vectorized batch.
+#
+class GameStore:
+    def __init__(self, games):
+        self.ids = array('q')
+        self.red = array('q')
+        self.green = array('q')
+        self.blue = array('q')
+        for game_num, red, green, blue in games:
+            self.ids.append(game_num)
+            self.red.append(red)
+            self.green.append(green)
+            self.blue.append(blue)
+
+    def __repr__(self):
+        return f"GameStore({len(self.ids)} games)"
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Total of the game numbers of games possible with the given (red, green, blue) cubes
+    def sum_possible(self, limits):
+        max_red, max_green, max_blue = limits
+        return sum(game_num for game_num, red, green, blue in zip(self.ids, self.red, self.green, self.blue)
+            if red <= max_red and green <= max_green and blue <= max_blue)
+
+    def sum_impossible(self, limits):
+        return sum(self.ids) - self.sum_possible(limits)
+
+    # "Power" of each game is the product of minimum cubes needed
+    def total_power(self):
+        return sum(red * green * blue for red, green, blue in zip(self.red, self.green, self.blue))
+
+    #
+    # sum_possible() for each of a sequence of (red, green, blue) limits, as a
+    # NumPy array. Queries are compared against every game at once, in
+    # batches sized to keep the comparison arrays small.
+    #
+    def sum_possible_batch(self, limits, batch_size = 1 << 22):
+        import numpy as np
+        limits = np.asarray(limits, dtype=np.int64).reshape(-1, 3)
+        most = np.stack([ np.frombuffer(col, dtype=np.int64) for col in (self.red, self.green, self.blue) ], axis=1)
+        ids = np.frombuffer(self.ids, dtype=np.int64)
+
+        sums = np.zeros(len(limits), dtype=np.int64)
+        step = max(1, batch_size // max(1, len(ids)))
+        for start in range(0, len(limits), step):
+            batch = limits[start:start+step]
+            possible = (most[None, :, :] <= batch[:, None, :]).all(axis=2)
+            sums[start:start+step] = possible @ ids
+        return sums
+
+    def sum_impossible_batch(self, limits):
+        return sum(self.ids) - self.sum_possible_batch(limits)
+
+#
+# Index for "total of game numbers possible with (red, green, blue) cubes"
+# queries, answering each in logarithmic time after one build. The distinct
+# red, green and blue counts are each sorted, and a 3-D prefix sum table over
+# them holds at [i, j, k] the total for games under the i-th, j-th and k-th
+# smallest counts. A query is then three bisects and one lookup. Cube counts
+# take few different values, so the table is small; if it would be too big
+# (over max_cells), queries fall back to scanning the store.
+#
+class DominanceIndex:
+    def __init__(self, store, max_cells = 1 << 24):
+        self.store = store
+        self.values = [ sorted(set(col)) for col in (store.red, store.green, store.blue) ]
+        self.table = None
+
+        shape = tuple(len(v) + 1 for v in self.values)
+        if shape[0] * shape[1] * shape[2] > max_cells:
+            return
+
+        import numpy as np
+        coords = [ np.searchsorted(np.array(v, dtype=np.int64), np.frombuffer(col, dtype=np.int64)) + 1
+            for v, col in zip(self.values, (store.red, store.green, store.blue)) ]
+        table = np.zeros(shape, dtype=np.int64)
+        np.add.at(table, tuple(coords), np.frombuffer(store.ids, dtype=np.int64))
+        for axis in range(3):
+            np.cumsum(table, axis=axis, out=table)
+        self.table = table
+
+    def __repr__(self):
+        shape = 'scan' if self.table is None else 'x'.join(str(n) for n in self.table.shape)
+        return f"DominanceIndex({len(self.store)} games, {shape})"
+
+    def sum_possible(self, limits):
+        if self.table is None:
+            return self.store.sum_possible(limits)
+        i, j, k = (bisect.bisect_right(v, n) for v, n in zip(self.values, limits))
+        return int(self.table[i, j, k])
+
+    def sum_impossible(self, limits):
+        return sum(self.store.ids) - self.sum_possible(limits)
+
+    # sum_possible() for each of a sequence of (red, green, blue) limits, as a NumPy array
+    def sum_possible_batch(self, limits):
+        if self.table is None:
+            return self.store.sum_possible_batch(limits)
+
+        import numpy as np
+        limits = np.asarray(limits, dtype=np.int64).reshape(-1, 3)
+        i, j, k = (np.searchsorted(np.array(v, dtype=np.int64), limits[:, axis], side='right')
+            for axis, v in enumerate(self.values))
+        return self.table[i, j, k]
+
+def build_store(games):
+    with instrument.phase('build store'):
+        store = GameStore(games)
+    instrument.count('games stored', len(store))
+    return store
+
+# Part 1 totals the game numbers of the games not possible with the bag limits
+def part1(games, limits = BAG_LIMITS):
+    store = build_store(games)
+    with instrument.phase('query'):
+        return store.sum_impossible(limits)
+
+def part2(games):
+    store = build_store(games)
+    with instrument.phase('query'):
+        return store.total_power()
+
+#
+# Running total for either part, adding one game (line) at a time (see
+# aoc/stream.py). Every line counts as its own game, so game numbers repeated
+# in concatenated inputs are counted each time.
+#
+class GameTotals:
+    def __init__(self, part):
+        self.part = part
+        self.total = 0
+
+    def __repr__(self):
+        return f"GameTotals(part {self.part}: {self.total})"
+
+    def add(self, line):
+        game_num, red, green, blue = parse_game(line)
+        if self.part == 1:
+            if any(n > max_n for n, max_n in zip((red, green, blue), BAG_LIMITS)):
+                self.total += game_num
+        else:
+            self.total += red * green * blue
+
+    def result(self):
+        return self.total
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total1, total2 = stream.fold_all([ GameTotals(part=1), GameTotals(part=2) ], stream.iter_records(file))
+    print(f"Total of possible game IDs: {total1}")
+    print(f"Total cube power: {total2}")
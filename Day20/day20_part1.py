@@ -12,10 +12,14 @@ See test.dat for sample data and modules.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 from queue import Queue
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'test2.dat'
 fn = 'modules.dat'
@@ -144,7 +148,8 @@ class Output(Module):
         return []
 
 #
-# "Click the button" which initiates signaling
+# "Click the button" which initiates signaling. Returns number of pulses
+# delivered.
 #
 def button():
     global total_low
@@ -153,46 +158,50 @@ def button():
     queue = Queue()
     queue.put({ 'from': None, 'mod': modules['broadcaster'], 'pulse': 0 })
 
+    num_pulses = 0
     while not queue.empty():
         entry = queue.get()
         mod = entry['mod']
         new_ents = mod.rec_pulse(entry['from'], entry['pulse'])
         for e in new_ents:
             queue.put(e)
+        num_pulses += 1
+
+    return num_pulses
 
 #
 # Main processing.
 #
-def main():
+def main(file):
     # Read in all the entries
 
-    global modules
+    global modules, total_low, total_high
+    modules = { }
+    total_low = total_high = 0
 
     module_data = []
 
-    with open(fn, 'r') as file:
-        for line in file:
-            line = line.rstrip("\n")
-            if line == '':
-                break
+    for line in file:
+        line = line.rstrip("\n")
+        if line == '':
+            break
 
-            matches = re.findall(r'(.*) -> (.*)', line)
-            name, con = matches[0]
-            con_list = con.split(', ')
-
-            c = name[0]
-            if c == '%':
-                mod = FlipFlop(name[1:])
-            elif c == '&':
-                mod = Conjunction(name[1:])
-            elif name == 'broadcaster':
-                mod = Broadcaster(name)
-            else:
-                print("BAD TYPE {name}")
-                exit(0)
+        matches = re.findall(r'(.*) -> (.*)', line)
+        name, con = matches[0]
+        con_list = con.split(', ')
+
+        c = name[0]
+        if c == '%':
+            mod = FlipFlop(name[1:])
+        elif c == '&':
+            mod = Conjunction(name[1:])
+        elif name == 'broadcaster':
+            mod = Broadcaster(name)
+        else:
+            raise Exception(f"BAD TYPE {name}")
 
-            modules[mod.name] = mod
-            module_data.append({ 'mod': mod, 'list': con_list })
+        modules[mod.name] = mod
+        module_data.append({ 'mod': mod, 'list': con_list })
 
     # Create special debug output module
     modules['output'] = Output('output')
@@ -211,12 +220,20 @@ def main():
                 con_mod.add_input(mod)
 
     # Count 1000 button presses
-    for i in range(1000):
-        count = button()
+    num_pulses = 0
+    with instrument.phase('press buttons'):
+        for i in range(1000):
+            count = button()
+            num_pulses += count
+
+    instrument.count('button presses', 1000)
+    instrument.count('pulses delivered', num_pulses)
 
     #print(f"total_low = {total_low}, total_high = {total_high}")
 
     return total_low * total_high
 
-pulse_count = main()
-print(f"Pulse product is {pulse_count}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        pulse_count = main(file)
+    print(f"Pulse product is {pulse_count}")
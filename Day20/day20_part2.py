@@ -18,10 +18,14 @@ See test.dat for sample data and modules.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 from queue import Queue
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'test2.dat'
 fn = 'modules.dat'
@@ -29,6 +33,9 @@ fn = 'modules.dat'
 modules = { }
 button_count = 0
 
+# Fewest number of button presses, once it has been figured out
+answer = None
+
 # Flag so we only count 'rx' cycle once per button
 first_rx = False
 
@@ -154,13 +161,20 @@ diffs = [ 0, 0, 0, 0]
 last_diffs = [ 0, 0, 0, 0 ]
 diffs_count = 0
 
+def reset_cycles():
+    global last_pulse, diffs, last_diffs, diffs_count
+    last_pulse = [ 0, 0, 0, 0]
+    diffs = [ 0, 0, 0, 0]
+    last_diffs = [ 0, 0, 0, 0 ]
+    diffs_count = 0
+
 def calc_cycles(mod):
     # Gather the conjunction node values up the tree from rx
     # Looks like:
     #[0, [1, [1, 0, 0, 0, 0, 1, 1, 1, 1]], 0, [1, [0, 1, 1, 0, 1, 1, 0]], 0, [1, [0, 1, 0, 0, 0, 1, 0, 1, 1]], 0, [1, [0, 1, 1, 0, 0, 1, 1]]]
     vals = get_conj_tree(mod, 0)
 
-    global diffs, last_diffs, diffs_count
+    global diffs, last_diffs, diffs_count, answer
 
     chk = [ vals[0], vals[2], vals[4], vals[6] ]
     for i in range(4):
@@ -178,9 +192,7 @@ def calc_cycles(mod):
                 diffs_count += 1
                 # Make sure doesn't change for 10 cycles
                 if diffs_count > 10:
-                    min_cycle = diffs[0] * diffs[1] * diffs[2] * diffs[3]
-                    print(f"ANSWER IS: {min_cycle}")
-                    exit(0)
+                    answer = diffs[0] * diffs[1] * diffs[2] * diffs[3]
             else:
                 last_diffs = diffs.copy()
                 diffs_count = 0
@@ -197,7 +209,7 @@ def calc_cycles(mod):
 #
 class EndingMod(Module):
     def rec_pulse(self, from_mod, pulse):
-        global first_rx
+        global first_rx, answer
 
         if first_rx:
             calc_cycles(from_mod)
@@ -205,8 +217,7 @@ class EndingMod(Module):
 
         # This can't really happen in anyone's lifetime
         if pulse == 0:
-            print(f"ENDING MOD, pulse = {pulse}, count = {button_count}")
-            exit(0)
+            answer = button_count
 
         return []
 
@@ -225,7 +236,8 @@ class Output(Module):
         return []
 
 #
-# "Click the button" which initiates signaling
+# "Click the button" which initiates signaling. Returns number of pulses
+# delivered.
 #
 def button():
     global button_count
@@ -237,46 +249,52 @@ def button():
     queue = Queue()
     queue.put({ 'from': None, 'mod': modules['broadcaster'], 'pulse': 0 })
 
+    num_pulses = 0
     while not queue.empty():
         entry = queue.get()
         mod = entry['mod']
         new_ents = mod.rec_pulse(entry['from'], entry['pulse'])
         for e in new_ents:
             queue.put(e)
+        num_pulses += 1
+
+    return num_pulses
 
 #
 # Main processing.
 #
-def main():
+def main(file):
     # Read in all the entries
 
-    global modules
+    global modules, button_count, answer
+    modules = { }
+    button_count = 0
+    answer = None
+    reset_cycles()
 
     module_data = []
 
-    with open(fn, 'r') as file:
-        for line in file:
-            line = line.rstrip("\n")
-            if line == '':
-                break
-
-            matches = re.findall(r'(.*) -> (.*)', line)
-            name, con = matches[0]
-            con_list = con.split(', ')
-
-            c = name[0]
-            if c == '%':
-                mod = FlipFlop(name[1:])
-            elif c == '&':
-                mod = Conjunction(name[1:])
-            elif name == 'broadcaster':
-                mod = Broadcaster(name)
-            else:
-                print("BAD TYPE {name}")
-                exit(0)
+    for line in file:
+        line = line.rstrip("\n")
+        if line == '':
+            break
+
+        matches = re.findall(r'(.*) -> (.*)', line)
+        name, con = matches[0]
+        con_list = con.split(', ')
+
+        c = name[0]
+        if c == '%':
+            mod = FlipFlop(name[1:])
+        elif c == '&':
+            mod = Conjunction(name[1:])
+        elif name == 'broadcaster':
+            mod = Broadcaster(name)
+        else:
+            raise Exception(f"BAD TYPE {name}")
 
-            modules[mod.name] = mod
-            module_data.append({ 'mod': mod, 'list': con_list })
+        modules[mod.name] = mod
+        module_data.append({ 'mod': mod, 'list': con_list })
 
     # Create special debug output module
     modules['output'] = Output('output')
@@ -298,9 +316,18 @@ def main():
                 con_mod.add_input(mod)
 
     # Continue processing until the cycle is detected
-    while True:
-        button()
+    num_pulses = 0
+    with instrument.phase('press buttons'):
+        while answer == None:
+            num_pulses += button()
 
-    return
+    instrument.count('button presses', button_count)
+    instrument.count('pulses delivered', num_pulses)
+
+    return answer
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        answer = main(file)
+    print(f"ANSWER IS: {answer}")
 
-main()
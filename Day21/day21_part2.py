@@ -7,9 +7,9 @@ Given a garden plot map and a starting point, compute how many garden plots can
 reached by walking an exact number of steps. Backtracking is allowed, so the
 starting point would be reachable by stepping back and forth.
 
-Uses a modified Dijkstra's Algorithm to complete the distances. The tricky part
-is that any node reached with an even number of steps, from any direction,
-qualifies as reachable.
+Uses a breadth-first search (Dijkstra's Algorithm with every step costing 1) to
+complete the distances. The tricky part is that any node reached with an even
+number of steps, from any direction, qualifies as reachable.
 
 However, with Part 2, the garden is infinitely large by repeating the map pattern,
 and we need to walk 26501365 steps.
@@ -30,165 +30,83 @@ See test.dat for sample data and garden.dat for full data.
 Author: Tim Behrendsen
 """
 
-import re
+import os
 import sys
-import heapq
 import numpy as np
 
-fn = 'garden.dat'
-
-#
-# Class to hold node information for path search
-#
-class Node:
-    def __init__(self, row, col):
-        self.row = row
-        self.col = col
-
-        # Visited flag and tentative distance for Dijkstra
-        self.visited = False
-        self.tent_dist = sys.maxsize
-
-        # Keep track if we find an even distance to this node
-        self.is_even = False
-
-    def __repr__(self):
-        dist = "inf" if self.tent_dist == sys.maxsize else self.tent_dist
-        return f"[{self.row}, {self.col}: dist={dist}]"
-
-    def __lt__(self, other):
-        return self.tent_dist < other.tent_dist
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, paths
+from aoc.grid import Grid
+from aoc.paths import INF
 
-    def get_key(self):
-        return self.make_key(self.row, self.col)
+fn = 'garden.dat'
 
-    @staticmethod
-    def make_key(row, col):
-        return f"{row}-{col}"
+rock = ord('#')
 
 #
 # Class for garden map
 #
 class Garden:
-    def __init__(self, m):
-        self.garden_map = m
-        self.num_rows = len(m)
-        self.num_cols = len(m[0])
-        self.total_even = 0
-        self.max_dist = 0
-
-        # Map from node key to 
-        self.node_map = { }
+    def __init__(self, grid):
+        self.garden_map = grid
+        self.num_rows = grid.rows
+        self.num_cols = grid.cols
 
         # First find start row, col
-        for row in range(self.num_rows):
-            for col in range(self.num_cols):
-                if self.garden_map[row][col] == 'S':
-                    self.start_row = row
-                    self.start_col = col
-                    break
+        self.start_row, self.start_col = grid.coords(grid.find('S'))
 
-    #
-    # Get character from the map, accounting that it can go in infinite directions
-    #
-    def get_map(self, row, col):
-        return self.garden_map[row % self.num_rows][col % self.num_cols]
+        # Distance from the start of each position of the tiled map, INF if
+        # not reached
+        self.dist = []
 
     #
-    # Get node from node map, creating node if it doesn't exist
-    # 
-    def get_node(self, row, col):
-        key = Node.make_key(row, col)
-        node = self.node_map.get(key)
-        if node != None:
-            return node
-
-        node = Node(row, col)
-        self.node_map[key] = node
-        return node
+    # Tile the repeating map into a grid reaching 'radius' positions out from
+    # the start in each direction, so positions can be searched as grid
+    # indexes. The start is in the center.
+    #
+    def tile_map(self, radius):
+        size = radius * 2 + 1
+        first_row = self.start_row - radius
+        first_col = (self.start_col - radius) % self.num_cols
+        repeat = (first_col + size) // self.num_cols + 1
+
+        lines = []
+        for row in range(first_row, first_row + size):
+            line = self.garden_map.get_row(row % self.num_rows) * repeat
+            lines.append(line[first_col:first_col + size] + b'\n')
+        return Grid(bytearray(b''.join(lines)), size)
 
     #
-    # Compute optimal path using Dijkstra's Algorithm
+    # Compute distances with a breadth-first search, out to max_steps
     #
     def calc_paths(self, max_steps):
+        # One position beyond max_steps+1 leaves the tiled map's border
+        # untouched
+        radius = max_steps + 2
+        with instrument.phase('tile map'):
+            grid = self.tile_map(radius)
+        buf = grid.buf
+        start = grid.index(radius, radius)
 
-        # Initial potential directions are one step south and one step east.
-        # Note we initialize to the cost for each direction.
-        start_node = self.get_node(self.start_row, self.start_col)
-        start_node.tent_dist = 0
-        start_node.is_even = True
-
-        # Unvisited set, which will be a priority queue
-        unv_set = [ start_node ]
-
-        while unv_set:
-            cur_node = heapq.heappop(unv_set)
-            cur_row = cur_node.row
-            cur_col = cur_node.col
-
-            # Figure out neighbor nodes and mark distances of neighbor nodes
-            move_list = []
-            if self.get_map(cur_row-1, cur_col) != '#':
-                move_list.append(self.get_node(cur_row-1, cur_col))
-            if self.get_map(cur_row+1, cur_col) != '#':
-                move_list.append(self.get_node(cur_row+1, cur_col))
-            if self.get_map(cur_row, cur_col-1) != '#':
-                move_list.append(self.get_node(cur_row, cur_col-1))
-            if self.get_map(cur_row, cur_col+1) != '#':
-                move_list.append(self.get_node(cur_row, cur_col+1))
-
-            new_dist = cur_node.tent_dist + 1
-            if new_dist > (max_steps+1):
-                break
-
-            if new_dist > self.max_dist:
-                #print(f"new_dist = {new_dist}, total even = {self.total_even}")
-                self.max_dist = new_dist
-
-            is_even = new_dist % 2 == 0
-            for new_node in move_list:
-                if new_dist < new_node.tent_dist:
-                    #new_node.prior_node = cur_node
-                    # If first examination of node, add to priority queue
-                    new = new_node.tent_dist == sys.maxsize
-                    new_node.tent_dist = new_dist
-                    if new:
-                        heapq.heappush(unv_set, new_node)
-                    else:
-                        heapq.heapify()
-
-                    if is_even and not new_node.is_even:
-                        new_node.is_even = True
-                        self.total_even += 1
-
-            cur_node.visited = True
+        def get_moves(idx):
+            return [ n for n in grid.neighbors(idx) if buf[n] != rock ]
 
-        # Find all nodes that had even distances
-        num_plots = 0
-        for key in self.node_map:
-            node = self.node_map[key]
-            if node.is_even:
-                num_plots += 1
+        with instrument.phase('search'):
+            self.dist = dist = paths.bfs(grid.size, [ (start, 0) ], get_moves, max_dist=max_steps+1)
 
-        return num_plots
+        # Find all nodes that had even distances
+        return sum(1 for d in dist if d != INF and d % 2 == 0)
 
 #
 # Main processing.
 #
-def main():
-    # Read in the maps, each as an array of strings
-    m = []
-    with open(fn, 'r') as file:
-        for line in file:
-            line = line.rstrip('\n')
-            m.append(line)
-
+def main(grid):
     # First calculate steps for 1, 3 and 5
     x_list = []
     y_list = []
     for mult in range(1, 6, 2):
         steps = 131 * mult + 65
-        garden = Garden(m)
+        garden = Garden(grid)
         total = garden.calc_paths(steps)
         x_list.append(mult)
         y_list.append(total)
@@ -204,5 +122,6 @@ def main():
 
     return steps
 
-total = main()
-print(f"Count is {total}")
+if __name__ == '__main__':
+    total = main(Grid.from_file(fn))
+    print(f"Count is {total}")
@@ -15,10 +15,14 @@ See test.dat for sample data and bricks.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 import heapq
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'bricks.dat'
 
@@ -147,6 +151,7 @@ def move_bricks_down(brick_list):
         else:
             move_count += 1
 
+    instrument.count('brick moves', move_count)
     return move_count != 0
 
 #
@@ -194,47 +199,61 @@ def count_falls(brick_list, brick):
     # Needs -1 because we don't count the first brick, because "disintegrated"
     return count - 1
 
+#
+# Parse bricks into rows of (x1, y1, z1, x2, y2, z2)
+#
+def parse_bricks(lines):
+    return [ tuple(int(n) for n in re.findall(r'\d+', line)) for line in lines ]
+
 #
 # Main processing.
 #
-def main():
-    # Read in all the bricks
+def main(bricks):
+    # Create all the bricks
     brick_list = []
-    with open(fn, 'r') as file:
-        for line in file:
-            m = re.findall('\d+', line)
-
-            brick = Brick(Coord(m[0], m[1], m[2]), Coord(m[3], m[4], m[5]), get_id(len(brick_list)))
-            brick_list.append(brick)
+    for m in bricks:
+        brick = Brick(Coord(m[0], m[1], m[2]), Coord(m[3], m[4], m[5]), get_id(len(brick_list)))
+        brick_list.append(brick)
 
     # Keep moving bricks until none can move any longer
     moved = True
-    while moved:
-        moved = move_bricks_down(brick_list)
+    num_passes = 0
+    with instrument.phase('settle'):
+        while moved:
+            moved = move_bricks_down(brick_list)
+            num_passes += 1
+    instrument.count('settle passes', num_passes)
 
     # Build lists of what bricks are supporting other bricks, and
     # what bricks directly under other other bricks
-    for idx in range(0, len(brick_list)):
-        brick1 = brick_list[idx]
-        brick1.coords[0].z += 1
-        brick1.coords[1].z += 1
+    with instrument.phase('build supports'):
+        for idx in range(0, len(brick_list)):
+            brick1 = brick_list[idx]
+            brick1.coords[0].z += 1
+            brick1.coords[1].z += 1
+
+            for idx2 in range(idx+1, len(brick_list)):
+                brick2 = brick_list[idx2]
+                if brick1.intersects(brick2):
+                    brick1.supporting.append(brick2)
+                    brick2.under_list.append(brick1)
 
-        for idx2 in range(idx+1, len(brick_list)):
-            brick2 = brick_list[idx2]
-            if brick1.intersects(brick2):
-                brick1.supporting.append(brick2)
-                brick2.under_list.append(brick1)
+            brick1.coords[0].z -= 1
+            brick1.coords[1].z -= 1
 
-        brick1.coords[0].z -= 1
-        brick1.coords[1].z -= 1
+    instrument.count('support checks', len(brick_list) * (len(brick_list)-1) // 2)
+    instrument.count('support links', sum(len(brick.supporting) for brick in brick_list))
 
     # Calculate how many bricks will fall for each brick
     total = 0
-    for brick in brick_list:
-        count = count_falls(brick_list, brick)
-        total += count
+    with instrument.phase('count falls'):
+        for brick in brick_list:
+            count = count_falls(brick_list, brick)
+            total += count
 
     return total
 
-total = main()
-print(f"Count is {total}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total = main(parse_bricks(file))
+    print(f"Count is {total}")
@@ -12,12 +12,19 @@ See test.dat for sample data and trails.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+from aoc.grid import Grid
+
 fn = 'test.dat'
 fn = 'trails.dat'
 
+forest = ord('#')
+
 #
 # Class to hold node information for path search
 #
@@ -41,10 +48,10 @@ class Node:
 # Class for trail map
 #
 class Trails:
-    def __init__(self, m):
-        self.trail_map = m
-        self.num_rows = len(m)
-        self.num_cols = len(m[0])
+    def __init__(self, grid):
+        self.trail_map = grid
+        self.num_rows = grid.rows
+        self.num_cols = grid.cols
 
         # Map from node key to node
         self.node_map = { }
@@ -65,12 +72,14 @@ class Trails:
         q = [ start_node ]
 
         end_list = []
+        num_expanded = num_branches = 0
         while q:
             cur_node = q.pop()
+            num_expanded += 1
 
             cur_row = cur_node.row
             cur_col = cur_node.col
-            key = f"{cur_row}-{cur_col}"
+            key = self.trail_map.index(cur_row, cur_col)
             cur_node.chk_set.add(key)
 
             if cur_row == self.num_rows-1:
@@ -85,9 +94,9 @@ class Trails:
             new_dist = cur_node.cur_dist + 1
 
             def check_valid(new_row, new_col, bad_c, chk_set):
-                if self.trail_map[new_row][new_col] in ('#', bad_c):
+                key = self.trail_map.index(new_row, new_col)
+                if self.trail_map.buf[key] in (forest, ord(bad_c)):
                     return False
-                key = f"{new_row}-{new_col}"
                 return key not in chk_set
 
             # Up
@@ -117,6 +126,11 @@ class Trails:
                 for node in move_list:
                     node.chk_set = cur_node.chk_set.copy()
                     q.append(node)
+                num_branches += len(move_list)
+
+        instrument.count('nodes expanded', num_expanded)
+        instrument.count('path branches', num_branches)
+        instrument.count('paths ended', len(end_list))
 
         n = 0
         for n2 in end_list:
@@ -126,18 +140,13 @@ class Trails:
 #
 # Main processing.
 #
-def main():
-    # Read in all the maps, each as an array of strings
-    m = []
-    with open(fn, 'r') as file:
-        for line in file:
-            line = line.rstrip('\n')
-            m.append(line)
-
-    trails = Trails(m)
-    total = trails.calc_paths()
+def main(grid):
+    trails = Trails(grid)
+    with instrument.phase('search'):
+        total = trails.calc_paths()
 
     return total
 
-total = main()
-print(f"Count is {total}")
+if __name__ == '__main__':
+    total = main(Grid.from_file(fn))
+    print(f"Count is {total}")
@@ -17,13 +17,20 @@ See test.dat for sample data and trails.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 import inspect
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+from aoc.grid import Grid
+
 fn = 'test.dat'
 fn = 'trails.dat'
 
+forest = ord('#')
+
 RED = "\x1b[31m"
 NORMAL = "\x1b[0m"
 
@@ -50,13 +57,14 @@ class Node:
 # Class for trail map
 #
 class Trails:
-    def __init__(self, m):
-        self.trail_map = m
-        self.num_rows = len(m)
-        self.num_cols = len(m[0])
+    def __init__(self, grid):
+        self.trail_map = grid
+        self.num_rows = grid.rows
+        self.num_cols = grid.cols
 
         self.end_list = []
         self.max_dist = 0
+        self.num_branches = 0
 
     #
     # Display traveled path back from node
@@ -66,11 +74,11 @@ class Trails:
         chk_set = node.chk_set
         for row in range(self.num_rows):
             for col in range(self.num_cols):
-                c = self.trail_map[row][col]
+                c = self.trail_map.get_char(row, col)
                 if c == '#':
                     print('#', end='')
                 else:
-                    key = f"{row}-{col}"
+                    key = self.trail_map.index(row, col)
                     if key in chk_set:
                         print(RED + c + NORMAL, end='')
                     else:
@@ -85,7 +93,7 @@ class Trails:
         while True:
             cur_row = cur_node.row
             cur_col = cur_node.col
-            key = f"{cur_row}-{cur_col}"
+            key = self.trail_map.index(cur_row, cur_col)
             cur_node.chk_set.add(key)
 
             if cur_row == self.num_rows-1:
@@ -100,9 +108,9 @@ class Trails:
             new_dist = cur_node.cur_dist + 1
 
             def check_valid(new_row, new_col, chk_set):
-                if self.trail_map[new_row][new_col] == '#':
+                key = self.trail_map.index(new_row, new_col)
+                if self.trail_map.buf[key] == forest:
                     return False
-                key = f"{new_row}-{new_col}"
                 return key not in chk_set
 
             # Up
@@ -137,6 +145,7 @@ class Trails:
             else:
                 # Multiple new directions, need separate check sets and recursive call
                 max_dist = 0
+                self.num_branches += len(move_list)
                 for entry in move_list:
                     node = Node(entry[0], entry[1], new_dist)
                     node.chk_set = cur_node.chk_set.copy()
@@ -146,11 +155,9 @@ class Trails:
 
                 return max_dist
 
-            print("BAD")
             break
 
-        print("BAD")
-        exit(0)
+        raise Exception(f"BAD: path from {cur_node.row}, {cur_node.col} ended without a distance")
 
     #
     # Compute longest path using recursive depth-first-search
@@ -166,6 +173,8 @@ class Trails:
         start_node = Node(start_row, start_col, 0, chk_set)
 
         total = self.recurse_paths(start_node)
+        instrument.count('path branches', self.num_branches)
+        instrument.count('paths ended', len(self.end_list))
 
         n = 0
         for n2 in self.end_list:
@@ -175,18 +184,13 @@ class Trails:
 #
 # Main processing.
 #
-def main():
-    # Read in all the maps, each as an array of strings
-    m = []
-    with open(fn, 'r') as file:
-        for line in file:
-            line = line.rstrip('\n')
-            m.append(line)
-
-    trails = Trails(m)
-    total = trails.calc_paths()
+def main(grid):
+    trails = Trails(grid)
+    with instrument.phase('search'):
+        total = trails.calc_paths()
 
     return total
 
-total = main()
-print(f"Count is {total}")
+if __name__ == '__main__':
+    total = main(Grid.from_file(fn))
+    print(f"Count is {total}")
@@ -12,9 +12,13 @@ See test.dat for sample data and paths.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 min_coord = 7
 max_coord = 27
@@ -77,10 +81,10 @@ class Hailstone:
 #
 # Main processing.
 #
-def main():
+def main(file):
     # Read in all the maps, each as an array of strings
     stone_list = []
-    with open(fn, 'r') as file:
+    with instrument.phase('parse'):
         for line in file:
             line = line.rstrip('\n')
             matches = re.findall(r'(-?\d+)', line)
@@ -90,47 +94,52 @@ def main():
     # For each pair of hailstones, calculate intersection point and decide
     # if they'll intersect within our test area forward in time.
     count = 0
-    for idx1 in range(len(stone_list)-1):
-        stone1 = stone_list[idx1]
-        for idx2 in range(idx1+1, len(stone_list)):
-            stone2 = stone_list[idx2]
-            (x, y) = stone1.intersect(stone2)
-
-            # If parallel, no intersection
-            if x == 'P':
-                continue
-
-            # Check if intersecting back in time
-            back_flag = False
-            if stone1.dx != 0:
-                if stone1.dx < 0 and x > stone1.x:
-                    back_flag = True
-                elif stone1.dx > 0 and x < stone1.x:
-                    back_flag = True
-            else:
-                if stone1.yx < 0 and y > stone1.y:
-                    back_flag = True
-                elif stone1.dy > 0 and y < stone1.y:
-                    back_flag = True
-
-            if stone2.dx != 0:
-                if stone2.dx < 0 and x > stone2.x:
-                    back_flag = True
-                elif stone2.dx > 0 and x < stone2.x:
-                    back_flag = True
-            else:
-                if stone2.yx < 0 and y > stone2.y:
-                    back_flag = True
-                elif stone2.dy > 0 and y < stone2.y:
-                    back_flag = True
-
-            if back_flag:
-                continue
-
-            if (min_coord <= x <= max_coord) and (min_coord <= y <= max_coord):
-                count += 1
+    with instrument.phase('intersect'):
+        for idx1 in range(len(stone_list)-1):
+            stone1 = stone_list[idx1]
+            for idx2 in range(idx1+1, len(stone_list)):
+                stone2 = stone_list[idx2]
+                (x, y) = stone1.intersect(stone2)
+
+                # If parallel, no intersection
+                if x == 'P':
+                    continue
+
+                # Check if intersecting back in time
+                back_flag = False
+                if stone1.dx != 0:
+                    if stone1.dx < 0 and x > stone1.x:
+                        back_flag = True
+                    elif stone1.dx > 0 and x < stone1.x:
+                        back_flag = True
+                else:
+                    if stone1.yx < 0 and y > stone1.y:
+                        back_flag = True
+                    elif stone1.dy > 0 and y < stone1.y:
+                        back_flag = True
+
+                if stone2.dx != 0:
+                    if stone2.dx < 0 and x > stone2.x:
+                        back_flag = True
+                    elif stone2.dx > 0 and x < stone2.x:
+                        back_flag = True
+                else:
+                    if stone2.yx < 0 and y > stone2.y:
+                        back_flag = True
+                    elif stone2.dy > 0 and y < stone2.y:
+                        back_flag = True
+
+                if back_flag:
+                    continue
+
+                if (min_coord <= x <= max_coord) and (min_coord <= y <= max_coord):
+                    count += 1
+
+    instrument.count('stone pairs', len(stone_list) * (len(stone_list)-1) // 2)
 
     return count
 
-total = main()
-print(f"Count is {total}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total = main(file)
+    print(f"Count is {total}")
@@ -26,10 +26,14 @@ See test.dat for sample data and paths.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 import itertools as it
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'paths.dat'
 
@@ -62,10 +66,10 @@ def factor_lt_1000(n):
 #
 # Main processing.
 #
-def main():
+def main(file):
     # Read in all the maps, each as an array of strings
     stone_list = []
-    with open(fn, 'r') as file:
+    with instrument.phase('parse'):
         for line in file:
             line = line.rstrip('\n')
             matches = re.findall(r'(-?\d+)', line)
@@ -76,75 +80,78 @@ def main():
     pot_dx_set = None
     pot_dy_set = None
     pot_dz_set = None
-    for A, B in it.combinations(stone_list, 2):
-        ax, ay, az, adx, ady, adz = A.unpack()
-        bx, by, bz, bdx, bdy, bdz = B.unpack()
-
-        # If both A and B have same x velocity
-        if adx == bdx:
-            # Gap amount between A and B X coordinates will be a constant
-            x_diff = bx - ax
-
-            # EXAMPLE
-            #     GAP = 105 (gap between these two will always be this amount)
-            #     dx = 10   (so these points are moving in sync by 10 each time)
-            #
-            #     Factors of 105 = 1, 3, 5, 7, 15, 21, 35, 105
-            #     Potential rock solutions have to make up the gap of 105 between
-            #     this pair, and also account for base velocity of 10. Making up
-            #     the gap can be done with some multiple of the factors.
-            #
-            #     So we know that for this pair of rocks, the dx for the final
-            #     solution must be one dx +/- [factor].
-            #
-            #     We only check factors < 1000 since that was all that's required
-            #     for the solution and speeds things up. Note that the hailstone
-            #     velocities are < 1000.
-            #
-            new_x_set = set()
-            for f in factor_lt_1000(x_diff):
-                new_x_set.add(adx + f)
-                new_x_set.add(adx - f)
-
-            if pot_dx_set != None:
-                pot_dx_set &= new_x_set         # Keep ones in common
-            else:
-                pot_dx_set = new_x_set
-
-            #print(f"dx = {adx}, x_diff = {x_diff}, factors={factors}, new_x_set = {new_x_set}")
-            #print(f"    pot_dx_set = {pot_dx_set}")
-
-        if ady == bdy:
-            y_diff = by - ay
-
-            new_y_set = set()
-            for f in factor_lt_1000(y_diff):
-                new_y_set.add(ady + f)
-                new_y_set.add(ady - f)
-
-            if pot_dy_set != None:
-                pot_dy_set &= new_y_set
-            else:
-                pot_dy_set = new_y_set
-
-            #print(f"dy = {ady}, y_diff = {y_diff}, factors={factors}, new_y_set = {new_y_set}")
-            #print(f"    pot_dy_set = {pot_dy_set}")
-
-        if adz == bdz:
-            z_diff = bz - az
-
-            new_z_set = set()
-            for f in factor_lt_1000(z_diff):
-                new_z_set.add(adz + f)
-                new_z_set.add(adz - f)
-
-            if pot_dz_set != None:
-                pot_dz_set &= new_z_set
-            else:
-                pot_dz_set = new_z_set
-
-            #print(f"dz = {adz}, z_diff = {z_diff}, factors={factors}, new_z_set = {new_z_set}")
-            #print(f"    pot_dz_set = {pot_dz_set}")
+    with instrument.phase('find velocity'):
+        for A, B in it.combinations(stone_list, 2):
+            ax, ay, az, adx, ady, adz = A.unpack()
+            bx, by, bz, bdx, bdy, bdz = B.unpack()
+
+            # If both A and B have same x velocity
+            if adx == bdx:
+                # Gap amount between A and B X coordinates will be a constant
+                x_diff = bx - ax
+
+                # EXAMPLE
+                #     GAP = 105 (gap between these two will always be this amount)
+                #     dx = 10   (so these points are moving in sync by 10 each time)
+                #
+                #     Factors of 105 = 1, 3, 5, 7, 15, 21, 35, 105
+                #     Potential rock solutions have to make up the gap of 105 between
+                #     this pair, and also account for base velocity of 10. Making up
+                #     the gap can be done with some multiple of the factors.
+                #
+                #     So we know that for this pair of rocks, the dx for the final
+                #     solution must be one dx +/- [factor].
+                #
+                #     We only check factors < 1000 since that was all that's required
+                #     for the solution and speeds things up. Note that the hailstone
+                #     velocities are < 1000.
+                #
+                new_x_set = set()
+                for f in factor_lt_1000(x_diff):
+                    new_x_set.add(adx + f)
+                    new_x_set.add(adx - f)
+
+                if pot_dx_set != None:
+                    pot_dx_set &= new_x_set         # Keep ones in common
+                else:
+                    pot_dx_set = new_x_set
+
+                #print(f"dx = {adx}, x_diff = {x_diff}, factors={factors}, new_x_set = {new_x_set}")
+                #print(f"    pot_dx_set = {pot_dx_set}")
+
+            if ady == bdy:
+                y_diff = by - ay
+
+                new_y_set = set()
+                for f in factor_lt_1000(y_diff):
+                    new_y_set.add(ady + f)
+                    new_y_set.add(ady - f)
+
+                if pot_dy_set != None:
+                    pot_dy_set &= new_y_set
+                else:
+                    pot_dy_set = new_y_set
+
+                #print(f"dy = {ady}, y_diff = {y_diff}, factors={factors}, new_y_set = {new_y_set}")
+                #print(f"    pot_dy_set = {pot_dy_set}")
+
+            if adz == bdz:
+                z_diff = bz - az
+
+                new_z_set = set()
+                for f in factor_lt_1000(z_diff):
+                    new_z_set.add(adz + f)
+                    new_z_set.add(adz - f)
+
+                if pot_dz_set != None:
+                    pot_dz_set &= new_z_set
+                else:
+                    pot_dz_set = new_z_set
+
+                #print(f"dz = {adz}, z_diff = {z_diff}, factors={factors}, new_z_set = {new_z_set}")
+                #print(f"    pot_dz_set = {pot_dz_set}")
+
+    instrument.count('stone pairs', len(stone_list) * (len(stone_list)-1) // 2)
 
     print(pot_dx_set, pot_dy_set, pot_dz_set)
     rdx, rdy, rdz = pot_dx_set.pop(), pot_dy_set.pop(), pot_dz_set.pop()
@@ -167,5 +174,7 @@ def main():
 
     return answer
 
-answer = main()
-print(f"Answer is {answer}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        answer = main(file)
+    print(f"Answer is {answer}")
@@ -32,9 +32,13 @@ Author: Tim Behrendsen
 # Set to True to generate a visualization of the graph
 visualize = False
 
+import os
 import re
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 if visualize:
     import networkx as nx
     import matplotlib.pyplot as plt
@@ -107,10 +111,12 @@ class ComponentSet:
         q = [ QNode([comp.name] , comp) ]
 
         # Get next node on the BFS queue
+        num_expanded = 0
         while q:
             node = q.pop()
             path = node.path
             comp = node.comp
+            num_expanded += 1
 
             # Follow each wire and see if we've scanned this edge before
             for rmt in comp.wires:
@@ -128,6 +134,7 @@ class ComponentSet:
                 # If found ending node, stop
                 if rmt.name == target_name:
                     path.append(target_name)
+                    instrument.count('nodes expanded', num_expanded)
                     return path
 
                 # Add this new node to the queue
@@ -137,6 +144,7 @@ class ComponentSet:
                 q.append(QNode(new_path, rmt))
 
         # No further paths found
+        instrument.count('nodes expanded', num_expanded)
         return []
 
     #
@@ -153,6 +161,7 @@ class ComponentSet:
             # Find a single path that doesn't follow a prior edge
             edge_chk_set = cur_edge_chk_set.copy()
             path = self.find_path(edge_chk_set, comp1, target_name)
+            instrument.count('path searches')
 
             # If no more paths, stop
             if not path:
@@ -198,11 +207,11 @@ class ComponentSet:
 #
 # Main processing.
 #
-def main():
+def main(file):
     # Read in all the components
     comps = ComponentSet()
 
-    with open(fn, 'r') as file:
+    with instrument.phase('build graph'):
         for line in file:
             line = line.rstrip('\n')
             matches = re.findall(r'(\b\w+\b)', line)
@@ -211,12 +220,15 @@ def main():
             comps.add_comp(name, wire_list)
 
     #comps.dump()
-    answer = comps.scan_paths()
+    with instrument.phase('count paths'):
+        answer = comps.scan_paths()
 
     if visualize:
         comps.visualize()
 
     return answer
 
-answer = main()
-print(f"Answer is {answer}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        answer = main(file)
+    print(f"Answer is {answer}")
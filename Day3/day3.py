@@ -15,49 +15,203 @@ See test.dat for sample data and schematic.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
+import sys
+import bisect
+from array import array
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+from aoc.grid import Grid
+
 fn = 'schematic.dat'
 
-# Build list of parts
+#
+# Build list of parts, and an index from each cell of the grid to the part
+# number covering it (its position in the list), or -1
+#
 def get_part_list(schematic):
     part_list = []
-    for row, line in enumerate(schematic):
-        for match in re.finditer(r'\d+', line):
-            start_pos, end_pos, num = match.start(), match.end()-1, match.group()
+    part_ids = array('i', [-1]) * schematic.size
+    with instrument.phase('find parts'):
+        for match in re.finditer(rb'\d+', schematic.buf):
+            if match.start() >= schematic.size:
+                break
+            row, start_pos = schematic.coords(match.start())
+            end_pos, num = start_pos + len(match.group()) - 1, match.group()
+            for idx in range(match.start(), match.end()):
+                part_ids[idx] = len(part_list)
             part_list.append({ 'row': row, 'start_pos': start_pos, 'end_pos': end_pos, 'num': int(num) })
-    return part_list
+
+    instrument.count('part numbers', len(part_list))
+    return part_list, part_ids
+
+#
+# Ids of the parts next to a cell, including diagonally
+#
+def get_adjacent_parts(schematic, part_ids, idx):
+    adjacent = set()
+    for n in schematic.neighbors(idx, diagonal=True):
+        if part_ids[n] >= 0:
+            adjacent.add(part_ids[n])
+    return adjacent
+
+#
+# Indexes of the cells matching a pattern (symbols or gears)
+#
+def find_cells(schematic, pattern):
+    for match in re.finditer(pattern, schematic.buf):
+        if match.start() >= schematic.size:
+            break
+        yield match.start()
 
 def part1(schematic):
-    def has_sym(part):
-        for chk_row in range(max(0, part['row']-1), min(num_rows-1, part['row']+1) + 1):
-            for chk_col in range(max(0, part['start_pos']-1), min(num_cols-1, part['end_pos']+1) + 1):
-                chk_c = schematic[chk_row][chk_col] 
-                if chk_c != '.' and not chk_c.isdigit():
-                    return True
-        return False
+    part_list, part_ids = get_part_list(schematic)
+
+    # Look around each symbol for the parts next to it, rather than around each
+    # part for a symbol
+    adjacent = set()
+    num_symbols = 0
+    with instrument.phase('check symbols'):
+        for idx in find_cells(schematic, rb'[^.\d\n]'):
+            adjacent |= get_adjacent_parts(schematic, part_ids, idx)
+            num_symbols += 1
+
+    instrument.count('symbols', num_symbols)
+    return sum(part_list[part_id]['num'] for part_id in adjacent)
+
+#
+# Part 1 with NumPy, without a Python loop over the parts or symbols. The
+# symbol cells are spread to their neighbours (a 3x3 max filter), then each run
+# of digits gets its value and whether any of its cells touch a symbol, and the
+# touching values are added up. The newline column keeps runs from joining
+# across rows, and is never a symbol.
+#
+def part1_numpy(schematic):
+    import numpy as np
+    rows, cols = schematic.rows, schematic.stride
+    cells = np.frombuffer(schematic.buf, dtype=np.uint8, count=schematic.size).reshape(rows, cols)
+
+    with instrument.phase('dilate symbols'):
+        is_digit = (cells >= ord('0')) & (cells <= ord('9'))
+        is_symbol = ~is_digit & (cells != ord('.')) & (cells != ord('\n'))
+        padded = np.pad(is_symbol, 1)
+        near = np.zeros_like(is_symbol)
+        for dr in range(3):
+            for dc in range(3):
+                near |= padded[dr:dr+rows, dc:dc+cols]
+
+    with instrument.phase('label parts'):
+        pos = np.flatnonzero(is_digit)
+        if len(pos) == 0:
+            return 0
+
+        # Runs of digits are where the positions step by one
+        breaks = np.flatnonzero(np.diff(pos) != 1) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.append(breaks, len(pos)) - 1
+        labels = np.repeat(np.arange(len(starts)), ends - starts + 1)
 
-    return sum(part['num'] for part in get_part_list(schematic) if has_sym(part))
+        # Each digit times ten to the number of digits after it in its run
+        digits = cells.ravel()[pos].astype(np.int64) - ord('0')
+        values = np.add.reduceat(digits * 10 ** (pos[ends][labels] - pos), starts)
+        touching = np.logical_or.reduceat(near.ravel()[pos], starts)
+
+    instrument.count('part numbers', len(starts))
+    return int(values[touching].sum())
 
 def part2(schematic):
-    part_list = get_part_list(schematic)
+    part_list, part_ids = get_part_list(schematic)
 
     # Scan for gears ('*') then see if it's adjacent to exactly two part numbers.
     total = 0
-    for row, line in enumerate(schematic):
-        for match in re.finditer(r'\*', line):
-            col = match.start()
-            match_parts = [ part for part in part_list
-                if abs(row - part['row']) <= 1
-                    and (part['start_pos']-1) <= col <= (part['end_pos']+1) ]
+    num_gears = 0
+    with instrument.phase('match gears'):
+        for idx in find_cells(schematic, rb'\*'):
+            match_parts = [ part_list[part_id] for part_id in get_adjacent_parts(schematic, part_ids, idx) ]
 
             # If valid, calculate the gear ratio and sum them up.
             if len(match_parts) == 2:
                 total += match_parts[0]['num'] * match_parts[1]['num']
+            num_gears += 1
 
+    instrument.count('gears', num_gears)
     return total
 
-schematic = [ line.strip() for line in open(fn, 'r') ]
-num_rows, num_cols = len(schematic), len(schematic[0])
+#
+# One row of the schematic, with its part numbers (start and end columns, and
+# value) and gear columns found
+#
+class Row:
+    def __init__(self, text):
+        self.text = text
+        self.starts, self.ends, self.nums = [], [], []
+        for match in re.finditer(r'\d+', text):
+            self.starts.append(match.start())
+            self.ends.append(match.end() - 1)
+            self.nums.append(int(match.group()))
+        self.gears = [ match.start() for match in re.finditer(r'\*', text) ]
+
+    def __repr__(self):
+        return f"Row({len(self.nums)} numbers, {len(self.gears)} gears)"
+
+    def has_sym(self, start_pos, end_pos):
+        return symbol.search(self.text, max(0, start_pos-1), end_pos+2) != None
+
+    # Part numbers touching a column, including diagonally
+    def get_adjacent(self, col):
+        nums = []
+        idx = bisect.bisect_right(self.starts, col+1) - 1
+        while idx >= 0 and self.ends[idx] >= col-1:
+            nums.append(self.nums[idx])
+            idx -= 1
+        return nums
+
+symbol = re.compile(r'[^.\d]')
+
+#
+# Streaming mode (see aoc/stream.py). Rows are added one at a time and only
+# three are kept, so memory is O(width) however many rows there are. Each row
+# is scored as it leaves the middle of the window, once the rows above and
+# below it are known; the last row is scored (without being kept) by result().
+#
+class SchematicWindow:
+    def __init__(self, part):
+        self.part = part
+        self.total = 0
+        self.above = None
+        self.middle = None
+
+    def __repr__(self):
+        return f"SchematicWindow(part {self.part}: {self.total})"
+
+    def add(self, line):
+        row = Row(line)
+        if self.middle != None:
+            self.total += self.score(self.above, self.middle, row)
+        self.above, self.middle = self.middle, row
+
+    def result(self):
+        if self.middle == None:
+            return self.total
+        return self.total + self.score(self.above, self.middle, None)
+
+    def score(self, above, row, below):
+        rows = [ r for r in (above, row, below) if r != None ]
+        total = 0
+        if self.part == 1:
+            for start_pos, end_pos, num in zip(row.starts, row.ends, row.nums):
+                if any(r.has_sym(start_pos, end_pos) for r in rows):
+                    total += num
+        else:
+            for col in row.gears:
+                match_nums = [ num for r in rows for num in r.get_adjacent(col) ]
+                if len(match_nums) == 2:
+                    total += match_nums[0] * match_nums[1]
+        return total
 
-print(f"Part number total is {part1(schematic)}")
-print(f"Sum of all gear ratios is {part2(schematic)}")
+if __name__ == '__main__':
+    schematic = Grid.from_file(fn)
+    print(f"Part number total is {part1(schematic)}")
+    print(f"Sum of all gear ratios is {part2(schematic)}")
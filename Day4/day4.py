@@ -13,44 +13,159 @@ See test.dat for sample data and cards.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import cache, instrument, stream
 
 fn = 'cards.dat'
 
-# Parse cards and generate a data structure
-def gen_cards():
-    for line in (line.strip() for line in open(fn, 'r')):
-        matches = re.findall(r'Card\s+(\d+): (.*) \| (.*)', line)[0]
-        winning = re.findall(r'\d+', matches[1])
-        chosen = re.findall(r'\d+', matches[2])
-        yield { 'num': matches[0], 'winning': winning, 'chosen': chosen }
+# Bits in each half of a number set. Card numbers are under 100, and a row of
+# the parse cache holds int64s, so each set is kept as two 50 bit halves.
+MASK_BITS = 50
+MASK_LOW = (1 << MASK_BITS) - 1
+
+# Set of numbers as a bitmask, bit n set for number n
+def get_mask(numbers):
+    mask = 0
+    for n in numbers:
+        mask |= 1 << n
+    return mask
+
+#
+# Parse a card into a row of (card number, winning numbers low bits, winning
+# numbers high bits, chosen numbers low bits, chosen numbers high bits)
+#
+def parse_card(line):
+    matches = re.findall(r'Card\s+(\d+): (.*) \| (.*)', line.strip())[0]
+    winning = get_mask(int(n) for n in re.findall(r'\d+', matches[1]))
+    chosen = get_mask(int(n) for n in re.findall(r'\d+', matches[2]))
+    return (int(matches[0]), winning & MASK_LOW, winning >> MASK_BITS, chosen & MASK_LOW, chosen >> MASK_BITS)
+
+#
+# Parse all cards into rows, as above
+#
+def parse_cards(lines):
+    return [ parse_card(line) for line in lines ]
 
-# Calculate number of matching numbers
+# Calculate number of matching numbers, the bits set in both masks
 def count_matches(card):
-    return sum(chosen in card['winning'] for chosen in card['chosen'])
+    return (card[1] & card[3]).bit_count() + (card[2] & card[4]).bit_count()
 
 # Calculate score of a card, 1 for one match, then doubling with each successive match.
 def calc_score(card):
     n = count_matches(card)
     return 0 if n == 0 else 2**(n-1)
 
-# Read cards and total up score
-def part1():
-    return sum(calc_score(card) for card in gen_cards())
+# Total up score of cards
+def part1(cards):
+    instrument.count('cards scored', len(cards))
+    with instrument.phase('score'):
+        return sum(calc_score(card) for card in cards)
 
-def part2():
-    # Read cards and create array of number of matches of each
-    count_array = [count_matches(card) for card in gen_cards()]
+def part2(cards):
+    # Create array of number of matches of each card
+    with instrument.phase('score'):
+        count_array = [count_matches(card) for card in cards]
+    instrument.count('cards scored', len(cards))
 
-    # Calculate the number of copies of each card
+    # Calculate total number of cards and copies
+    return sum(count_copies(count_array))
+
+#
+# Calculate the number of copies of each card. Each card adds its copies to a
+# run of the cards after it, so that's kept as a difference array: the copies
+# start being added at the next card, and stop after the last one.
+#
+def count_copies(count_array):
     copies = [1] * len(count_array)
-    for idx, count in enumerate(count_array):
-        cur_copies = copies[idx]
-        for idx2 in range(idx+1, min(idx+count+1, len(count_array))):
-            copies[idx2] += cur_copies
+    delta = [0] * (len(count_array) + 1)
+    with instrument.phase('copy cards'):
+        extra = 0
+        for idx, count in enumerate(count_array):
+            extra += delta[idx]
+            copies[idx] += extra
+            if count > 0:
+                delta[idx+1] += copies[idx]
+                delta[min(idx+count+1, len(count_array))] -= copies[idx]
+    instrument.count('copy runs', sum(count > 0 for count in count_array))
+    return copies
 
-    # Calculate total number of cards and copies
-    return sum(copies)
+#
+# Number of bits set in each value of an int64 array. np.bitwise_count is only
+# in NumPy 2.0 and later, so before that the bits of each byte are looked up in
+# a table and added up per value.
+#
+def popcount(np, values):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    table = np.array([ bin(n).count('1') for n in range(256) ], dtype=np.uint8)
+    octets = np.ascontiguousarray(values, dtype=np.int64).view(np.uint8)
+    return table[octets].reshape(-1, 8).sum(axis=1, dtype=np.int64)
+
+#
+# Match counts of all the cards at once with NumPy, as popcounts of the ANDed
+# masks. Rows from the parse cache are used in place, without unpacking.
+#
+def get_match_counts(cards):
+    import numpy as np
+    with instrument.phase('score'):
+        if isinstance(cards, cache.Table):
+            rows = cards.to_numpy()
+        else:
+            rows = np.array(cards, dtype=np.int64).reshape(-1, 5)
+        counts = popcount(np, rows[:, 1] & rows[:, 3]) + popcount(np, rows[:, 2] & rows[:, 4])
+    instrument.count('cards scored', len(counts))
+    return counts.astype(np.int64)
+
+# Part 1 for a large batch of cards, 2**(n-1) points for n matches
+def part1_batch(cards):
+    return int(((1 << get_match_counts(cards)) >> 1).sum())
+
+#
+# Part 2 for a large batch of cards. Each card's copies depend on the copies
+# of the cards before it, and soon overflow int64, so the cascade itself is
+# still added up in Python.
+#
+def part2_batch(cards):
+    return sum(count_copies(get_match_counts(cards).tolist()))
+
+#
+# Running total for either part, adding one card at a time (see aoc/stream.py).
+# For part 2, a card only adds copies to the next few cards, so only the extra
+# copies still owed to those are kept, at most one per winning number.
+#
+class CardTotals:
+    def __init__(self, part):
+        self.part = part
+        self.total = 0
+        self.pending = deque()
+
+    def __repr__(self):
+        return f"CardTotals(part {self.part}: {self.total})"
+
+    def add(self, line):
+        count = count_matches(parse_card(line))
+        if self.part == 1:
+            self.total += 0 if count == 0 else 2**(count-1)
+            return
+
+        cur_copies = 1 + (self.pending.popleft() if self.pending else 0)
+        self.total += cur_copies
+        for idx in range(count):
+            if idx < len(self.pending):
+                self.pending[idx] += cur_copies
+            else:
+                self.pending.append(cur_copies)
+
+    def result(self):
+        return self.total
 
-print(f"Total of cards is {part1()} points")
-print(f"Total number of cards is {part2()}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total1, total2 = stream.fold_all([ CardTotals(part=1), CardTotals(part=2) ], stream.iter_records(file))
+    print(f"Total of cards is {total1} points")
+    print(f"Total number of cards is {total2}")
@@ -11,13 +11,14 @@ See test.dat for sample data and seeds.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
 
-fn = 'seeds.dat'
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
 
-# Dictionary to store mappings
-mappings = { }
+fn = 'seeds.dat'
 
 # Class for holding an entry within a Mapping
 class Entry:
@@ -42,6 +43,10 @@ class Mapping:
         # List of entries for this mapping
         self.entry_list = []
 
+        # Source starts, source ends and offsets of the entries as NumPy
+        # arrays, sorted by source start, made on first use by translate_batch()
+        self.arrays = None
+
     def add(self, dest_start, src_start, length):
         self.entry_list.append(Entry(dest_start, src_start, length))
 
@@ -54,10 +59,36 @@ class Mapping:
         # If not found, use same seed number
         return seed_num
 
-# Read seed data and mapping
-with open(fn, 'r') as file:
+    #
+    # Translate a NumPy array of numbers at once. The entries are sorted by
+    # source start, each number finds the last entry starting at or below it
+    # with searchsorted, and gets that entry's offset added if it's inside it.
+    #
+    def translate_batch(self, nums):
+        import numpy as np
+        if self.arrays == None:
+            entries = sorted(self.entry_list, key=lambda entry: entry.src_start)
+            self.arrays = tuple(np.array(values, dtype=np.int64) for values in (
+                [ entry.src_start for entry in entries ],
+                [ entry.src_start + entry.length for entry in entries ],
+                [ entry.dest_start - entry.src_start for entry in entries ]))
+
+        starts, ends, diffs = self.arrays
+        if len(starts) == 0:
+            return nums
+        idx = np.searchsorted(starts, nums, side='right') - 1
+        inside = (idx >= 0) & (nums < ends[idx])
+        return nums + np.where(inside, diffs[idx], 0)
+
+#
+# Read seed numbers and dictionary of mappings
+#
+def read_almanac(file):
+    # Dictionary to store mappings
+    mappings = { }
+
     # Read list of seed numbers
-    seed_nums = map(int, re.findall(r'\d+', file.readline()))
+    seed_nums = list(map(int, re.findall(r'\d+', file.readline())))
 
     m = None
     for line in file:
@@ -71,16 +102,60 @@ with open(fn, 'r') as file:
             matches = re.findall(r'\d+', line)
             m.add(int(matches[0]), int(matches[1]), int(matches[2]))
 
-lowest = sys.maxsize
-for seed_num in seed_nums:
-    cur_src = "seed"
-    num = seed_num
-    while cur_src != "location":
-        m = mappings[cur_src]
-        new_num = m.translate(num)
-        cur_src = m.dest_name
-        num = new_num
-
-    lowest = min(lowest, num)
-
-print(f"Lowest is {lowest}")
+    return seed_nums, mappings
+
+#
+# Main processing. Return lowest location number.
+#
+def main(file):
+    with instrument.phase('parse'):
+        seed_nums, mappings = read_almanac(file)
+
+    lowest = sys.maxsize
+    num_translated = 0
+    with instrument.phase('translate'):
+        for seed_num in seed_nums:
+            cur_src = "seed"
+            num = seed_num
+            while cur_src != "location":
+                m = mappings[cur_src]
+                new_num = m.translate(num)
+                cur_src = m.dest_name
+                num = new_num
+                num_translated += 1
+
+            lowest = min(lowest, num)
+
+    instrument.count('numbers translated', num_translated)
+    return lowest
+
+#
+# Translate an array of seed numbers (any number of them) to locations with
+# NumPy, a stage at a time
+#
+def get_locations(mappings, seed_nums):
+    import numpy as np
+    nums = np.asarray(seed_nums, dtype=np.int64)
+    with instrument.phase('translate'):
+        cur_src = "seed"
+        while cur_src != "location":
+            m = mappings[cur_src]
+            nums = m.translate_batch(nums)
+            cur_src = m.dest_name
+            instrument.count('numbers translated', len(nums))
+    return nums
+
+#
+# Same as main(), translating the seeds with NumPy, for an almanac file with a
+# great many seeds
+#
+def main_batch(path):
+    with instrument.phase('parse'):
+        with open(path, 'r') as file:
+            seed_nums, mappings = read_almanac(file)
+    return int(get_locations(mappings, seed_nums).min(initial=sys.maxsize))
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        lowest = main(file)
+    print(f"Lowest is {lowest}")
@@ -14,16 +14,15 @@ See test.dat for sample data and seeds.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
+import bisect
 
-fn = 'seeds.dat'
-
-# Dictionary to store mappings
-mappings = { }
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
 
-# Maximum category number, so we can fill out the gaps
-max_cat_num = 0
+fn = 'seeds.dat'
 
 #
 # Class for holding an entry within a Mapping
@@ -45,7 +44,37 @@ class Entry:
         return self.__str__()
 
 #
-# Class for holding a mapping of one type to another type
+# Set of numbers kept as (low, high) ranges, sorted, with ranges that overlap
+# or touch merged, so translating it never carries the same numbers twice
+#
+class RangeSet:
+    def __init__(self, ranges = ()):
+        self.ranges = []
+        for low, high in sorted(ranges):
+            if self.ranges and low <= self.ranges[-1][1] + 1:
+                if high > self.ranges[-1][1]:
+                    self.ranges[-1] = (self.ranges[-1][0], high)
+            else:
+                self.ranges.append((low, high))
+
+    def __repr__(self):
+        return f"RangeSet({len(self.ranges)} ranges)"
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def __iter__(self):
+        return iter(self.ranges)
+
+    # Lowest number in the set
+    def lowest(self):
+        return self.ranges[0][0] if self.ranges else sys.maxsize
+
+#
+# Class for holding a mapping of one type to another type. Once built, the
+# mapping is a sorted list of breakpoints splitting the numbers from 0 up into
+# pieces, each adding its own amount: an entry, or a gap between entries (or
+# past the last one) that gives the same number. The last piece never ends.
 #
 class Mapping:
     def __init__(self, src_name, dest_name):
@@ -55,74 +84,96 @@ class Mapping:
         # List of entries for this mapping
         self.entry_list = []
 
+        # Start of each piece, and the amount it adds
+        self.breaks = [ 0 ]
+        self.diffs = [ 0 ]
+
+    def __repr__(self):
+        return f"Mapping({self.src_name} to {self.dest_name}: {len(self.breaks)} pieces)"
+
     # Add new entry
     def add(self, dest_start, src_start, length):
         self.entry_list.append(Entry(dest_start, src_start, length))
 
-    # Scan completed range list and fill out gaps with ranges that will give the same number
-    def fill_gaps(self):
-        # First make sure the range list is sorted
+    # Sort the entries into pieces, with pieces for the gaps between them
+    def build(self):
         self.entry_list.sort(key=lambda entry: entry.src_start)
-
-        # Add range at front and range at end
-        if self.entry_list[0].range[0] > 0:
-            self.entry_list.insert(0, Entry(0, 0, self.entry_list[0].range[0]))
-
-        if self.entry_list[-1].range[1] < max_cat_num:
-            n = self.entry_list[-1].range[1]
-            self.entry_list.append(Entry(n+1, n+1, max_cat_num-n))
-
-        # Find gaps and add ranges to just give same seed value
-        i = 0
-        while i < len(self.entry_list)-1:
-            entry1 = self.entry_list[i]
-            entry2 = self.entry_list[i+1]
-            diff = entry2.range[0] - entry1.range[1]
-            if (diff != 1):
-                n1 = entry1.range[1]
-                n2 = entry2.range[0]
-                self.entry_list.insert(i+1, Entry(n1, n1, n2-n1))
-
-            i += 1
-
+        self.breaks, self.diffs = [], []
+        pos = 0
+        for entry in self.entry_list:
+            if entry.length <= 0:
+                continue
+            if entry.src_start > pos:
+                self.breaks.append(pos)
+                self.diffs.append(0)
+            self.breaks.append(entry.src_start)
+            self.diffs.append(entry.tran_diff)
+            pos = entry.src_start + entry.length
+
+        self.breaks.append(pos)
+        self.diffs.append(0)
+
+    #
+    # Translate a list of (low, high) ranges. Each range is split at the
+    # breakpoints inside it, finding the piece its low end is in by binary
+    # search, then stepping through the pieces it covers.
+    #
     def translate(self, cat_set):
         new_cat_set = []
-        for r in cat_set:
-            low = r[0]
-            high = r[1]
-
-            for entry in self.entry_list:
-                # Check if range is within this entry
-                if not (high < entry.range[0] or low > entry.range[1]):
-                    # Is low/high completely within entry
-                    if low >= entry.range[0] and high <= entry.range[1]:
-                        new_cat_set.append((low + entry.tran_diff, high + entry.tran_diff))
-
-                    # Is range completely within low/high: narrow to range
-                    elif low < entry.range[0] and high > entry.range[1]:
-                        new_cat_set.append((entry.range[0] + entry.tran_diff, entry.range[1] + entry.tran_diff))
-
-                    # If low below range, need to split: entry.range[0] to high
-                    elif low < entry.range[0]:
-                        new_cat_set.append((entry.range[0] + entry.tran_diff, high + entry.tran_diff))
-
-                    # If high above range, need to split: low to entry.range[1]
-                    #else if high > entry.range[1]:
-                    else:
-                        new_cat_set.append((low + entry.tran_diff, entry.range[1] + entry.tran_diff))
+        breaks, diffs = self.breaks, self.diffs
+        last = len(breaks) - 1
+        for low, high in cat_set:
+            i = bisect.bisect_right(breaks, low) - 1
+            while low <= high:
+                piece_high = high if i == last else min(high, breaks[i+1] - 1)
+                new_cat_set.append((low + diffs[i], piece_high + diffs[i]))
+                low = piece_high + 1
+                i += 1
 
         return new_cat_set
 
-# Read seed data and mapping
-with open(fn, 'r') as file:
+    #
+    # Mapping that translates through this one and then 'second'. Each piece
+    # of this mapping is moved by its amount and split at the breakpoints of
+    # 'second' that fall inside it, and each part adds both amounts. Pieces
+    # next to each other that add the same amount are merged.
+    #
+    def compose(self, second):
+        composed = Mapping(self.src_name, second.dest_name)
+        breaks, diffs = composed.breaks, composed.diffs = [], []
+        last, second_last = len(self.breaks) - 1, len(second.breaks) - 1
+        for i in range(last + 1):
+            start, diff = self.breaks[i], self.diffs[i]
+            low = start + diff
+            j = bisect.bisect_right(second.breaks, low) - 1
+            while True:
+                if not diffs or diffs[-1] != diff + second.diffs[j]:
+                    breaks.append(low - diff)
+                    diffs.append(diff + second.diffs[j])
+                if j == second_last or (i < last and second.breaks[j+1] - diff >= self.breaks[i+1]):
+                    break
+                j += 1
+                low = second.breaks[j]
+
+        return composed
+
+#
+# Read seed ranges and dictionary of mappings, built into pieces. Takes the
+# input file, or a list of its lines.
+#
+def read_almanac(file):
+    # Dictionary to store mappings
+    mappings = { }
+
     # Read list of seed numbers
-    seed_nums = list(map(int, re.findall(r'\d+', file.readline())))
+    lines = iter(file)
+    seed_nums = list(map(int, re.findall(r'\d+', next(lines))))
     seed_ranges = [(seed_nums[i], seed_nums[i] + seed_nums[i+1] - 1)
         for i in range(0, len(seed_nums), 2)]
 
     cat_map = None
-    for line in file:
-        if line == '\n':            # Blank line, reset for new map
+    for line in lines:
+        if line.strip() == '':      # Blank line, reset for new map
             cat_map = None
         elif cat_map == None:
             matches = re.findall(r'(\w+)-to-(\w+) map', line)
@@ -134,22 +185,84 @@ with open(fn, 'r') as file:
             matches = re.findall(r'\d+', line)
             dest_start, src_start, entry_len = map(int, matches)
             cat_map.add(dest_start, src_start, entry_len)
-            max_cat_num = max(max_cat_num, dest_start + entry_len, src_start + entry_len)
 
-for cat_map in mappings.values():
-    cat_map.fill_gaps()
+    for cat_map in mappings.values():
+        cat_map.build()
 
-lowest = sys.maxsize
-for seed_range in seed_ranges:
-    cat_set = [ seed_range ]
-    cur_src = "seed"
-    while cur_src != "location":
-        cat_map = mappings[cur_src]
-        new_cat_set = cat_map.translate(cat_set)
-        cur_src = cat_map.dest_name
-        cat_set = new_cat_set
+    return seed_ranges, mappings
+
+#
+# Main processing. Return lowest location number. All the seed ranges are
+# translated together a stage at a time, and the ranges are merged after each
+# stage, so the number of ranges can't grow faster than the breakpoints they
+# are split at. The ranges split out and left after merging are counted for
+# each stage.
+#
+def main(file):
+    with instrument.phase('parse'):
+        seed_ranges, mappings = read_almanac(file)
+
+    with instrument.phase('translate'):
+        cat_set = RangeSet(seed_ranges)
+        cur_src = "seed"
+        while cur_src != "location":
+            cat_map = mappings[cur_src]
+            new_ranges = cat_map.translate(cat_set)
+            cat_set = RangeSet(new_ranges)
+            cur_src = cat_map.dest_name
+            instrument.count(f'{cur_src} ranges split', len(new_ranges))
+            instrument.count(f'{cur_src} ranges merged', len(cat_set))
 
     # Find lowest in set of ranges
-    lowest = min(lowest, min(r[0] for r in cat_set))
+    return cat_set.lowest()
 
-print(f"Lowest is {lowest}")
+#
+# Compose the chain of mappings from seed to location into one mapping. The
+# pieces of the chain so far are counted at each stage.
+#
+def get_chain(mappings):
+    chain = mappings["seed"]
+    instrument.count(f'{chain.dest_name} pieces', len(chain.breaks))
+    while chain.dest_name != "location":
+        chain = chain.compose(mappings[chain.dest_name])
+        instrument.count(f'{chain.dest_name} pieces', len(chain.breaks))
+    return chain
+
+#
+# Parse the almanac into seed ranges and the pieces of the whole seed to
+# location chain, as (start, amount added) rows. Run through the parse cache
+# (see aoc/cache.py), the chain is only composed once for each input.
+#
+def parse_almanac(lines):
+    seed_ranges, mappings = read_almanac(lines)
+    chain = get_chain(mappings)
+    return { 'seeds': seed_ranges, 'pieces': list(zip(chain.breaks, chain.diffs)) }
+
+#
+# Lowest location for the seed ranges, from the almanac as parsed above. The
+# lowest location in each range is at its low end, or at the start of one of
+# the pieces of the chain inside it.
+#
+def get_lowest(almanac):
+    seed_ranges, pieces = RangeSet(almanac['seeds']), almanac['pieces']
+    breaks = [ piece[0] for piece in pieces ]
+    diffs = [ piece[1] for piece in pieces ]
+    lowest = sys.maxsize
+    num_searched = 0
+    with instrument.phase('search pieces'):
+        for low, high in seed_ranges:
+            i = bisect.bisect_right(breaks, low) - 1
+            lowest = min(lowest, low + diffs[i])
+            i += 1
+            while i < len(breaks) and breaks[i] <= high:
+                lowest = min(lowest, breaks[i] + diffs[i])
+                i += 1
+                num_searched += 1
+
+    instrument.count('pieces searched', num_searched)
+    return lowest
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        lowest = main(file)
+    print(f"Lowest is {lowest}")
@@ -13,15 +13,49 @@ See test.dat for sample data and race.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
 import re
 import sys
+import math
 from functools import reduce
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'race.dat'
 
-# Read race data
-with open(fn, 'r') as file:
+#
+# Number of whole hold times t that beat the record, where the distance is
+# t * (time - t) > dist. The winning times lie strictly between the roots of
+# t^2 - time*t + dist = 0, (time -/+ sqrt(time^2 - 4*dist)) / 2, so the lowest
+# is found from the integer square root of the discriminant, exactly for any
+# size of numbers. A distance equal to the record doesn't beat it.
+#
+def count_ways(time, dist):
+    disc = time * time - 4 * dist
+    if disc <= 0:
+        return 0
+
+    # isqrt() rounds down, so this is at or just below the lowest winning time
+    low = (time - math.isqrt(disc)) // 2
+    while 2 * low <= time and low * (time - low) <= dist:
+        low += 1
+
+    # Winning times are symmetric about time / 2
+    return max(0, time - 2 * low + 1)
+
+#
+# Ways to beat the record of each race, for any number of races
+#
+def count_ways_batch(times, dists):
+    instrument.count('races solved', len(times))
+    return [ count_ways(time, dist) for time, dist in zip(times, dists) ]
+
+#
+# Main processing. Return product of the number of ways to beat each record.
+#
+def main(file):
     # Read list of times
     line = file.readline()
     matches = re.findall(r'\d+', line)
@@ -36,23 +70,13 @@ with open(fn, 'r') as file:
     for n in matches:
         dists.append(int(n))
 
-    records = []
-    for i in range(len(times)):
-        records.append({ 'time': times[i], 'dist': dists[i] })
-
-    beaten_counts = []
-    for race in records:
-        beat_count = 0
-        for t in range(1, race['time']):
-            speed = t
-            time_left = race['time'] - t;
-            dist = speed * time_left
-            if (dist > race['dist']):
-                beat_count += 1
+    with instrument.phase('solve'):
+        beaten_counts = count_ways_batch(times, dists)
 
-        beaten_counts.append(beat_count)
-
-    prod = reduce(lambda x, y: x * y, beaten_counts)
+    return reduce(lambda x, y: x * y, beaten_counts)
 
+if __name__ == '__main__':
+    # Read race data
+    with open(fn, 'r') as file:
+        prod = main(file)
     print(f"Number of records beaten, multiplied together: {prod}")
-
@@ -10,60 +10,51 @@ needed a more complex approach.
 
 The nature of the time scenarios is that there was an optimal number and we
 needed to know how many of those are above a threshhold. Rather than brute-forcing
-testing every number, it does a pseudo-binary-search to do a gradient descent on
-both sides of the curve to locate the crossover point. After calculate the ends,
-the difference is the number of time scenarios that are above the distance
-threshhold.
+testing every number, the distance is a quadratic in the hold time, so the
+crossover points are the roots of that quadratic, found exactly with an integer
+square root. The difference between them is the number of time scenarios that
+are above the distance threshhold.
 
 See test.dat for sample data and race.dat for full data.
 
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
+import math
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
 
 fn = 'test.dat'
 fn = 'race.dat'
 
 #
-# Calculate distance based on when we press the button
-#
-def calc_dist(race, tm):
-    speed = tm
-    time_left = race['time'] - tm;
-    return speed * time_left
-
-#
-# Do pseudo-binary search gradient descent to locate crossover point where we start breaking the record
+# Number of whole hold times t that beat the record, where the distance is
+# t * (time - t) > dist. The winning times lie strictly between the roots of
+# t^2 - time*t + dist = 0, (time -/+ sqrt(time^2 - 4*dist)) / 2, so the lowest
+# is found from the integer square root of the discriminant, exactly for any
+# size of numbers. A distance equal to the record doesn't beat it.
 #
-def find_crossover(race, t_low, t_high):
-    while (abs(t_low - t_high) > 1):
-        mid = int((t_low + t_high) / 2)
+def count_ways(time, dist):
+    disc = time * time - 4 * dist
+    if disc <= 0:
+        return 0
 
-        # Figure out which way is best and descend the gradient toward the crossover point
-        mid_low = int((t_low + mid) / 2)
-        dist_low = calc_dist(race, mid_low)
-        diff_low = abs(dist_low - race['dist'])
-        if diff_low == 0:
-            mid = mid_low
-            break
+    # isqrt() rounds down, so this is at or just below the lowest winning time
+    low = (time - math.isqrt(disc)) // 2
+    while 2 * low <= time and low * (time - low) <= dist:
+        low += 1
 
-        mid_high = int((t_high + mid) / 2)
-        dist_high = calc_dist(race, mid_high)
-        diff_high = abs(dist_high - race['dist'])
-        if diff_high == 0:
-            mid = mid_high
-            break
+    # Winning times are symmetric about time / 2
+    return max(0, time - 2 * low + 1)
 
-        if diff_low < diff_high:
-            t_high = mid
-        else:
-            t_low = mid
-
-    return t_low
-
-# Read race data
-with open(fn, 'r') as file:
+#
+# Main processing. Return number of time values that set a record.
+#
+def main(file):
     # Read list of times
     line = file.readline()
     line = re.sub('\s+', '', line)
@@ -76,32 +67,11 @@ with open(fn, 'r') as file:
     matches = re.findall(r'\d+', line)
     dist = int(matches[0])
 
-    race = { 'time': tm, 'dist': dist }
-
-    t_low = 0
-    tm = race['time']
-
-    # Find low crossover point
-    n1 = find_crossover(race, 0, int(tm / 2))
-
-    # Find high crossover point
-    n2 = find_crossover(race, int(tm / 2), tm)
-
-    # We might be off by one, but we'll do 5 just in case. Look for exact record points.
-    chk1 = n1-5
-    while True:
-        dist = calc_dist(race, chk1)
-        if dist > race['dist']:
-            break
-        chk1 += 1
-
-    chk2 = n2+5
-    while True:
-        dist = calc_dist(race, chk2)
-        if dist > race['dist']:
-            break
-        chk2 -= 1
-    chk2 += 1
+    with instrument.phase('solve'):
+        return count_ways(tm, dist)
 
-    # Answer is the difference
-    print(f"Number of record setting time values: {chk2 - chk1}")
+if __name__ == '__main__':
+    # Read race data
+    with open(fn, 'r') as file:
+        count = main(file)
+    print(f"Number of record setting time values: {count}")
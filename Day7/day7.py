@@ -15,10 +15,15 @@ See test.dat for sample data and cards.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
 from enum import Enum
 from functools import cmp_to_key
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument, stream
+
 fn = 'test.dat'
 fn = 'cards.dat'
 
@@ -80,20 +85,66 @@ def calc(hand_list, jokers):
     # Card rank varies whether it has Jokers or Jacks
     card_ranks = '123456789TJQKA' if not jokers else 'J123456789TQKA'
 
-    for hand in hand_list:
-        hand['type'] = get_hand_type(hand['cards'], jokers)
+    with instrument.phase('classify'):
+        for hand in hand_list:
+            hand['type'] = get_hand_type(hand['cards'], jokers)
+    instrument.count('hands classified', len(hand_list))
 
     # Sort hands by strength
     # Sort by hand strength, then by each card in order
     sort_order = lambda hand: [0-hand['type'].value] + [card_ranks.index(c) for c in hand['cards']]
-    hand_list.sort(key=sort_order)
+    with instrument.phase('sort'):
+        hand_list.sort(key=sort_order)
 
     # Calculate total winnings
     return sum(hand['bid'] * (i+1) for i, hand in enumerate(hand_list))
 
-hand_list = [ { 'cards': cards, 'bid': int(bid) } for cards, bid in
-    (re.findall(r'(\w{5}) (\d+)', line)[0] for line in open(fn, 'r')) ]
-
-print(f"Part 1: total winnings is {calc(hand_list.copy(), jokers=False)}")
-print(f"Part 2: total winnings is {calc(hand_list.copy(), jokers=True)}")
+# Read list of hands and bids
+def read_hands(lines):
+    with instrument.phase('parse'):
+        return [ { 'cards': cards, 'bid': int(bid) } for cards, bid in
+            (re.findall(r'(\w{5}) (\d+)', line)[0] for line in lines) ]
 
+#
+# Running total winnings, adding one hand at a time (see aoc/stream.py). Ranks
+# aren't known until every hand is in, so hands are grouped by their cards,
+# of which there are at most 13^5 different ones however long the input is.
+# Each group keeps its number of hands, total bid, and total of each bid times
+# its position in the group, which is its rank within the group after a stable
+# sort. result() sorts the groups to finish the total.
+#
+class Winnings:
+    def __init__(self, jokers):
+        self.jokers = jokers
+        self.groups = { }
+
+    def __repr__(self):
+        return f"Winnings(jokers={self.jokers}: {len(self.groups)} different hands)"
+
+    def add(self, line):
+        cards, bid = re.findall(r'(\w{5}) (\d+)', line)[0]
+        bid = int(bid)
+        group = self.groups.get(cards)
+        if group == None:
+            group = self.groups[cards] = [0, 0, 0]
+        group[0] += 1
+        group[1] += bid
+        group[2] += bid * group[0]
+
+    def result(self):
+        card_ranks = '123456789TJQKA' if not self.jokers else 'J123456789TQKA'
+        sort_order = lambda cards: [0-get_hand_type(cards, self.jokers).value] + [card_ranks.index(c) for c in cards]
+
+        total = 0
+        num_lower = 0
+        for cards in sorted(self.groups, key=sort_order):
+            num_hands, bids, ranked_bids = self.groups[cards]
+            total += num_lower * bids + ranked_bids
+            num_lower += num_hands
+        return total
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total1, total2 = stream.fold_all([ Winnings(jokers=False), Winnings(jokers=True) ], stream.iter_records(file))
+    print(f"Part 1: total winnings is {total1}")
+    print(f"Part 2: total winnings is {total2}")
@@ -11,23 +11,28 @@ See test.dat for sample data and nav.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'nav.dat'
 
-def main():
+def main(file):
     # Read card hands and build list with classification
     node_map = { }
-    with open(fn, 'r') as file:
 
-        # Get list of left/right movement
-        movement = file.readline()
-        movement = movement.rstrip('\n')
+    # Get list of left/right movement
+    movement = file.readline()
+    movement = movement.rstrip('\n')
 
-        # Read node maps, after skipping blank line
-        line = file.readline()
-        line = file.readline()
+    # Read node maps, after skipping blank line
+    line = file.readline()
+    line = file.readline()
+    with instrument.phase('parse'):
         while (line):
             matches = re.findall(r'(\w\w\w) = .(\w+), (\w+)', line)
             node_map[matches[0][0]] = { 'left': matches[0][1], 'right': matches[0][2] }
@@ -35,17 +40,20 @@ def main():
 
     steps = 0
     cur_node = 'AAA'
-    while True:
-        for dir in movement:
-            steps += 1
-            if (dir == 'L'):
-                cur_node = node_map[cur_node]['left']
-            else:
-                cur_node = node_map[cur_node]['right']
-
-            if (cur_node == 'ZZZ'):
-                return steps
-
-
-steps = main()
-print(f"Number of steps is {steps}")
+    with instrument.phase('walk'):
+        while True:
+            for dir in movement:
+                steps += 1
+                if (dir == 'L'):
+                    cur_node = node_map[cur_node]['left']
+                else:
+                    cur_node = node_map[cur_node]['right']
+
+                if (cur_node == 'ZZZ'):
+                    instrument.count('nodes visited', steps)
+                    return steps
+
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        steps = main(file)
+    print(f"Number of steps is {steps}")
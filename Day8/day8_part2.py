@@ -17,26 +17,35 @@ See test2.dat for sample data and nav.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
 import math
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test2.dat'
 fn = 'nav.dat'
 
-def main():
+#
+# Walk all the paths at once. Returns the number of steps if they all reach a
+# Z node together within 100K steps, otherwise the steps at which each start
+# node's path reached a Z node.
+#
+def main(file):
     # Read card hands and build list with classification
     node_map = { }
     start_nodes = []
 
-    with open(fn, 'r') as file:
-
-        # Get list of left/right movement
-        movement = file.readline()
-        movement = movement.rstrip('\n')
+    # Get list of left/right movement
+    movement = file.readline()
+    movement = movement.rstrip('\n')
 
-        # Read node maps, after skipping blank line
-        line = file.readline()
-        line = file.readline()
+    # Read node maps, after skipping blank line
+    line = file.readline()
+    line = file.readline()
+    with instrument.phase('parse'):
         while (line):
             matches = re.findall(r'(\w\w\w) = .(\w+), (\w+)', line)
             node = matches[0][0]
@@ -53,59 +62,77 @@ def main():
     for node in start_nodes:
         cycle_list[node] = []
 
-    while True:
-        for dir in movement:
-            z_count = 0
-            steps += 1
-            # After 100K steps, terminate and figure out the patterns. In theory
-            # we could terminate after accumulating enough cycle data.
-            if (steps % 100000 == 0):
-                return cycle_list
-
-            for idx in range(len(cur_nodes)):
-                cur_node = cur_nodes[idx]
-
-                if (dir == 'L'):
-                    cur_node = node_map[cur_node]['left']
-                else:
-                    cur_node = node_map[cur_node]['right']
-                cur_nodes[idx] = cur_node
-
-                if cur_node[-1] == 'Z':
-                    z_count += 1
-                    cycle_list[start_nodes[idx]].append(steps)
-
-            # If it was practical to run the whole thing, this would terminate with
-            # the answer
-            if z_count == len(start_nodes):
-                print(f"Number of steps is {steps}")
-                exit(0)
-
-
-# For this narrow solution, we just get the cycles
-cycle_list = main()
-
-# Verify cycles are consistent and accumulate difference values
-diff_list = { }
-for node, cycles in cycle_list.items():
-    last_num = 0
-    last_diff = -1
-    for num in cycles:
-        diff = num - last_num
-        last_num = num
-        if (last_diff > 0 and diff != last_diff):
-            raise Exception(f"ERROR: last_diff was {last_diff}, diff was {diff}")
-        last_diff = diff
-
-    diff_list[node] = last_diff
-
-# Calculate Least Common Multiple of difference values for shortcut to number of steps
-diff_values = list(diff_list.values())
-cur_num = diff_values[0]
-for idx in range(1, len(diff_list)):
-    next_num = diff_values[idx]
-    lcm = (cur_num * next_num) / math.gcd(cur_num, next_num)
-    cur_num = int(lcm)
-
-steps = cur_num
-print(f"Number of steps is {steps}")
+    with instrument.phase('walk'):
+        while True:
+            for dir in movement:
+                z_count = 0
+                steps += 1
+                # After 100K steps, terminate and figure out the patterns. In theory
+                # we could terminate after accumulating enough cycle data.
+                if (steps % 100000 == 0):
+                    instrument.count('nodes visited', (steps - 1) * len(cur_nodes))
+                    return cycle_list
+
+                for idx in range(len(cur_nodes)):
+                    cur_node = cur_nodes[idx]
+
+                    if (dir == 'L'):
+                        cur_node = node_map[cur_node]['left']
+                    else:
+                        cur_node = node_map[cur_node]['right']
+                    cur_nodes[idx] = cur_node
+
+                    if cur_node[-1] == 'Z':
+                        z_count += 1
+                        cycle_list[start_nodes[idx]].append(steps)
+
+                # If it was practical to run the whole thing, this would terminate with
+                # the answer
+                if z_count == len(start_nodes):
+                    instrument.count('nodes visited', steps * len(cur_nodes))
+                    return steps
+
+#
+# Calculate number of steps from the cycles of each start node
+#
+def calc_steps(cycle_list):
+    # Verify cycles are consistent and accumulate difference values
+    diff_list = { }
+    for node, cycles in cycle_list.items():
+        last_num = 0
+        last_diff = -1
+        for num in cycles:
+            diff = num - last_num
+            last_num = num
+            if (last_diff > 0 and diff != last_diff):
+                raise Exception(f"ERROR: last_diff was {last_diff}, diff was {diff}")
+            last_diff = diff
+
+        diff_list[node] = last_diff
+
+    # Calculate Least Common Multiple of difference values for shortcut to number of steps
+    diff_values = list(diff_list.values())
+    cur_num = diff_values[0]
+    for idx in range(1, len(diff_list)):
+        next_num = diff_values[idx]
+        lcm = (cur_num * next_num) / math.gcd(cur_num, next_num)
+        cur_num = int(lcm)
+
+    return cur_num
+
+#
+# Number of steps, straight from the walk if every path reached a Z node at
+# once, otherwise from the cycles it found
+#
+def get_steps(file):
+    result = main(file)
+    if isinstance(result, int):
+        return result
+    return calc_steps(result)
+
+if __name__ == '__main__':
+    # For this narrow solution, we usually just get the cycles
+    with open(fn, 'r') as file:
+        steps = get_steps(file)
+
+    print(f"Number of steps is {steps}")
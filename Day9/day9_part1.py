@@ -14,8 +14,13 @@ See test.dat for sample data and porert.dat for full data.
 Author: Tim Behrendsen
 """
 
+import os
+import sys
 import re
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aoc import instrument
+
 fn = 'test.dat'
 fn = 'test2.dat'
 fn = 'report.dat'
@@ -41,6 +46,7 @@ def predict(seq):
     print(seq_list)
     seq_list[-1].append(0)
     print(seq_list)
+    instrument.count('difference rows', len(seq_list)-1)
 
     for idx in range(len(seq_list)-2, -1, -1):
         prior_seq = seq_list[idx+1]
@@ -51,22 +57,43 @@ def predict(seq):
 
     return seq_list[0][-1]
 
-def main():
+#
+# Running total of extrapolated values, adding one sequence (line) at a time
+# (see aoc/stream.py)
+#
+class Extrapolation:
+    def __init__(self):
+        self.total = 0
+        self.num_seqs = 0
+
+    def __repr__(self):
+        return f"Extrapolation({self.total} from {self.num_seqs} sequences)"
+
+    def add(self, line):
+        seq = re.findall(r'-?\d+', line)
+        seq = [ int(item) for item in seq ]
+        print(seq)
+
+        # Get the next sequence and total it up
+        new_seq = predict(seq)
+        print(f"New sequence is {new_seq}")
+        self.total += new_seq
+        self.num_seqs += 1
+
+    def result(self):
+        return self.total
+
+def main(file):
     # Read each list of numbers and calculate the predicted next number
-    node_map = { }
-    total = 0
-    with open(fn, 'r') as file:
+    extrapolation = Extrapolation()
+    with instrument.phase('predict'):
         for line in file:
-            seq = re.findall(r'-?\d+', line)
-            seq = [ int(item) for item in seq ]
-            print(seq)
+            extrapolation.add(line)
 
-            # Get the next sequence and total it up
-            new_seq = predict(seq)
-            print(f"New sequence is {new_seq}")
-            total += new_seq
+    instrument.count('sequences', extrapolation.num_seqs)
+    return extrapolation.result()
 
-    return total
-
-total = main()
-print(f"Total extrapolated values is {total}")
+if __name__ == '__main__':
+    with open(fn, 'r') as file:
+        total = main(file)
+    print(f"Total extrapolated values is {total}")
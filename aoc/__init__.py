@@ -0,0 +1,14 @@
+"""Advent of Code 2023 solutions as a package
+
+Wraps each day's script behind a common API so solvers can be imported, timed
+and called more than once in the same process:
+
+    from aoc import solve, read_input
+    solve(17, 2, read_input(17, 2))
+
+Or from the command line:
+
+    python -m aoc run 17 --part 2 --input map.dat
+"""
+
+from .runner import solve, run, read_input, get_solver, all_solvers
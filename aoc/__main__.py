@@ -0,0 +1,303 @@
+"""Advent of Code 2023 command line
+
+    python -m aoc list
+    python -m aoc run 17
+    python -m aoc run 17 --part 2 --input test.dat
+    python -m aoc run 1 --mapped --input big.dat
+    python -m aoc run 1 --mapped --jobs 8 --input big.dat
+    python -m aoc run 22 --profile --trace trace.json
+    python -m aoc run 23 --part 1 --mem-profile
+    python -m aoc run --all --jobs 8
+    cat big.dat | python -m aoc stream 1 --every 1000000
+    python -m aoc gen 17 40 -o big.dat
+    python -m aoc bench 1 2 17 --repeat 5
+    python -m aoc bench --save-baseline
+    python -m aoc bench compare
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from . import runner, generate, bench, parallel, instrument, stream
+
+def cmd_list(args):
+    for solver in runner.all_solvers():
+        streams = '  (stream)' if solver.fold != None else ''
+        print(f"Day {solver.day:2}, part {solver.part}: {solver.script}{streams}")
+    return 0
+
+def cmd_run(args):
+    if args.all:
+        return run_all(args)
+    if args.day == None:
+        print("Give a day to run, or --all", file=sys.stderr)
+        return 1
+
+    parts = [ args.part ] if args.part else runner.get_parts(args.day)
+    if args.mapped and not args.part:
+        parts = [ s.part for s in runner.all_solvers() if s.day == args.day and s.mapped != None ]
+    if not parts:
+        mode = 'large input (--mapped) mode' if args.mapped else 'solver'
+        print(f"No {mode} for day {args.day}", file=sys.stderr)
+        return 1
+
+    reports = { }
+    events = []
+    for part in parts:
+        instrument.reset()
+        with runner.time_limit(args.timeout):
+            if args.mapped:
+                try:
+                    answer, elapsed = runner.run_mapped(args.day, part, args.input, args.verbose, args.jobs)
+                except KeyError as e:
+                    print(e.args[0], file=sys.stderr)
+                    return 1
+            else:
+                answer, elapsed = runner.run(args.day, part, args.input, args.verbose)
+        print(f"Day {args.day}, part {part}: {answer} ({elapsed:.3f}s)")
+
+        if instrument.enabled:
+            key = runner.Solver.make_key(args.day, part)
+            reports[key] = instrument.get_report()
+            events += instrument.get_trace_events(os.getpid(), part, f"Day {args.day} part {part}")
+            if args.profile or args.mem_profile:
+                print(instrument.format_report(reports[key]))
+
+    save_instrument(args, reports, events)
+    return 0
+
+#
+# Write the phase reports and trace events asked for by --report and --trace
+#
+def save_instrument(args, reports, events):
+    if args.report:
+        instrument.save_report(reports, args.report)
+        print(f"Phase report written to {args.report}")
+    if args.trace:
+        instrument.save_trace(events, args.trace)
+        print(f"Trace written to {args.trace}")
+
+def run_all(args):
+    def report(r):
+        answer = r['answer'] if r['status'] == 'ok' else r['status']
+        print(f"Day {r['day']}, part {r['part']}: {answer} ({r['elapsed']:.3f}s)", flush=True)
+        if (args.profile or args.mem_profile) and 'instrument' in r:
+            print(instrument.format_report(r['instrument']), flush=True)
+
+    timeout = args.timeout if args.timeout != None else parallel.DEFAULT_TIMEOUT
+    start = time.perf_counter()
+    results = parallel.run_all(jobs=args.jobs, timeout=timeout, report=report)
+    wall = time.perf_counter() - start
+
+    # Summary table
+    print()
+    print(f"{'Day':>3} {'Part':>4}  {'Status':8} {'Time':>9}  Answer")
+    for r in results:
+        status = r['status'].split(':')[0]
+        answer = r['answer'] if r['answer'] != None else ''
+        print(f"{r['day']:3} {r['part']:4}  {status:8} {r['elapsed']:8.3f}s  {answer}")
+
+    total = sum(r['elapsed'] for r in results)
+    failed = sum(r['status'] != 'ok' for r in results)
+    print(f"\n{len(results)} solvers, {failed} failed or timed out. "
+        f"Solver time {total:.1f}s, wall time {wall:.1f}s with {args.jobs or os.cpu_count()} jobs.")
+
+    if instrument.enabled:
+        reports = { runner.Solver.make_key(r['day'], r['part']): r['instrument'] for r in results if 'instrument' in r }
+        events = [ e for r in results for e in r.get('trace', []) ]
+        save_instrument(args, reports, events)
+    return 1 if failed else 0
+
+#
+# Solve a day from stdin or a file read in chunks, both parts in one pass.
+# Partial answers go to stderr, so stdout only has the final ones.
+#
+def cmd_stream(args):
+    parts = [ args.part ] if args.part else [ s.part for s in runner.all_solvers() if s.day == args.day and s.fold != None ]
+    if not parts:
+        print(f"No streaming mode for day {args.day}", file=sys.stderr)
+        return 1
+
+    def report(count, answers):
+        partial = ', '.join(f"part {part}: {answer}" for part, answer in zip(parts, answers))
+        print(f"  {count:,} records, {partial}", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    try:
+        if args.input == None or args.input == '-':
+            answers = runner.solve_stream(args.day, parts, sys.stdin, args.chunk_size, args.every, report, args.verbose)
+        else:
+            with open(args.input, 'r') as file:
+                answers = runner.solve_stream(args.day, parts, file, args.chunk_size, args.every, report, args.verbose)
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    for part, answer in zip(parts, answers):
+        print(f"Day {args.day}, part {part}: {answer} ({elapsed:.3f}s)")
+    return 0
+
+def cmd_gen(args):
+    data = generate.generate(args.day, args.size, args.seed)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(data)
+    else:
+        sys.stdout.write(data)
+    return 0
+
+def cmd_bench(args):
+    if args.days and args.days[0] == 'compare':
+        return bench_compare(args, parse_days(args.days[1:]))
+
+    days = parse_days(args.days) or sorted(set(s.day for s in runner.all_solvers()))
+    b = bench.Bench(repeat=args.repeat or 3, timeout=args.timeout, seed=args.seed)
+    try:
+        for day in days:
+            parts = [ args.part ] if args.part else runner.get_parts(day)
+            for part in parts:
+                if not args.no_puzzle:
+                    b.run_puzzle(day, part)
+                if not args.no_synthetic:
+                    b.run_sweep(day, part, args.sizes)
+    finally:
+        b.close()
+
+    path = bench.save_report(b.get_report(), args.output)
+    print(f"Results written to {path}")
+    if args.save_baseline:
+        path = bench.save_report(b.get_report(), args.baseline)
+        print(f"Baseline written to {path}")
+    return 0
+
+#
+# Re-run the baseline's cases and compare. Fails if any case got
+# significantly slower, stopped working or changed its answer.
+#
+def bench_compare(args, days):
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, make one with: python -m aoc bench --save-baseline", file=sys.stderr)
+        return 1
+
+    baseline = bench.load_report(args.baseline)
+    b = bench.Bench(repeat=args.repeat or baseline['repeat'], timeout=args.timeout, seed=baseline['seed'])
+    if baseline['platform'] != b.get_report()['platform'] or baseline['python'] != b.get_report()['python']:
+        print(f"Warning: baseline is from Python {baseline['python']} on {baseline['platform']}", file=sys.stderr)
+    if baseline.get('parse_cache') != b.get_report()['parse_cache']:
+        print(f"Warning: baseline was run with the parse cache {baseline.get('parse_cache', 'on')}, "
+            "so its times may include or skip parsing", file=sys.stderr)
+
+    try:
+        b.run_cases_of(baseline, days, args.part)
+    finally:
+        b.close()
+
+    report = b.get_report()
+    path = bench.save_report(report, args.output)
+    print(f"Results written to {path}\n")
+
+    comps = bench.compare_reports(baseline, report, args.min_slowdown, args.max_z, args.min_mem_growth)
+    print(f"Compared with baseline from {baseline['created']}:")
+    for comp in comps:
+        print(bench.format_comparison(comp))
+
+    regressions = [ c for c in comps if c['verdict'] in bench.REGRESSIONS ]
+    print(f"\n{len(comps)} cases, {len(regressions)} regressions.")
+    return 1 if regressions else 0
+
+def parse_days(days):
+    try:
+        return [ int(day) for day in days ]
+    except ValueError:
+        raise SystemExit(f"Bad day in: {' '.join(days)}")
+
+def parse_sizes(s):
+    return [ int(n) for n in s.split(',') ]
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='python -m aoc', description='Advent of Code 2023 runner')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('list', help='list available solvers')
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser('run', help='run a day, or one part of a day')
+    p.add_argument('day', type=int, nargs='?')
+    p.add_argument('--part', type=int, choices=(1, 2))
+    p.add_argument('--input', help="input file, defaults to the day's full puzzle data")
+    p.add_argument('--verbose', action='store_true', help="show the solver's own output")
+    p.add_argument('--timeout', type=float,
+        help=f'seconds allowed per solver, 0 for no limit (default none, or {parallel.DEFAULT_TIMEOUT} with --all)')
+    p.add_argument('--all', action='store_true', help='run every solver on its puzzle data, in parallel')
+    p.add_argument('--mapped', action='store_true',
+        help='solve from the input file with the large input solver, for the days that have one: '
+            'memory mapped for Days 1 and 3, NumPy batches of the parsed input for Days 4 and 5')
+    p.add_argument('--jobs', type=int,
+        help='worker processes for --all (defaults to the CPU count), or to split the file with --mapped')
+    p.add_argument('--no-cache', action='store_true', help='parse the input every time, without the parse cache')
+    p.add_argument('--profile', action='store_true', help='show time spent in each phase, and counters')
+    p.add_argument('--report', help='write the phase times and counters to a JSON file')
+    p.add_argument('--trace', help='write the phases as a Chrome trace event file')
+    p.add_argument('--mem-profile', action='store_true',
+        help='also trace memory: peak, RSS and top allocation sites of each phase (slows solvers down)')
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser('stream', help='solve a line-oriented day from stdin or a file, in bounded memory')
+    p.add_argument('day', type=int)
+    p.add_argument('--part', type=int, choices=(1, 2))
+    p.add_argument('--input', help="input file read in chunks, defaults to stdin ('-')")
+    p.add_argument('--chunk-size', type=int, default=stream.CHUNK_SIZE,
+        help=f'characters read at a time (default {stream.CHUNK_SIZE})')
+    p.add_argument('--every', type=int, help='show partial answers every this many records')
+    p.add_argument('--verbose', action='store_true', help="show the solver's own output")
+    p.set_defaults(func=cmd_stream)
+
+    p = sub.add_parser('gen', help='generate synthetic input for a day')
+    p.add_argument('day', type=int, choices=sorted(generate.GENERATORS))
+    p.add_argument('size', type=int, help='size of the input, in units for that day (see bench output)')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-o', '--output', help='output file, defaults to stdout')
+    p.set_defaults(func=cmd_gen)
+
+    p = sub.add_parser('bench', help='benchmark days on puzzle data and a sweep of synthetic sizes',
+        usage='%(prog)s [compare] [days ...] [options]')
+    p.add_argument('days', nargs='*',
+        help="days to run, defaults to all. Start with 'compare' to re-run the baseline's cases and compare.")
+    p.add_argument('--part', type=int, choices=(1, 2))
+    p.add_argument('--sizes', type=parse_sizes, help="comma separated synthetic sizes, overriding each day's sweep")
+    p.add_argument('--repeat', type=int,
+        help="runs per input, median is reported (default 3, or the baseline's for compare)")
+    p.add_argument('--timeout', type=float, default=60, help='seconds allowed per run (default 60)')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--no-puzzle', action='store_true', help='skip the puzzle data')
+    p.add_argument('--no-synthetic', action='store_true', help='skip the synthetic sweep')
+    p.add_argument('-o', '--output', help='JSON results file, defaults to benchmarks/bench-<time>.json')
+    p.add_argument('--save-baseline', action='store_true', help='also store the results as the baseline')
+    p.add_argument('--baseline', default=bench.BASELINE_PATH, help='baseline file (default benchmarks/baseline.json)')
+    p.add_argument('--min-slowdown', type=float, default=bench.MIN_SLOWDOWN,
+        help=f'fraction slower than the baseline that counts as a regression (default {bench.MIN_SLOWDOWN})')
+    p.add_argument('--max-z', type=float, default=bench.MAX_Z,
+        help=f'robust z score above which a slowdown is significant (default {bench.MAX_Z})')
+    p.add_argument('--min-mem-growth', type=float, default=bench.MIN_MEM_GROWTH,
+        help=f'fraction more memory than the baseline that counts as a regression (default {bench.MIN_MEM_GROWTH})')
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+def main(argv = None):
+    args = make_parser().parse_args(argv)
+
+    # Set in the environment so worker processes see it too
+    if getattr(args, 'no_cache', False):
+        os.environ['AOC_PARSE_CACHE'] = '0'
+    if getattr(args, 'profile', False) or getattr(args, 'report', None) or getattr(args, 'trace', None):
+        instrument.enable()
+    if getattr(args, 'mem_profile', False):
+        instrument.enable_memory()
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
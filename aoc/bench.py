@@ -0,0 +1,320 @@
+"""Advent of Code 2023, benchmark harness
+
+Runs solvers on their puzzle data and across a sweep of synthetic input sizes,
+reporting wall time, peak RSS and throughput. Every run happens in a fresh
+process, so peak RSS belongs to that run alone and solvers can't warm each
+other's caches. The parse cache (see cache.py) is turned off in the runs, so
+every run parses its input, and whether a run is timed cold or warm never
+depends on cache files left by earlier runs. The report records this as
+"parse_cache": "off". The RSS of the process before solving (interpreter plus
+the loaded script) is recorded as base_rss_kb.
+
+Results are written as JSON so runs can be compared over time:
+
+    {
+        "created": "...", "python": "3.11.7", "platform": "...", "seed": 0,
+        "parse_cache": "off",
+        "results": [
+            { "day": 17, "part": 2, "input": "synthetic", "size": 40,
+              "unit": "grid width", "bytes": 1640, "status": "ok",
+              "answer": "...", "runs": [ ... ], "wall": ..., "peak_rss_kb": ...,
+              "base_rss_kb": ..., "throughput": ..., "bytes_per_sec": ... },
+            ...
+        ]
+    }
+
+A report can be stored as the baseline (benchmarks/baseline.json), and later
+runs compared against it. Each case is re-run on the same input (the
+synthetic ones regenerated from the baseline's seed), and its wall times
+compared with the baseline's using the median and the median absolute
+deviation (MAD), which a single slow run can't throw off. A case is flagged
+as slower when its median is both MIN_SLOWDOWN slower than the baseline and
+more than MAX_Z robust standard deviations away from it, so the gate
+tolerates the ordinary noise of both runs. A case that used to pass and now
+fails, or gives a different answer, is flagged too, as is one whose memory
+(peak RSS above the RSS before solving) grew by more than MIN_MEM_GROWTH.
+"""
+
+import os
+import json
+import time
+import datetime
+import platform
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from . import runner, instrument
+from .generate import GENERATORS, generate
+
+# Default place for results
+BENCH_DIR = os.path.join(runner.ROOT, 'benchmarks')
+
+# Stored report that 'bench compare' checks against
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# A slowdown is significant when the median is at least this fraction slower
+# than the baseline, and more than MAX_Z robust standard deviations from it
+MIN_SLOWDOWN = 0.10
+MAX_Z = 3.0
+
+# Scale from MAD to standard deviation, for normally distributed times
+MAD_SCALE = 1.4826
+
+# Seconds of timing noise always allowed for, since a few runs can easily have
+# a MAD of zero
+NOISE_FLOOR = 0.002
+
+# Memory of a case is significant when it grows by at least this fraction
+# over the baseline, plus MEM_NOISE_KB for the page-level noise in RSS
+MIN_MEM_GROWTH = 0.25
+MEM_NOISE_KB = 2048
+
+# Comparison verdicts that fail the gate
+REGRESSIONS = ('slower', 'more memory', 'failed', 'answer changed')
+
+#
+# Solve once and measure. Runs in a fresh worker process, with the parse cache
+# off.
+#
+def measure(day, part, data, timeout):
+    os.environ['AOC_PARSE_CACHE'] = '0'
+
+    # Load the script first so import time isn't counted
+    runner.load_module(runner.get_solver(day, part).script)
+
+    result = { 'status': 'ok', 'answer': None,
+        'base_rss_kb': instrument.get_peak_rss_kb() }
+    start = time.perf_counter()
+    try:
+        with runner.time_limit(timeout):
+            result['answer'] = str(runner.solve(day, part, data))
+    except TimeoutError:
+        result['status'] = 'timeout'
+    except (Exception, SystemExit) as e:
+        result['status'] = f"error: {type(e).__name__}: {e}"
+
+    result['wall'] = time.perf_counter() - start
+    result['peak_rss_kb'] = instrument.get_peak_rss_kb()
+    return result
+
+#
+# Class to run benchmark cases, each run in its own process
+#
+class Bench:
+    def __init__(self, repeat = 3, timeout = 60, seed = 0, report = print):
+        self.repeat = repeat
+        self.timeout = timeout
+        self.seed = seed
+        self.report = report
+        self.results = []
+
+        # A new process for each run
+        self.executor = ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1,
+            mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self):
+        self.executor.shutdown()
+
+    #
+    # Run one day/part on one input 'repeat' times, and record the result
+    #
+    def run_case(self, day, part, data, input_type, size = None, unit = None):
+        runs = []
+        for _ in range(self.repeat):
+            run = self.executor.submit(measure, day, part, data, self.timeout).result()
+            runs.append(run)
+            if run['status'] != 'ok':
+                break
+
+        walls = [ run['wall'] for run in runs ]
+        wall = statistics.median(walls)
+        result = {
+            'day': day, 'part': part, 'input': input_type, 'size': size, 'unit': unit,
+            'bytes': len(data), 'status': runs[-1]['status'], 'answer': runs[-1]['answer'],
+            'runs': walls, 'wall': wall,
+            'peak_rss_kb': None if runs[0]['peak_rss_kb'] == None else max(run['peak_rss_kb'] for run in runs),
+            'base_rss_kb': None if runs[0]['base_rss_kb'] == None else min(run['base_rss_kb'] for run in runs),
+            'throughput': size / wall if size and wall else None,
+            'bytes_per_sec': len(data) / wall if wall else None,
+        }
+        self.results.append(result)
+        self.report(format_result(result))
+        return result
+
+    #
+    # Benchmark the puzzle data for a day/part
+    #
+    def run_puzzle(self, day, part):
+        return self.run_case(day, part, runner.read_input(day, part), 'puzzle')
+
+    #
+    # Benchmark a day/part across a sweep of synthetic input sizes. Larger
+    # sizes are skipped once a size fails or times out.
+    #
+    def run_sweep(self, day, part, sizes = None):
+        gen = GENERATORS.get(day)
+        if gen == None:
+            return []
+
+        results = []
+        for size in sizes or gen.sizes:
+            data = generate(day, size, self.seed)
+            result = self.run_case(day, part, data, 'synthetic', size, gen.unit)
+            results.append(result)
+            if result['status'] != 'ok':
+                break
+        return results
+
+    #
+    # Re-run the cases of an earlier report on the same inputs. Synthetic
+    # inputs are regenerated, so this bench should have the report's seed.
+    # 'days' and 'part' limit the cases run.
+    #
+    def run_cases_of(self, report, days = None, part = None):
+        results = []
+        for case in report['results']:
+            if (days and case['day'] not in days) or (part and case['part'] != part):
+                continue
+
+            if case['input'] == 'puzzle':
+                results.append(self.run_puzzle(case['day'], case['part']))
+            else:
+                data = generate(case['day'], case['size'], self.seed)
+                results.append(self.run_case(case['day'], case['part'], data,
+                    case['input'], case['size'], case['unit']))
+        return results
+
+    #
+    # Everything needed to save or compare this run
+    #
+    def get_report(self):
+        return {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': self.seed,
+            'parse_cache': 'off',
+            'repeat': self.repeat,
+            'results': self.results,
+        }
+
+#
+# One line summary of a benchmark result
+#
+def format_result(result):
+    label = 'puzzle data' if result['input'] == 'puzzle' else f"{result['size']} {result['unit']}"
+    s = f"Day {result['day']:2}, part {result['part']}  {label:28} "
+    if result['status'] != 'ok':
+        return s + result['status']
+
+    s += f"{result['wall']:9.4f}s"
+    if result['peak_rss_kb'] != None:
+        s += f"  {result['peak_rss_kb'] / 1024:7.1f} MB"
+    if result['throughput']:
+        s += f"  {result['throughput']:12.1f} {result['unit']}/s"
+    return s
+
+#
+# Write report as JSON. Default is a timestamped file in the benchmarks directory.
+#
+def save_report(report, path = None):
+    if path is None:
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(BENCH_DIR, f"bench-{stamp}.json")
+
+    # The directory may not exist yet on a fresh clone (benchmarks/baseline.json)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+    return path
+
+def load_report(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def get_case_key(result):
+    return (result['day'], result['part'], result['input'], result['size'])
+
+def median_abs_dev(values):
+    mid = statistics.median(values)
+    return statistics.median(abs(v - mid) for v in values)
+
+#
+# Memory used by a result's solve, above the interpreter and loaded script, or
+# None if RSS wasn't available
+#
+def get_solve_mem_kb(result):
+    if result['peak_rss_kb'] == None or result['base_rss_kb'] == None:
+        return None
+    return result['peak_rss_kb'] - result['base_rss_kb']
+
+#
+# Compare a result with the baseline result for the same case. Returns a dict
+# with both medians, the ratio and robust z score of the difference, both
+# memory figures, and a verdict: 'slower', 'more memory' (not slower, but
+# memory grew), 'faster', 'same', 'failed' (failed now but not in the
+# baseline), 'answer changed', 'fixed' (failed in the baseline only),
+# 'still failing' or 'new' (no baseline).
+#
+def compare_result(base, result, min_slowdown = MIN_SLOWDOWN, max_z = MAX_Z, min_mem_growth = MIN_MEM_GROWTH):
+    comp = { 'day': result['day'], 'part': result['part'], 'input': result['input'],
+        'size': result['size'], 'unit': result['unit'], 'base_wall': None,
+        'wall': result['wall'], 'ratio': None, 'z': None, 'base_mem_kb': None,
+        'mem_kb': get_solve_mem_kb(result), 'verdict': 'same' }
+
+    if base == None:
+        comp['verdict'] = 'new'
+        return comp
+
+    comp['base_wall'] = base['wall']
+    if base['status'] != 'ok':
+        comp['verdict'] = 'fixed' if result['status'] == 'ok' else 'still failing'
+        return comp
+    if result['status'] != 'ok':
+        comp['verdict'] = 'failed'
+        return comp
+    if result['answer'] != base['answer']:
+        comp['verdict'] = 'answer changed'
+        return comp
+
+    base_med, cur_med = statistics.median(base['runs']), statistics.median(result['runs'])
+    spread = MAD_SCALE * (median_abs_dev(base['runs']) ** 2 + median_abs_dev(result['runs']) ** 2) ** 0.5
+    comp['ratio'] = cur_med / base_med if base_med else None
+    comp['z'] = (cur_med - base_med) / (spread + NOISE_FLOOR)
+
+    if cur_med > base_med * (1 + min_slowdown) and comp['z'] > max_z:
+        comp['verdict'] = 'slower'
+    elif cur_med * (1 + min_slowdown) < base_med and comp['z'] < -max_z:
+        comp['verdict'] = 'faster'
+
+    comp['base_mem_kb'] = get_solve_mem_kb(base)
+    if comp['mem_kb'] == None or comp['base_mem_kb'] == None:
+        return comp
+    if comp['verdict'] != 'slower' and comp['mem_kb'] > comp['base_mem_kb'] * (1 + min_mem_growth) + MEM_NOISE_KB:
+        comp['verdict'] = 'more memory'
+    return comp
+
+#
+# Compare every result of a report with its case in the baseline
+#
+def compare_reports(baseline, report, min_slowdown = MIN_SLOWDOWN, max_z = MAX_Z, min_mem_growth = MIN_MEM_GROWTH):
+    base_results = { get_case_key(r): r for r in baseline['results'] }
+    return [ compare_result(base_results.get(get_case_key(r)), r, min_slowdown, max_z, min_mem_growth)
+        for r in report['results'] ]
+
+#
+# One line summary of a comparison
+#
+def format_comparison(comp):
+    label = 'puzzle data' if comp['input'] == 'puzzle' else f"{comp['size']} {comp['unit']}"
+    s = f"Day {comp['day']:2}, part {comp['part']}  {label:28} "
+    if comp['ratio'] == None:
+        return s + comp['verdict']
+
+    s += f"{comp['base_wall']:9.4f}s -> {comp['wall']:9.4f}s  x{comp['ratio']:5.2f}  z={comp['z']:7.1f}  "
+    if comp['base_mem_kb'] != None and comp['mem_kb'] != None:
+        s += f"{comp['base_mem_kb'] / 1024:6.1f} -> {comp['mem_kb'] / 1024:6.1f} MB  "
+    s += comp['verdict']
+    return s
@@ -0,0 +1,218 @@
+"""Advent of Code 2023, binary parse cache
+
+Day scripts that expose a parse function (lines in, rows of ints out) can have
+the parsed rows cached in a compact binary file in an __aoccache__ directory
+next to the input file. Input with no file (generated text, a benchmark case)
+is cached in a directory under the system temp directory instead. The file
+name is keyed by SHA-256 of the input text and the source of the script
+holding the parse function, so editing either one invalidates the entry. On a
+hit the file is memory mapped and rows are unpacked straight from the map,
+with no regex parsing, and the parse function's arguments are never made.
+
+Only the MAX_ENTRIES most recently used files are kept in each cache
+directory; older ones are removed when a new one is written.
+
+A parse function returns a list of equal-length int tuples, or a dict of them
+for more than one table. Entries are returned as Table objects, which iterate
+and index like a list of tuples:
+
+    rows = load(text, mod.parse_bricks, lambda: [ text.splitlines() ], path)
+    for x1, y1, z1, x2, y2, z2 in rows:
+        ...
+
+File layout (little endian): the header, a directory entry for each table,
+then each table's rows as int64, starting on an 8 byte boundary.
+
+Set AOC_PARSE_CACHE=0 in the environment to turn the cache off.
+"""
+
+import os
+import mmap
+import struct
+import hashlib
+import tempfile
+
+from . import instrument
+
+CACHE_DIR = '__aoccache__'
+
+# Cache directory for input that isn't from a file
+TEMP_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'aoc-parse-cache')
+
+# Cache files kept in each directory
+MAX_ENTRIES = 16
+
+# Path of the input file being solved, if there is one, so the cache can go
+# next to it. Set by the runner around each solve.
+input_path = None
+
+HEADER = struct.Struct('<8sI')          # magic, number of tables
+ENTRY = struct.Struct('<16sQQQ')        # table name, rows, columns, data offset
+MAGIC = b'AOCPARS1'
+
+# Name of the table when a parse function returns a single list of rows
+DEFAULT_TABLE = 'rows'
+
+#
+# Rows of int64 records backed by a buffer (normally a memory map)
+#
+class Table:
+    def __init__(self, buf, rows, cols):
+        self.buf, self.rows, self.cols = buf, rows, cols
+        self.row_struct = struct.Struct(f'<{cols}q')
+
+    def __repr__(self):
+        return f"Table({self.rows} rows x {self.cols} cols)"
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        if self.rows == 0 or self.cols == 0:
+            return iter(())
+        return self.row_struct.iter_unpack(self.buf)
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self.rows
+        if idx < 0 or idx >= self.rows:
+            raise IndexError("Table index out of range")
+        return self.row_struct.unpack_from(self.buf, idx * self.row_struct.size)
+
+    def column(self, col):
+        return [ row[col] for row in self ]
+
+    #
+    # Zero-copy 2-D int64 NumPy array of the table. NumPy is only imported
+    # here, so it isn't loaded for scripts that don't use it.
+    #
+    def to_numpy(self):
+        import numpy as np
+        return np.frombuffer(self.buf, dtype='<i8').reshape(self.rows, self.cols)
+
+def is_enabled():
+    return os.environ.get('AOC_PARSE_CACHE', '1') != '0'
+
+#
+# Directory for the cache of an input file, or of input with no file
+#
+def get_dir(path = None):
+    if path == None:
+        return TEMP_CACHE_DIR
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+
+#
+# Cache file path for input text parsed by a parse function
+#
+def get_path(cache_dir, data, parse):
+    name = f"{parse.__module__}.{parse.__name__}"
+    h = hashlib.sha256()
+    h.update(MAGIC)
+    h.update(name.encode())
+    with open(parse.__code__.co_filename, 'rb') as file:
+        h.update(file.read())
+    h.update(data.encode())
+    return os.path.join(cache_dir, f"{name}-{h.hexdigest()}.bin")
+
+#
+# Write tables to a cache file. Written under a temporary name and renamed,
+# so parallel runs never see a partial file.
+#
+def write(path, tables):
+    entries = []
+    offset = HEADER.size + ENTRY.size * len(tables)
+    for name, rows in tables.items():
+        cols = len(rows[0]) if rows else 0
+        if any(len(row) != cols for row in rows):
+            raise ValueError(f"Rows of table '{name}' are not all the same length")
+        entries.append((name, rows, cols, offset))
+        offset += len(rows) * cols * 8
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(entries)))
+        for name, rows, cols, offset in entries:
+            file.write(ENTRY.pack(name.encode(), len(rows), cols, offset))
+        for name, rows, cols, offset in entries:
+            row_struct = struct.Struct(f'<{cols}q')
+            file.write(b''.join(row_struct.pack(*row) for row in rows))
+    os.replace(tmp_path, path)
+
+#
+# Memory map a cache file and return its tables by name
+#
+def read(path):
+    with open(path, 'rb') as file:
+        buf = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    magic, count = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"Not a parse cache file: {path}")
+
+    tables = { }
+    for n in range(count):
+        name, rows, cols, offset = ENTRY.unpack_from(buf, HEADER.size + n * ENTRY.size)
+        name = name.rstrip(b'\0').decode()
+        tables[name] = Table(buf[offset:offset + rows * cols * 8], rows, cols)
+    return tables
+
+#
+# Remove all but the 'keep' most recently used cache files in a directory
+# (a hit updates a file's modification time)
+#
+def evict(cache_dir, keep = MAX_ENTRIES):
+    try:
+        names = [ name for name in os.listdir(cache_dir) if name.endswith('.bin') ]
+    except OSError:
+        return
+
+    paths = [ os.path.join(cache_dir, name) for name in names ]
+    times = { }
+    for path in paths:
+        try:
+            times[path] = os.path.getmtime(path)
+        except OSError:
+            pass
+
+    for path in sorted(times, key=times.get, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+            instrument.count('parse cache evictions')
+        except OSError:
+            pass
+
+#
+# Return the rows parsed from input text, calling parse(*make_args()) only on
+# a cache miss. 'data' is the input text the args are made from, and 'path'
+# the input file it was read from (input_path if not given, and the temp
+# directory is used if there's no file). If the rows can't be stored (not
+# ints, out of int64 range) they are returned as is.
+#
+def load(data, parse, make_args, path = None):
+    if not is_enabled():
+        return parse(*make_args())
+
+    cache_dir = get_dir(path or input_path)
+    cache_path = get_path(cache_dir, data, parse)
+    try:
+        tables = read(cache_path)
+        instrument.count('parse cache hits')
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+    except (OSError, ValueError, struct.error):
+        instrument.count('parse cache misses')
+        parsed = parse(*make_args())
+        tables = parsed if isinstance(parsed, dict) else { DEFAULT_TABLE: parsed }
+        try:
+            write(cache_path, tables)
+            tables = read(cache_path)
+        except (OSError, ValueError, TypeError, struct.error, OverflowError):
+            return parsed
+        evict(cache_dir)
+
+    if len(tables) == 1 and DEFAULT_TABLE in tables:
+        return tables[DEFAULT_TABLE]
+    return tables
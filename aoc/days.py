@@ -0,0 +1,153 @@
+"""Advent of Code 2023, solver registry
+
+Table of every day/part, the script that solves it, and a small adapter that
+feeds the puzzle text to the script's existing entry point (main(), calc(),
+calc_min_heat(), etc.).
+
+Each adapter takes the loaded script module and the puzzle input as a string,
+and returns the answer. Scripts with a parse function get their parsed rows
+through the binary parse cache (see cache.py). Input conversion done here is
+timed as the 'parse' phase when instrumentation is on (see instrument.py).
+
+The line-oriented days can also be solved from a stream (see stream.py). For
+those, 'fold' makes the script's fold object from the loaded module, and 'sep'
+is what separates its records. A solver with a 'mapped' function works from
+the input file given its path, for very large inputs: Days 1 and 3 memory map
+the file, while Days 4 and 5 read and parse it as usual and then solve in
+NumPy batches. It's also given the number of worker processes asked for, or
+None to work in this process.
+"""
+
+import io
+
+from . import cache, instrument
+from .grid import Grid
+
+#
+# Entry for a single day/part solver
+#
+class Solver:
+    def __init__(self, day, part, script, run, fold = None, sep = '\n', mapped = None):
+        self.day = day
+        self.part = part
+        self.script = script
+        self.run = run
+        self.fold = fold
+        self.sep = sep
+        self.mapped = mapped
+
+    def __repr__(self):
+        return f"[Day {self.day}, part {self.part}: {self.script}]"
+
+    def get_key(self):
+        return self.make_key(self.day, self.part)
+
+    @staticmethod
+    def make_key(day, part):
+        return f"{day}-{part}"
+
+# Input as a list of stripped lines
+def strip_lines(data):
+    with instrument.phase('split lines'):
+        return [ line.strip() for line in data.splitlines() ]
+
+# Input as a file object, for scripts that read with readline() or iterate a file
+def as_file(data):
+    return io.StringIO(data)
+
+# Input as a Grid, for the map puzzles
+def as_grid(data):
+    with instrument.phase('parse'):
+        return Grid.from_text(data)
+
+# Scripts where the whole answer comes from main(file)
+def run_main(mod, data):
+    return mod.main(as_file(data))
+
+#
+# Rows from the script's parse function (given stripped lines), through the
+# parse cache. The lines are only split on a cache miss. 'path' is the input
+# file, if it isn't the one the runner is solving.
+#
+def parse_cached(mod, parse, data, path = None):
+    with instrument.phase('parse'):
+        return cache.load(data, getattr(mod, parse), lambda: [ strip_lines(data) ], path)
+
+# Same, for an input file given by its path
+def parse_file_cached(mod, parse, path):
+    with open(path, 'r') as file:
+        return parse_cached(mod, parse, file.read(), path)
+
+SOLVERS = { }
+
+def add(day, part, script, run = run_main, fold = None, sep = '\n', mapped = None):
+    solver = Solver(day, part, script, run, fold, sep, mapped)
+    SOLVERS[solver.get_key()] = solver
+
+add(1, 1, 'Day1/day1.py', lambda mod, data: mod.get_total(strip_lines(data), part=1),
+    fold=lambda mod: mod.Calibration(part=1),
+    mapped=lambda mod, path, jobs: mod.get_total_mapped(path) if jobs == None else mod.get_totals_parallel(path, jobs)[0])
+add(1, 2, 'Day1/day1.py', lambda mod, data: mod.get_total(strip_lines(data), part=2),
+    fold=lambda mod: mod.Calibration(part=2),
+    mapped=lambda mod, path, jobs: mod.get_totals_parallel(path, jobs)[1])
+add(2, 1, 'Day2/day2.py', lambda mod, data: mod.part1(parse_cached(mod, 'parse_games', data)),
+    fold=lambda mod: mod.GameTotals(part=1))
+add(2, 2, 'Day2/day2.py', lambda mod, data: mod.part2(parse_cached(mod, 'parse_games', data)),
+    fold=lambda mod: mod.GameTotals(part=2))
+add(3, 1, 'Day3/day3.py', lambda mod, data: mod.part1(as_grid(data)),
+    fold=lambda mod: mod.SchematicWindow(part=1),
+    mapped=lambda mod, path, jobs: mod.part1_numpy(Grid.from_file(path)))
+add(3, 2, 'Day3/day3.py', lambda mod, data: mod.part2(as_grid(data)),
+    fold=lambda mod: mod.SchematicWindow(part=2))
+add(4, 1, 'Day4/day4.py', lambda mod, data: mod.part1(parse_cached(mod, 'parse_cards', data)),
+    fold=lambda mod: mod.CardTotals(part=1),
+    mapped=lambda mod, path, jobs: mod.part1_batch(parse_file_cached(mod, 'parse_cards', path)))
+add(4, 2, 'Day4/day4.py', lambda mod, data: mod.part2(parse_cached(mod, 'parse_cards', data)),
+    fold=lambda mod: mod.CardTotals(part=2),
+    mapped=lambda mod, path, jobs: mod.part2_batch(parse_file_cached(mod, 'parse_cards', path)))
+add(5, 1, 'Day5/day5_part1.py',
+    mapped=lambda mod, path, jobs: mod.main_batch(path))
+add(5, 2, 'Day5/day5_part2.py', lambda mod, data: mod.get_lowest(parse_cached(mod, 'parse_almanac', data)))
+add(6, 1, 'Day6/day6_part1.py')
+add(6, 2, 'Day6/day6_part2.py')
+add(7, 1, 'Day7/day7.py', lambda mod, data: mod.calc(mod.read_hands(data.splitlines()), jokers=False),
+    fold=lambda mod: mod.Winnings(jokers=False))
+add(7, 2, 'Day7/day7.py', lambda mod, data: mod.calc(mod.read_hands(data.splitlines()), jokers=True),
+    fold=lambda mod: mod.Winnings(jokers=True))
+add(8, 1, 'Day8/day8_part1.py')
+add(8, 2, 'Day8/day8_part2.py', lambda mod, data: mod.get_steps(as_file(data)))
+add(9, 1, 'Day9/day9_part1.py', fold=lambda mod: mod.Extrapolation())
+add(9, 2, 'Day9/day9_part2.py', fold=lambda mod: mod.Extrapolation())
+add(10, 1, 'Day10/day10_part1.py', lambda mod, data: mod.main(as_grid(data)))
+add(10, 2, 'Day10/day10_part2.py', lambda mod, data: mod.main(as_grid(data)))
+add(11, 1, 'Day11/day11.py', lambda mod, data: mod.calc(data.splitlines(), 2))
+add(11, 2, 'Day11/day11.py', lambda mod, data: mod.calc(data.splitlines(), 1_000_000))
+add(12, 1, 'Day12/day12_part1.py', fold=lambda mod: mod.Arrangements())
+add(12, 2, 'Day12/day12_part2.py', fold=lambda mod: mod.Arrangements())
+add(13, 1, 'Day13/day13.py', lambda mod, data: mod.main(strip_lines(data), 1))
+add(13, 2, 'Day13/day13.py', lambda mod, data: mod.main(strip_lines(data), 2))
+add(14, 1, 'Day14/day14_part1.py', lambda mod, data: mod.main(as_grid(data)))
+add(14, 2, 'Day14/day14_part2.py', lambda mod, data: mod.main(as_grid(data)))
+add(15, 1, 'Day15/day15.py', lambda mod, data: mod.part1(as_file(data).readline().rstrip().split(',')),
+    fold=lambda mod: mod.HashTotal(), sep=',')
+add(15, 2, 'Day15/day15.py', lambda mod, data: mod.part2(as_file(data).readline().rstrip().split(',')),
+    fold=lambda mod: mod.LensBoxes(), sep=',')
+add(16, 1, 'Day16/day16.py', lambda mod, data: mod.part1(mod.MirrorGrid(as_grid(data))))
+add(16, 2, 'Day16/day16.py', lambda mod, data: mod.part2(mod.MirrorGrid(as_grid(data))))
+add(17, 1, 'Day17/day17.py', lambda mod, data: mod.HeatMap(as_grid(data)).calc_min_heat(part=1))
+add(17, 2, 'Day17/day17.py', lambda mod, data: mod.HeatMap(as_grid(data)).calc_min_heat(part=2))
+add(18, 1, 'Day18/day18_part1.py')
+add(18, 2, 'Day18/day18_part2.py')
+add(19, 1, 'Day19/day19_part1.py', lambda mod, data: mod.main(parse_cached(mod, 'parse_rules', data)))
+add(19, 2, 'Day19/day19_part2.py', lambda mod, data: mod.main(parse_cached(mod, 'parse_rules', data)))
+add(20, 1, 'Day20/day20_part1.py')
+add(20, 2, 'Day20/day20_part2.py')
+add(21, 1, 'Day21/day21_part1.py', lambda mod, data: mod.main(as_grid(data)))
+add(21, 2, 'Day21/day21_part2.py', lambda mod, data: mod.main(as_grid(data)))
+add(22, 1, 'Day22/day22_part1.py', lambda mod, data: mod.main(parse_cached(mod, 'parse_bricks', data)))
+add(22, 2, 'Day22/day22_part2.py', lambda mod, data: mod.main(parse_cached(mod, 'parse_bricks', data)))
+add(23, 1, 'Day23/day23_part1.py', lambda mod, data: mod.main(as_grid(data)))
+add(23, 2, 'Day23/day23_part2.py', lambda mod, data: mod.main(as_grid(data)))
+add(24, 1, 'Day24/day24_part1.py')
+add(24, 2, 'Day24/day24_part2.py')
+add(25, 1, 'Day25/day25_part1.py')
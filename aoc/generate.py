@@ -0,0 +1,512 @@
+"""Advent of Code 2023, synthetic input generators
+
+Produces valid puzzle input of a chosen size for each day, so the solvers can
+be run across a size sweep rather than only on the fixed puzzle data. The
+meaning of "size" depends on the day (lines, grid width, bricks, etc.), and is
+given by the generator's unit.
+
+Generators are deterministic for a given size and seed.
+"""
+
+import random
+import string
+
+#
+# Entry for a single day's generator
+#
+class Generator:
+    def __init__(self, day, func, unit, sizes):
+        self.day = day
+        self.func = func
+        self.unit = unit
+
+        # Default size sweep for benchmarking
+        self.sizes = sizes
+
+    def __repr__(self):
+        return f"[Day {self.day}: {self.unit}, sizes={self.sizes}]"
+
+GENERATORS = { }
+
+def generator(day, unit, sizes):
+    def register(func):
+        GENERATORS[day] = Generator(day, func, unit, sizes)
+        return func
+    return register
+
+#
+# Generate input text for a day
+#
+def generate(day, size, seed = 0):
+    gen = GENERATORS.get(day)
+    if gen == None:
+        raise KeyError(f"No generator for day {day}")
+    return gen.func(size, random.Random(f"{day}-{size}-{seed}"))
+
+#
+# Make 'count' unique names of 'length' characters, never using any in 'exclude'
+#
+def make_names(rng, count, length, chars = string.ascii_lowercase, exclude = ()):
+    names = set()
+    result = []
+    while len(result) < count:
+        name = ''.join(rng.choice(chars) for _ in range(length))
+        if name not in names and name not in exclude:
+            names.add(name)
+            result.append(name)
+    return result
+
+digit_words = [ 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine' ]
+
+@generator(1, 'lines', [1000, 4000, 16000])
+def gen_day1(size, rng):
+    lines = []
+    for _ in range(size):
+        parts = [ rng.choice(string.digits[1:]) ]
+        for _ in range(rng.randint(2, 8)):
+            n = rng.random()
+            if n < 0.3:
+                parts.append(rng.choice(string.digits[1:]))
+            elif n < 0.6:
+                parts.append(rng.choice(digit_words))
+            else:
+                parts.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 4))))
+        rng.shuffle(parts)
+        lines.append(''.join(parts))
+    return '\n'.join(lines) + '\n'
+
+@generator(2, 'games', [500, 2000, 8000])
+def gen_day2(size, rng):
+    lines = []
+    for game in range(1, size+1):
+        rounds = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample([ 'red', 'green', 'blue' ], rng.randint(1, 3))
+            rounds.append(', '.join(f"{rng.randint(1, 20)} {c}" for c in colors))
+        lines.append(f"Game {game}: {'; '.join(rounds)}")
+    return '\n'.join(lines) + '\n'
+
+@generator(3, 'grid width', [50, 100, 200])
+def gen_day3(size, rng):
+    symbols = '*#+$/@=%-&'
+    grid = [ bytearray(b'.' * size) for _ in range(size) ]
+    for row in grid:
+        col = rng.randint(0, 3)
+        while col < size:
+            if rng.random() < 0.2:
+                row[col] = ord(rng.choice(symbols))
+                col += rng.randint(2, 5)
+                continue
+
+            num = str(rng.randint(1, 999))
+            if col + len(num) > size:
+                break
+            row[col:col+len(num)] = num.encode('ascii')
+            col += len(num) + rng.randint(1, 5)
+    return '\n'.join(row.decode('ascii') for row in grid) + '\n'
+
+@generator(4, 'cards', [200, 800, 3200])
+def gen_day4(size, rng):
+    lines = []
+    for card in range(1, size+1):
+        # Mostly few matches, so the copies of later cards don't grow exponentially
+        num_matches = rng.choices(range(11), weights=(40, 20, 10, 8, 6, 5, 4, 3, 2, 1, 1))[0]
+        numbers = rng.sample(range(1, 100), 35 - num_matches)
+        winning = numbers[:10]
+        chosen = winning[:num_matches] + numbers[10:]
+        rng.shuffle(chosen)
+        lines.append(f"Card {card:>4}: {' '.join(f'{n:2}' for n in winning)} | "
+            f"{' '.join(f'{n:2}' for n in chosen)}")
+    return '\n'.join(lines) + '\n'
+
+categories = [ 'seed', 'soil', 'fertilizer', 'water', 'light', 'temperature', 'humidity', 'location' ]
+
+@generator(5, 'entries per map', [10, 100, 1000])
+def gen_day5(size, rng):
+    max_num = 2**32
+    seeds = []
+    for _ in range(10):
+        start = rng.randrange(max_num // 2)
+        seeds += [ start, rng.randrange(1, max_num // 20) ]
+
+    out = [ f"seeds: {' '.join(map(str, seeds))}", '' ]
+    for idx in range(len(categories)-1):
+        out.append(f"{categories[idx]}-to-{categories[idx+1]} map:")
+
+        # Split the number space into non-overlapping source ranges
+        cuts = sorted(rng.sample(range(1, max_num), size))
+        starts = [ 0 ] + cuts
+        ranges = [ (starts[i], cuts[i] - starts[i]) for i in range(size) ]
+        rng.shuffle(ranges)
+        for src_start, length in ranges:
+            dest_start = rng.randrange(max_num - length)
+            out.append(f"{dest_start} {src_start} {length}")
+        out.append('')
+    return '\n'.join(out)
+
+@generator(6, 'races', [2, 4, 6])
+def gen_day6(size, rng):
+    times = [ rng.randint(64, 99) for _ in range(size) ]
+    dists = [ rng.randint(100, 999) for _ in range(size) ]
+    return (f"Time:     {'  '.join(f'{t:4}' for t in times)}\n"
+        f"Distance: {'  '.join(f'{d:4}' for d in dists)}\n")
+
+@generator(7, 'hands', [1000, 4000, 16000])
+def gen_day7(size, rng):
+    cards = '23456789TJQKA'
+    lines = [ f"{''.join(rng.choice(cards) for _ in range(5))} {rng.randint(1, 1000)}"
+        for _ in range(size) ]
+    return '\n'.join(lines) + '\n'
+
+#
+# Each "ghost" starts on a node ending in A, and walks a ring of nodes that ends
+# on a node ending in Z. Ghost 0 starts at AAA and ends at ZZZ for part 1.
+#
+@generator(8, 'ring length', [1000, 2000, 4000])
+def gen_day8(size, rng):
+    num_ghosts = 6
+    chars = string.ascii_uppercase + string.digits
+    mid_chars = chars.replace('A', '').replace('Z', '')
+    lengths = [ size + 2*n + 1 for n in range(num_ghosts) ]
+
+    # Names for the ring nodes never end in A or Z
+    ring_names = make_names(rng, sum(lengths), 3, mid_chars, exclude=('AAA', 'ZZZ'))
+    end_names = make_names(rng, num_ghosts, 2, mid_chars)
+
+    out = [ ''.join(rng.choice('LR') for _ in range(rng.randint(50, 300))), '' ]
+    for ghost, length in enumerate(lengths):
+        ring = [ ring_names.pop() for _ in range(length-1) ]
+        start = 'AAA' if ghost == 0 else end_names[ghost] + 'A'
+        ring.append('ZZZ' if ghost == 0 else end_names[ghost] + 'Z')
+
+        out.append(f"{start} = ({ring[0]}, {ring[0]})")
+        for idx, node in enumerate(ring):
+            nxt = ring[(idx+1) % length]
+            out.append(f"{node} = ({nxt}, {nxt})")
+    return '\n'.join(out) + '\n'
+
+@generator(9, 'sequences', [200, 800, 3200])
+def gen_day9(size, rng):
+    lines = []
+    for _ in range(size):
+        coeffs = [ rng.randint(-9, 9) for _ in range(rng.randint(1, 6)) ]
+        lines.append(' '.join(str(sum(c * x**p for p, c in enumerate(coeffs))) for x in range(21)))
+    return '\n'.join(lines) + '\n'
+
+#
+# A rectangular loop with S on its top-right corner, with random pipe pieces
+# scattered around it.
+#
+@generator(10, 'grid width', [50, 100, 200])
+def gen_day10(size, rng):
+    grid = [ [ rng.choice('|-LJ7F...') for _ in range(size) ] for _ in range(size) ]
+    top, left, bottom, right = 1, 1, size-2, size-2
+    for col in range(left+1, right):
+        grid[top][col] = grid[bottom][col] = '-'
+    for row in range(top+1, bottom):
+        grid[row][left] = grid[row][right] = '|'
+    grid[top][left], grid[top][right] = 'F', 'S'
+    grid[bottom][left], grid[bottom][right] = 'L', 'J'
+
+    # Nothing connecting to the north or east of the start
+    grid[top-1][right] = grid[top][right+1] = '.'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+@generator(11, 'grid width', [50, 100, 200])
+def gen_day11(size, rng):
+    empty_rows = set(rng.sample(range(size), size // 10))
+    empty_cols = set(rng.sample(range(size), size // 10))
+    lines = []
+    for row in range(size):
+        lines.append(''.join('#' if row not in empty_rows and col not in empty_cols
+            and rng.random() < 0.02 else '.' for col in range(size)))
+    return '\n'.join(lines) + '\n'
+
+@generator(12, 'records', [25, 50, 100])
+def gen_day12(size, rng):
+    lines = []
+    while len(lines) < size:
+        springs = [ rng.choice('#..') for _ in range(rng.randint(8, 20)) ]
+        counts = [ len(run) for run in ''.join(springs).split('.') if run ]
+        if not counts:
+            continue
+
+        # Hide up to 10 of the springs
+        for idx in rng.sample(range(len(springs)), min(10, len(springs) // 2)):
+            springs[idx] = '?'
+        lines.append(f"{''.join(springs)} {','.join(map(str, counts))}")
+    return '\n'.join(lines) + '\n'
+
+#
+# Each map is mirrored around a random row, then rotated half the time so the
+# reflection is a column instead.
+#
+@generator(13, 'maps', [100, 400, 1600])
+def gen_day13(size, rng):
+    maps = []
+    for _ in range(size):
+        num_cols = rng.randint(5, 17)
+        half = [ ''.join(rng.choice('#.') for _ in range(num_cols)) for _ in range(rng.randint(2, 8)) ]
+        extra = [ ''.join(rng.choice('#.') for _ in range(num_cols)) for _ in range(rng.randint(0, 4)) ]
+        cur_map = extra + half + half[::-1]
+        if rng.random() < 0.5:
+            cur_map = [ ''.join(row) for row in zip(*cur_map) ]
+        maps.append('\n'.join(cur_map))
+    return '\n\n'.join(maps) + '\n'
+
+@generator(14, 'grid width', [25, 50, 100])
+def gen_day14(size, rng):
+    lines = [ ''.join(rng.choices('O#.', weights=(15, 10, 75), k=size)) for _ in range(size) ]
+    return '\n'.join(lines) + '\n'
+
+@generator(15, 'steps', [1000, 4000, 16000])
+def gen_day15(size, rng):
+    labels = make_names(rng, max(10, int(size ** 0.5)), 4)
+    steps = []
+    for _ in range(size):
+        label = rng.choice(labels)
+        steps.append(f"{label}-" if rng.random() < 0.3 else f"{label}={rng.randint(1, 9)}")
+    return ','.join(steps) + '\n'
+
+@generator(16, 'grid width', [25, 50, 100])
+def gen_day16(size, rng):
+    lines = [ ''.join(rng.choices('./\\|-', weights=(90, 3, 3, 2, 2), k=size)) for _ in range(size) ]
+    return '\n'.join(lines) + '\n'
+
+@generator(17, 'grid width', [20, 40, 80])
+def gen_day17(size, rng):
+    lines = [ ''.join(rng.choice('123456789') for _ in range(size)) for _ in range(size) ]
+    return '\n'.join(lines) + '\n'
+
+#
+# Dig plan is a "skyline" of columns of random width and height, walked
+# clockwise from the bottom left corner. The color code gives the same shape
+# scaled up, for part 2.
+#
+@generator(18, 'columns', [200, 800, 3200])
+def gen_day18(size, rng):
+    moves = []
+    def add_move(d, steps):
+        if moves and moves[-1][0] == d:
+            moves[-1] = (d, moves[-1][1] + steps)
+        else:
+            moves.append((d, steps))
+
+    cur_height = 0
+    total_width = 0
+    for _ in range(size):
+        height, width = rng.randint(2, 10), rng.randint(2, 6)
+        if height > cur_height:
+            add_move('U', height - cur_height)
+        elif height < cur_height:
+            add_move('D', cur_height - height)
+        add_move('R', width)
+        cur_height = height
+        total_width += width
+
+    add_move('D', cur_height)
+    add_move('L', total_width)
+
+    hex_dirs = { 'R': '0', 'D': '1', 'L': '2', 'U': '3' }
+    lines = [ f"{d} {steps} (#{steps * 37:05x}{hex_dirs[d]})" for d, steps in moves ]
+    return '\n'.join(lines) + '\n'
+
+#
+# Workflows form a tree from 'in'. Each rule splits the range of values that can
+# still reach it, so every rule can both match and not match. Every rule sends
+# to a new workflow until there are 'size' of them, and only the workflows left
+# after that send parts to A or R.
+#
+@generator(19, 'workflows', [200, 800, 3200])
+def gen_day19(size, rng):
+    names = make_names(rng, size, 3, exclude=('in',))
+    names[0] = 'in'
+    flows = { }
+    pending = [ ('in', { a: (1, 4000) for a in 'xmas' }) ]
+    next_name = 1
+
+    def get_target(ranges):
+        nonlocal next_name
+        if next_name < size:
+            name = names[next_name]
+            next_name += 1
+            pending.append((name, ranges))
+            return name
+        return rng.choice('AAR')
+
+    while pending:
+        name, ranges = pending.pop(rng.randrange(len(pending)))
+        rules = []
+        for _ in range(rng.randint(1, 3)):
+            attrs = [ a for a in 'xmas' if ranges[a][1] - ranges[a][0] >= 2 ]
+            if not attrs:
+                break
+            attr = rng.choice(attrs)
+            low, high = ranges[attr]
+            value = round(rng.triangular(low+1, high-1))
+            match, no_match = ranges.copy(), ranges.copy()
+            if rng.random() < 0.5:
+                rules.append(f"{attr}<{value}:{get_target(match)}")
+                match[attr], no_match[attr] = (low, value-1), (value, high)
+            else:
+                rules.append(f"{attr}>{value}:{get_target(match)}")
+                match[attr], no_match[attr] = (value+1, high), (low, value)
+            ranges = no_match
+        rules.append(get_target(ranges))
+        flows[name] = f"{name}{{{','.join(rules)}}}"
+
+    if len(flows) != size:
+        raise Exception(f"Made {len(flows)} workflows, expected {size}")
+
+    out = list(flows.values()) + [ '' ]
+    for _ in range(size * 2):
+        x, m, a, s = (rng.randint(1, 4000) for _ in range(4))
+        out.append(f"{{x={x},m={m},a={a},s={s}}}")
+    return '\n'.join(out) + '\n'
+
+def is_prime(n):
+    return n > 1 and all(n % f for f in range(2, int(n ** 0.5) + 1))
+
+#
+# Four binary counters of 'size' flip-flops, each reset by a conjunction at a
+# prime count. The inverted conjunction outputs feed a final conjunction to rx.
+#
+@generator(20, 'counter bits', [6, 8, 10, 12])
+def gen_day20(size, rng):
+    primes = [ n for n in range(2**(size-1)+1, 2**size, 2) if is_prime(n) ]
+    targets = rng.sample(primes, 4)
+    names = make_names(rng, 4 * (size + 2) + 1, 2, exclude=('rx',))
+    final = names.pop()
+
+    connects = { 'broadcaster': [] }
+    kinds = { 'broadcaster': '' }
+    for target in targets:
+        flops = [ names.pop() for _ in range(size) ]
+        counter, inverter = names.pop(), names.pop()
+        connects['broadcaster'].append(flops[0])
+        kinds[counter] = kinds[inverter] = '&'
+        connects[counter] = [ flops[0] ]
+        connects[inverter] = [ final ]
+        for bit, flop in enumerate(flops):
+            kinds[flop] = '%'
+            connects[flop] = [ flops[bit+1] ] if bit < size-1 else []
+            if target & (1 << bit):
+                connects[flop].append(counter)
+            elif bit > 0:
+                connects[counter].append(flop)
+        connects[counter].append(inverter)
+
+    kinds[final] = '&'
+    connects[final] = [ 'rx' ]
+    lines = [ f"{kinds[name]}{name} -> {', '.join(con)}" for name, con in connects.items() ]
+    rng.shuffle(lines)
+    return '\n'.join(lines) + '\n'
+
+#
+# Odd sized garden with S in the middle, and the middle row, middle column and
+# border clear of rocks, like the puzzle data.
+#
+@generator(21, 'grid width', [33, 65, 131])
+def gen_day21(size, rng):
+    size |= 1
+    mid = size // 2
+    grid = [ [ '#' if rng.random() < 0.1 else '.' for _ in range(size) ] for _ in range(size) ]
+    for idx in range(size):
+        grid[mid][idx] = grid[idx][mid] = '.'
+        grid[0][idx] = grid[size-1][idx] = grid[idx][0] = grid[idx][size-1] = '.'
+    grid[mid][mid] = 'S'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+@generator(22, 'bricks', [100, 200, 400])
+def gen_day22(size, rng):
+    used = set()
+    lines = []
+    max_z = max(10, size // 4)
+    while len(lines) < size:
+        x, y, z = rng.randint(0, 9), rng.randint(0, 9), rng.randint(1, max_z)
+        axis, length = rng.randrange(3), rng.randint(0, 3)
+        end = [ x, y, z ]
+        end[axis] += length
+        if end[0] > 9 or end[1] > 9:
+            continue
+
+        cells = set((x + (axis == 0) * n, y + (axis == 1) * n, z + (axis == 2) * n)
+            for n in range(length+1))
+        if cells & used:
+            continue
+        used |= cells
+        lines.append(f"{x},{y},{z}~{end[0]},{end[1]},{end[2]}")
+    return '\n'.join(lines) + '\n'
+
+#
+# Maze carved with a randomized depth-first-search, then a few extra walls
+# knocked out so there is more than one route through it.
+#
+@generator(23, 'grid width', [21, 41, 61])
+def gen_day23(size, rng):
+    size |= 1
+    grid = [ [ '#' ] * size for _ in range(size) ]
+    grid[1][1] = '.'
+    stack = [ (1, 1) ]
+    while stack:
+        row, col = stack[-1]
+        moves = [ (dr, dc) for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < row+dr < size-1 and 0 < col+dc < size-1 and grid[row+dr][col+dc] == '#' ]
+        if not moves:
+            stack.pop()
+            continue
+        dr, dc = rng.choice(moves)
+        grid[row + dr//2][col + dc//2] = grid[row+dr][col+dc] = '.'
+        stack.append((row+dr, col+dc))
+
+    for _ in range(size // 10):
+        row, col = rng.randrange(1, size-1), rng.randrange(1, size-1)
+        if (row + col) % 2 == 1:
+            grid[row][col] = '.'
+
+    grid[0][1] = grid[size-1][size-2] = '.'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+#
+# Hailstones are all hit by one rock, each at a different integer time.
+# Velocities are kept small so that many pairs share a velocity on an axis.
+#
+@generator(24, 'hailstones', [100, 200, 300])
+def gen_day24(size, rng):
+    rock = [ rng.randint(200_000_000_000_000, 400_000_000_000_000) for _ in range(3) ]
+    rock_v = [ rng.randint(-250, 250) for _ in range(3) ]
+    lines = []
+    for t in rng.sample(range(1, 1_000_000_000_000), size):
+        v = [ rng.choice([ n for n in range(-300, 301) if n != 0 and n != rv ]) for rv in rock_v ]
+        pos = [ rock[i] + t * (rock_v[i] - v[i]) for i in range(3) ]
+        lines.append(f"{pos[0]}, {pos[1]}, {pos[2]} @ {v[0]}, {v[1]}, {v[2]}")
+    return '\n'.join(lines) + '\n'
+
+#
+# Two random clusters of components, joined by exactly three wires
+#
+@generator(25, 'components', [100, 200, 400])
+def gen_day25(size, rng):
+    names = make_names(rng, size, 3)
+    half = size // 2
+    clusters = [ names[:half], names[half:] ]
+    edges = set()
+    for cluster in clusters:
+        for idx, name in enumerate(cluster):
+            # Ring for connectivity, plus random wires
+            edges.add(tuple(sorted((name, cluster[(idx+1) % len(cluster)]))))
+            for rmt in rng.sample(cluster, 3):
+                if rmt != name:
+                    edges.add(tuple(sorted((name, rmt))))
+
+    cut = set()
+    while len(cut) < 3:
+        cut.add(tuple(sorted((rng.choice(clusters[0]), rng.choice(clusters[1])))))
+    edges |= cut
+
+    wires = { }
+    for n1, n2 in sorted(edges):
+        wires.setdefault(n1, []).append(n2)
+    lines = [ f"{name}: {' '.join(rmts)}" for name, rmts in wires.items() ]
+    rng.shuffle(lines)
+    return '\n'.join(lines) + '\n'
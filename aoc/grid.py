@@ -0,0 +1,166 @@
+"""Advent of Code 2023, character grid
+
+A grid of single byte cells kept in one flat buffer, laid out like the input
+file: each row is followed by a newline, so the stride between rows is
+cols + 1 and (row, col) is at index row * stride + col. A grid read from a file
+is memory mapped copy-on-write, so it can be changed without touching the file.
+
+The newline at the end of each row doubles as a border: a step east or west
+off the grid lands on a newline, and a step north or south lands outside the
+buffer, so moving by index only needs one check.
+
+    grid = Grid.from_file('map.dat')
+    start = grid.find('S')
+    for idx in grid.neighbors(start):
+        if grid.buf[idx] != ord('#'):
+            ...
+"""
+
+import mmap
+
+SEP = ord('\n')
+
+# Directions as (row, col) offsets
+N, E, S, W = (-1, 0), (0, 1), (1, 0), (0, -1)
+NE, SE, SW, NW = (-1, 1), (1, 1), (1, -1), (-1, -1)
+DIRS = { 'N': N, 'E': E, 'S': S, 'W': W }
+
+ORTHOGONAL = (N, E, S, W)
+DIAGONAL = (N, NE, E, SE, S, SW, W, NW)
+
+class Grid:
+    def __init__(self, buf, cols, rows = None):
+        self.buf = buf
+        self.cols = cols
+        self.stride = cols + 1
+        self.rows = len(buf) // self.stride if rows == None else rows
+        self.size = self.rows * self.stride
+
+    #
+    # Grid from a list of equal length strings
+    #
+    @classmethod
+    def from_lines(cls, lines):
+        lines = list(lines)
+        if any(len(line) != len(lines[0]) for line in lines):
+            raise Exception("Grid lines are not all the same length")
+        return cls(bytearray(''.join(line + '\n' for line in lines), 'ascii'), len(lines[0]))
+
+    #
+    # Grid from text, one row per line
+    #
+    @classmethod
+    def from_text(cls, text):
+        return cls.from_lines(text.rstrip('\n').split('\n'))
+
+    #
+    # Memory map a grid file, copy-on-write. A file without a newline at the
+    # end is read into memory instead, since the map can't be extended.
+    #
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'rb') as file:
+            buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        # Ignore extra newlines at the end of the file
+        end = len(buf)
+        while end > 0 and buf[end-1] == SEP:
+            end -= 1
+        if end == len(buf):
+            buf = bytearray(buf) + b'\n'
+
+        cols = buf.find(b'\n')
+        return cls(buf, cols, (end + 1) // (cols + 1))
+
+    def __repr__(self):
+        return f"Grid({self.rows} rows x {self.cols} cols)"
+
+    def __str__(self):
+        return '\n'.join(self.get_row(row).decode() for row in range(self.rows))
+
+    def copy(self):
+        return Grid(bytearray(self.buf[:self.size]), self.cols, self.rows)
+
+    def index(self, row, col):
+        return row * self.stride + col
+
+    def coords(self, idx):
+        return divmod(idx, self.stride)
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def get(self, row, col):
+        return self.buf[row * self.stride + col]
+
+    def get_char(self, row, col):
+        return chr(self.buf[row * self.stride + col])
+
+    def set(self, row, col, c):
+        self.buf[row * self.stride + col] = ord(c) if isinstance(c, str) else c
+
+    def get_row(self, row):
+        start = row * self.stride
+        return bytes(self.buf[start:start + self.cols])
+
+    def get_col(self, col):
+        return bytes(self.buf[col:self.size:self.stride])
+
+    # Rows as a list of bytes
+    def get_rows(self):
+        return [ self.get_row(row) for row in range(self.rows) ]
+
+    #
+    # Indexes of every cell, in row order
+    #
+    def indexes(self):
+        for start in range(0, self.size, self.stride):
+            yield from range(start, start + self.cols)
+
+    #
+    # Index of the first cell holding character c, or None
+    #
+    def find(self, c):
+        idx = self.buf.find(c.encode() if isinstance(c, str) else c)
+        return idx if 0 <= idx < self.size else None
+
+    #
+    # Index offset for a (row, col) direction
+    #
+    def offset(self, d):
+        return d[0] * self.stride + d[1]
+
+    #
+    # Index one step in direction d, or None if off the grid
+    #
+    def move(self, idx, d):
+        idx += d[0] * self.stride + d[1]
+        if 0 <= idx < self.size and self.buf[idx] != SEP:
+            return idx
+        return None
+
+    #
+    # Indexes of the neighbors of a cell that are on the grid, in N, E, S, W
+    # order, or clockwise from N including diagonals
+    #
+    def neighbors(self, idx, diagonal = False):
+        buf, size = self.buf, self.size
+        for d in (DIAGONAL if diagonal else ORTHOGONAL):
+            n = idx + d[0] * self.stride + d[1]
+            if 0 <= n < size and buf[n] != SEP:
+                yield n
+
+    #
+    # Grid with rows and columns swapped
+    #
+    def transpose(self):
+        return Grid(bytearray(b''.join(self.get_col(col) + b'\n' for col in range(self.cols))), self.rows, self.cols)
+
+    #
+    # NumPy uint8 array of the cells, shape (rows, cols). A view of the buffer
+    # (without the newline column), so changes to either show in both.
+    #
+    def to_numpy(self):
+        import numpy as np
+        a = np.frombuffer(self.buf, dtype=np.uint8, count=self.size)
+        return a.reshape(self.rows, self.stride)[:, :self.cols]
@@ -0,0 +1,305 @@
+"""Advent of Code 2023, per-phase timers and counters
+
+Day scripts mark their phases (parse, build, solve...) with timers and bump
+named counters (heap pushes, cache hits, nodes expanded...). Both do nothing
+unless instrumentation is on, so they can stay in the scripts:
+
+    from aoc import instrument
+
+    with instrument.phase('build'):
+        graph = build_graph(bricks)
+    instrument.count('nodes expanded', num_expanded)
+
+Counters in hot loops should be kept in a local and counted once at the end,
+rather than calling count() for every step.
+
+Turn it on with enable(), or AOC_INSTRUMENT=1 in the environment (which worker
+processes inherit). The recorded phases and counters can be summarized with
+get_report(), and written as Chrome trace events (load the file in
+chrome://tracing or ui.perfetto.dev) for a timeline of the phases.
+
+Memory profiling (enable_memory(), or AOC_MEM_PROFILE=1) also traces Python
+allocations with tracemalloc. Each phase then records the most memory it had
+allocated at once, above what was in use when it started, the peak RSS of the
+process by its end, and the lines that allocated the most memory during the
+phase that was still held at its end. Finding those sites takes a snapshot of
+the whole heap before and after the phase, so only the first few calls of
+each phase are looked at. Tracing slows everything down, so times taken with
+memory profiling on aren't comparable with ones taken without it.
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import contextlib
+import tracemalloc
+
+enabled = os.environ.get('AOC_INSTRUMENT', '0') != '0'
+memory = os.environ.get('AOC_MEM_PROFILE', '0') != '0'
+
+# Finished phases as (name, start ns, end ns, nesting depth, memory stats or
+# None), in the order they ended
+phases = []
+counters = { }
+depth = 0
+
+# Phases open while memory profiling, innermost last
+open_phases = []
+
+# Snapshots taken of each phase name so far
+num_snapshots = { }
+
+# Calls of a phase name that get allocation sites, stack frames kept for each
+# allocation, and allocation sites listed per phase
+MAX_SNAPSHOTS = 3
+TRACE_FRAMES = 1
+TOP_SITES = 5
+
+# Allocations that are the profiler's or the import machinery's, not the solver's
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+# Allocation sites are shown relative to the top of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Context manager used when instrumentation is off
+NULL_PHASE = contextlib.nullcontext()
+
+def enable():
+    global enabled
+    enabled = True
+    os.environ['AOC_INSTRUMENT'] = '1'
+
+def disable():
+    global enabled, memory
+    enabled = memory = False
+    os.environ['AOC_INSTRUMENT'] = '0'
+    os.environ['AOC_MEM_PROFILE'] = '0'
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+#
+# Turn on memory profiling, along with the timers and counters
+#
+def enable_memory():
+    global memory
+    enable()
+    memory = True
+    os.environ['AOC_MEM_PROFILE'] = '1'
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+
+        # Match each filter once, so compiling their patterns doesn't show up
+        # as the first phase's allocations
+        for f in SNAPSHOT_FILTERS:
+            fnmatch.fnmatch(__file__, f.filename_pattern)
+
+#
+# Forget everything recorded so far
+#
+def reset():
+    global depth
+    phases.clear()
+    counters.clear()
+    open_phases.clear()
+    num_snapshots.clear()
+    depth = 0
+
+#
+# Timer for one phase of a run. Phases can nest.
+#
+class Phase:
+    def __init__(self, name):
+        self.name = name
+        self.start = 0
+        self.depth = 0
+        self.base = 0
+        self.peak = 0
+        self.snapshot = None
+
+    def __repr__(self):
+        return f"Phase({self.name})"
+
+    def __enter__(self):
+        global depth
+        self.depth = depth
+        depth += 1
+        if memory:
+            self.start_memory()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        global depth
+        end = time.perf_counter_ns()
+        depth -= 1
+        mem = self.end_memory() if memory else None
+        phases.append((self.name, self.start, end, self.depth, mem))
+        return False
+
+    #
+    # tracemalloc has a single peak, so it's reset for each phase, and the
+    # phase hands its peak up to the enclosing one when it ends
+    #
+    def start_memory(self):
+        n = num_snapshots.get(self.name, 0)
+        if n < MAX_SNAPSHOTS:
+            num_snapshots[self.name] = n + 1
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+        if open_phases:
+            parent = open_phases[-1]
+            parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self.base = self.peak = tracemalloc.get_traced_memory()[0]
+        open_phases.append(self)
+
+    def end_memory(self):
+        open_phases.pop()
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        if open_phases:
+            parent = open_phases[-1]
+            parent.peak = max(parent.peak, self.peak)
+
+        sites = []
+        if self.snapshot != None:
+            snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            for stat in snapshot.compare_to(self.snapshot, 'lineno')[:TOP_SITES]:
+                if stat.size_diff > 0:
+                    frame = stat.traceback[0]
+                    sites.append((f"{get_site_path(frame.filename)}:{frame.lineno}",
+                        stat.size_diff, stat.count_diff))
+            self.snapshot = None
+
+        return { 'peak_kb': (self.peak - self.base) / 1024,
+            'rss_kb': get_peak_rss_kb(), 'sites': sites }
+
+#
+# Peak RSS of the process so far in KB, or None where there's no resource
+# module (Windows). It's only imported here, so the scripts that import this
+# module stay portable. ru_maxrss is in bytes on macOS, KB elsewhere.
+#
+def get_peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == 'darwin' else rss
+
+# Path of an allocation site, relative to the repository if it's in it
+def get_site_path(path):
+    if path.startswith(ROOT + os.sep):
+        return os.path.relpath(path, ROOT)
+    return path
+
+def phase(name):
+    return Phase(name) if enabled else NULL_PHASE
+
+def count(name, n = 1):
+    if enabled:
+        counters[name] = counters.get(name, 0) + n
+
+#
+# Summary of the recorded phases and counters. Phases with the same name are
+# added together, and listed in the order they started. With memory profiling,
+# each phase also has its largest peak and RSS over its calls, and its top
+# allocation sites with their sizes added up over the calls that had them.
+#
+def get_report():
+    report_phases = { }
+    phase_sites = { }
+    for name, start, end, d, mem in sorted(phases, key=lambda p: p[1]):
+        entry = report_phases.get(name)
+        if entry == None:
+            entry = report_phases[name] = { 'depth': d, 'calls': 0, 'seconds': 0.0 }
+        entry['calls'] += 1
+        entry['seconds'] += (end - start) / 1e9
+
+        if mem != None:
+            entry['peak_kb'] = max(entry.get('peak_kb', 0), mem['peak_kb'])
+            if mem['rss_kb'] == None:
+                entry.setdefault('rss_kb', None)
+            else:
+                entry['rss_kb'] = max(entry.get('rss_kb') or 0, mem['rss_kb'])
+            sites = phase_sites.setdefault(name, { })
+            for site, size, count in mem['sites']:
+                total = sites.setdefault(site, [0, 0])
+                total[0] += size
+                total[1] += count
+
+    for name, entry in report_phases.items():
+        entry['seconds'] = round(entry['seconds'], 6)
+        if 'peak_kb' in entry:
+            entry['peak_kb'] = round(entry['peak_kb'], 1)
+            sites = sorted(phase_sites[name].items(), key=lambda s: s[1][0], reverse=True)[:TOP_SITES]
+            entry['sites'] = [ { 'site': site, 'kb': round(size / 1024, 1), 'blocks': count }
+                for site, (size, count) in sites ]
+    return { 'phases': report_phases, 'counters': dict(counters) }
+
+def format_report(report):
+    lines = []
+    for name, entry in report['phases'].items():
+        label = '  ' * entry['depth'] + name
+        calls = f" x{entry['calls']}" if entry['calls'] > 1 else ''
+        if 'peak_kb' not in entry:
+            lines.append(f"  {label:30} {entry['seconds']:10.4f}s{calls}")
+            continue
+
+        rss = '' if entry['rss_kb'] == None else f"  RSS {entry['rss_kb'] / 1024:8.1f} MB"
+        lines.append(f"  {label:30} {entry['seconds']:10.4f}s  "
+            f"peak {entry['peak_kb'] / 1024:8.1f} MB{rss}{calls}")
+        for site in entry['sites']:
+            lines.append(f"  {'  ' * entry['depth']}    {site['kb']:10,.1f} KB {site['blocks']:9,} blocks  {site['site']}")
+    for name, n in report['counters'].items():
+        lines.append(f"  {name:30} {n:11,}")
+    return '\n'.join(lines)
+
+#
+# Recorded phases as Chrome trace events, one complete ('X') event per phase,
+# plus a counter ('C') event for each counter at the end of the run. With
+# memory profiling, each phase also gets a 'memory' counter event at its end,
+# with its peak and the RSS. Times are in microseconds. 'pid' and 'tid' place the run in the timeline, and
+# 'label' names its row.
+#
+def get_trace_events(pid = 0, tid = 0, label = None):
+    events = []
+    if label != None:
+        events.append({ 'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+            'args': { 'name': label } })
+
+    end_ts = 0
+    for name, start, end, d, mem in phases:
+        events.append({ 'name': name, 'cat': 'phase', 'ph': 'X', 'pid': pid, 'tid': tid,
+            'ts': start / 1000, 'dur': (end - start) / 1000 })
+        if mem != None:
+            args = { 'peak MB': round(mem['peak_kb'] / 1024, 3) }
+            if mem['rss_kb'] != None:
+                args['RSS MB'] = round(mem['rss_kb'] / 1024, 3)
+            events.append({ 'name': 'memory', 'cat': 'memory', 'ph': 'C', 'pid': pid, 'tid': tid,
+                'ts': end / 1000, 'args': args })
+        end_ts = max(end_ts, end / 1000)
+
+    for name, n in counters.items():
+        events.append({ 'name': name, 'cat': 'counter', 'ph': 'C', 'pid': pid, 'tid': tid,
+            'ts': end_ts, 'args': { name: n } })
+    return events
+
+def save_report(report, path):
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+
+def save_trace(events, path):
+    with open(path, 'w') as file:
+        json.dump({ 'traceEvents': events, 'displayTimeUnit': 'ms' }, file)
+
+# Worker processes inherit memory profiling through the environment
+if memory:
+    enable_memory()
@@ -0,0 +1,140 @@
+"""Advent of Code 2023, run all solvers on a process pool
+
+Solvers are submitted longest-expected-first, using the elapsed times recorded
+by earlier runs, so the slow days start right away instead of being left for
+the end. Solvers without a recorded time go first since they might be slow.
+Each solver runs in its own process under a time limit.
+
+A day whose answer is a sum over independent lines can also split one large
+input file into newline-aligned byte ranges, and score them on a pool with
+map_file_ranges().
+"""
+
+import os
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import runner, instrument
+
+# Elapsed time of each solver from the last run, used to order the next one
+TIMINGS_PATH = os.path.join(runner.ROOT, 'benchmarks', 'timings.json')
+
+# Seconds allowed per solver unless given
+DEFAULT_TIMEOUT = 300
+
+#
+# Solve one day/part on its puzzle data. Runs in a worker process. With
+# instrumentation on, the result includes its phase report and trace events.
+#
+def run_task(day, part, timeout):
+    result = { 'day': day, 'part': part, 'status': 'ok', 'answer': None }
+    start = time.perf_counter()
+    instrument.reset()
+    try:
+        path = runner.get_input_path(day, part)
+        data = runner.read_input(day, part, path)
+        start = time.perf_counter()
+        with runner.time_limit(timeout):
+            result['answer'] = runner.solve(day, part, data, path=path)
+    except TimeoutError:
+        result['status'] = 'timeout'
+    except (Exception, SystemExit) as e:
+        # SystemExit too, so a solver calling exit() can't take the pool down
+        result['status'] = f"error: {type(e).__name__}: {e}"
+
+    result['elapsed'] = time.perf_counter() - start
+    if instrument.enabled:
+        result['instrument'] = instrument.get_report()
+        result['trace'] = instrument.get_trace_events(os.getpid(), 0, f"Day {day} part {part}")
+    return result
+
+def load_timings(path = TIMINGS_PATH):
+    if not os.path.exists(path):
+        return { }
+    with open(path, 'r') as file:
+        return json.load(file)
+
+#
+# Merge new elapsed times into the timings file. Timeouts are recorded too, so
+# they are scheduled first next time.
+#
+def save_timings(results, path = TIMINGS_PATH):
+    timings = load_timings(path)
+    for r in results:
+        if r['status'] in ('ok', 'timeout'):
+            timings[runner.Solver.make_key(r['day'], r['part'])] = round(r['elapsed'], 4)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(timings, file, indent=2, sort_keys=True)
+
+#
+# Order solvers longest-expected-first, unknown ones before all others
+#
+def schedule(solvers, timings):
+    def expected(solver):
+        t = timings.get(solver.get_key())
+        return (t != None, -(t or 0))
+
+    return sorted(solvers, key=expected)
+
+#
+# Run solvers on a pool of 'jobs' processes. Calls report(result) as each one
+# finishes, and returns the results in day/part order.
+#
+def run_all(solvers = None, jobs = None, timeout = DEFAULT_TIMEOUT, report = None):
+    if solvers == None:
+        solvers = runner.all_solvers()
+    solvers = schedule(solvers, load_timings())
+
+    # A fresh process for each solver, so one can't leave state or memory behind for the next
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1,
+            mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [ executor.submit(run_task, s.day, s.part, timeout) for s in solvers ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if report != None:
+                report(result)
+
+    save_timings(results)
+    return sorted(results, key=lambda r: (r['day'], r['part']))
+
+#
+# Split a file into about 'count' byte ranges (start, end) of whole lines. Each
+# range ends just after a newline, or at the end of the file.
+#
+def split_file(path, count):
+    size = os.path.getsize(path)
+    bounds = [ 0 ]
+    with open(path, 'rb') as file:
+        for n in range(1, count):
+            pos = max(size * n // count, bounds[-1])
+            if pos >= size:
+                break
+            file.seek(pos)
+            file.readline()
+            if file.tell() < size and file.tell() > bounds[-1]:
+                bounds.append(file.tell())
+
+    bounds.append(size)
+    return [ (start, end) for start, end in zip(bounds, bounds[1:]) if end > start ]
+
+def run_range_task(script, func_name, path, start, end):
+    return getattr(runner.load_module(script), func_name)(path, start, end)
+
+#
+# Call func_name(path, start, end) from a day script on newline-aligned byte
+# ranges of a file, in a pool of 'jobs' processes (defaults to the CPU count),
+# and return the results in file order. The file is split into a few ranges
+# per job, so a slow range doesn't hold up the rest.
+#
+def map_file_ranges(script, func_name, path, jobs = None, ranges_per_job = 4):
+    jobs = jobs or os.cpu_count()
+    ranges = split_file(path, jobs * ranges_per_job)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [ executor.submit(run_range_task, script, func_name, path, start, end) for start, end in ranges ]
+        return [ future.result() for future in futures ]
@@ -0,0 +1,137 @@
+"""Advent of Code 2023, shortest path searches
+
+Searches over integer state ids 0..num_states-1, with distances kept in an
+array('i') table instead of on node objects. A state is whatever the puzzle
+needs it to be: a grid index, or a grid index plus direction and step count
+packed together with a StateEncoder.
+
+Each search takes the starting states as (state, distance) pairs and a
+function giving the moves out of a state, and returns the distance table, with
+INF for states never reached:
+
+    bfs(num_states, starts, neighbors)          neighbors(state) -> states
+    dial(num_states, starts, edges, max_weight) edges(state) -> (state, weight)
+
+Dial's algorithm is Dijkstra with a ring of max_weight+1 buckets in place of
+the heap, for small integer weights. A 'stop' function can be given to end
+the search when a state is settled (its distance is final).
+
+Each search counts the states it settled and the queue pushes it made (see
+instrument.py).
+"""
+
+from array import array
+from collections import deque
+
+from . import instrument
+
+# Distance of a state not reached
+INF = 0x7fffffff
+
+#
+# Pack tuples of small non-negative ints into one state id, mixed radix, with
+# the first field most significant. strides[i] is what one step of field i
+# adds to the state, so a search loop can pick out just the fields it needs as
+# state // strides[i] % sizes[i].
+#
+class StateEncoder:
+    def __init__(self, *sizes):
+        self.sizes = sizes
+        strides = [ 1 ]
+        for n in reversed(sizes[1:]):
+            strides.append(strides[-1] * n)
+        self.strides = tuple(reversed(strides))
+        self.size = self.strides[0] * sizes[0]
+
+    def __repr__(self):
+        return f"StateEncoder{self.sizes}"
+
+    def encode(self, *fields):
+        state = 0
+        for n, size in zip(fields, self.sizes):
+            state = state * size + n
+        return state
+
+    def decode(self, state):
+        return tuple([ state // stride % size for stride, size in zip(self.strides, self.sizes) ])
+
+def new_table(num_states):
+    return array('i', [INF]) * num_states
+
+def count_search(settled, pushes):
+    instrument.count('states settled', settled)
+    instrument.count('queue pushes', pushes)
+
+#
+# Breadth-first search, every move costing 1. Start distances should all be
+# the same. States further than max_dist are not reached.
+#
+def bfs(num_states, starts, neighbors, max_dist = None, stop = None):
+    dist = new_table(num_states)
+    q = deque()
+    for state, d in starts:
+        dist[state] = d
+        q.append(state)
+
+    settled = 0
+    while q:
+        state = q.popleft()
+        settled += 1
+        if stop != None and stop(state):
+            break
+
+        new_dist = dist[state] + 1
+        if max_dist != None and new_dist > max_dist:
+            break
+
+        for next_state in neighbors(state):
+            if dist[next_state] == INF:
+                dist[next_state] = new_dist
+                q.append(next_state)
+
+    count_search(settled, settled + len(q))
+    return dist
+
+#
+# Dial's algorithm, for integer weights 0..max_weight. States waiting to be
+# settled are never more than max_weight apart, so a ring of max_weight+1
+# buckets indexed by distance works as the priority queue. Start distances
+# must be within max_weight of each other.
+#
+def dial(num_states, starts, edges, max_weight, stop = None):
+    dist = new_table(num_states)
+    num_buckets = max_weight + 1
+    buckets = [ [] for _ in range(num_buckets) ]
+    pending = 0
+    for state, d in starts:
+        if d < dist[state]:
+            dist[state] = d
+            buckets[d % num_buckets].append(state)
+            pending += 1
+
+    settled = pushes = 0
+    cur_dist = min((d for _, d in starts), default=0)
+    while pending:
+        bucket = buckets[cur_dist % num_buckets]
+        while bucket:
+            state = bucket.pop()
+            pending -= 1
+            if dist[state] != cur_dist:
+                continue                # Stale entry, state was reached cheaper
+            settled += 1
+            if stop != None and stop(state):
+                count_search(settled, pushes)
+                return dist
+
+            for next_state, weight in edges(state):
+                new_dist = cur_dist + weight
+                if new_dist < dist[next_state]:
+                    dist[next_state] = new_dist
+                    buckets[new_dist % num_buckets].append(next_state)
+                    pending += 1
+                    pushes += 1
+
+        cur_dist += 1
+
+    count_search(settled, pushes)
+    return dist
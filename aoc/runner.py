@@ -0,0 +1,172 @@
+"""Advent of Code 2023, solver runner
+
+Loads the day scripts as modules (once per process) and runs them through the
+solver registry, so a solver can be imported, timed, or called repeatedly
+without starting a new interpreter or re-opening its input.
+"""
+
+import os
+import time
+import signal
+import contextlib
+import importlib.util
+
+from . import cache, instrument, stream
+from .days import SOLVERS, Solver
+
+# Top of the repository, where the DayN directories live
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded day scripts, keyed by script path
+modules = { }
+
+#
+# Get solver for a day/part, raising a KeyError with a readable message if none
+#
+def get_solver(day, part):
+    solver = SOLVERS.get(Solver.make_key(day, part))
+    if solver == None:
+        raise KeyError(f"No solver for day {day}, part {part}")
+    return solver
+
+#
+# List of all solvers, in day/part order
+#
+def all_solvers():
+    return sorted(SOLVERS.values(), key=lambda s: (s.day, s.part))
+
+#
+# Parts available for a day
+#
+def get_parts(day):
+    return [ s.part for s in all_solvers() if s.day == day ]
+
+#
+# Load a day script as a module. The scripts only run their solve under
+# __main__, so importing them has no side effects.
+#
+def load_module(script):
+    mod = modules.get(script)
+    if mod != None:
+        return mod
+
+    path = os.path.join(ROOT, script)
+    name = os.path.splitext(os.path.basename(script))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    modules[script] = mod
+    return mod
+
+#
+# Figure out the input file path. With no path, use the full puzzle data named
+# by the script's 'fn'. A relative path that doesn't exist from the current
+# directory is looked up in the day's directory.
+#
+def get_input_path(day, part, path = None):
+    solver = get_solver(day, part)
+    day_dir = os.path.join(ROOT, os.path.dirname(solver.script))
+    if path == None:
+        path = load_module(solver.script).fn
+
+    if os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.join(day_dir, path)
+
+#
+# Read puzzle input as text
+#
+def read_input(day, part, path = None):
+    with open(get_input_path(day, part, path), 'r') as file:
+        return file.read()
+
+#
+# Call a solve function, discarding debug output from the scripts unless
+# verbose is set. The call is timed as the 'total' phase when instrumentation
+# is on.
+#
+def call_solver(solve_func, verbose = False):
+    if verbose:
+        with instrument.phase('total'):
+            return solve_func()
+
+    with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null), instrument.phase('total'):
+        return solve_func()
+
+#
+# Solve a day/part for the given puzzle text and return the answer. 'path' is
+# the file the text was read from, if any, so the parse cache can go next to
+# it (see cache.py).
+#
+def solve(day, part, data, verbose = False, path = None):
+    solver = get_solver(day, part)
+    mod = load_module(solver.script)
+    cache.input_path = path
+    try:
+        return call_solver(lambda: solver.run(mod, data), verbose)
+    finally:
+        cache.input_path = None
+
+#
+# Solve parts of a day from a stream (stdin, a pipe, or any file object), read
+# in chunks and folded in a record at a time, so memory stays bounded however
+# long the input is. All the parts are solved in one pass. If 'every' is
+# given, report(count, partial answers) is called after every that many
+# records. Returns the answers, one per part.
+#
+def solve_stream(day, parts, file, chunk_size = stream.CHUNK_SIZE, every = None, report = None, verbose = False):
+    solvers = [ get_solver(day, part) for part in parts ]
+    for solver in solvers:
+        if solver.fold == None:
+            raise KeyError(f"No streaming mode for day {day}, part {solver.part}")
+
+    folders = [ solver.fold(load_module(solver.script)) for solver in solvers ]
+    records = stream.iter_records(file, solvers[0].sep, chunk_size)
+    return call_solver(lambda: stream.fold_all(folders, records, every, report), verbose)
+
+#
+# Solve a day/part from its input file with the solver's large input mode
+# (memory mapped or NumPy batches, see days.py), for the solvers that have one. Those that can split the work use 'jobs' worker
+# processes. Returns the answer and elapsed seconds.
+#
+def run_mapped(day, part, path = None, verbose = False, jobs = None):
+    solver = get_solver(day, part)
+    if solver.mapped == None:
+        raise KeyError(f"No large input (--mapped) mode for day {day}, part {part}")
+
+    mod = load_module(solver.script)
+    path = get_input_path(day, part, path)
+    start = time.perf_counter()
+    answer = call_solver(lambda: solver.mapped(mod, path, jobs), verbose)
+    return answer, time.perf_counter() - start
+
+#
+# Read input and solve, returning the answer and elapsed seconds of the solve
+#
+def run(day, part, path = None, verbose = False):
+    path = get_input_path(day, part, path)
+    data = read_input(day, part, path)
+    start = time.perf_counter()
+    answer = solve(day, part, data, verbose, path)
+    return answer, time.perf_counter() - start
+
+#
+# Raise TimeoutError if the body runs longer than 'seconds'. Uses SIGALRM, so
+# only works in the main thread of a process. No limit if seconds is None or 0.
+#
+@contextlib.contextmanager
+def time_limit(seconds):
+    if not seconds:
+        yield
+        return
+
+    def expired(signum, frame):
+        raise TimeoutError(f"Timed out after {seconds}s")
+
+    old_handler = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
@@ -0,0 +1,73 @@
+"""Advent of Code 2023, streaming input
+
+For the line-oriented days, the answer can be folded up one record at a time,
+so input of any size (stdin, a pipe, or a huge file) runs in bounded memory.
+Input is read in fixed-size chunks and split into records (lines, or the comma
+separated steps of Day 15), and each record is added to a fold object:
+
+    class Calibration:
+        def add(self, line): ...        # fold in one record
+        def result(self): ...           # answer so far
+
+    total = fold(Calibration(part=1), iter_records(sys.stdin))
+
+fold() can report the partial answer every so many records, for long streams,
+and fold_all() runs several fold objects (both parts) over one pass of the input.
+"""
+
+# Characters read from the input at a time
+CHUNK_SIZE = 1 << 20
+
+#
+# Read a file object in chunks of 'size' characters (or bytes)
+#
+def read_chunks(file, size = CHUNK_SIZE):
+    while True:
+        chunk = file.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+#
+# Split a file object into records ending with 'sep', reading it in chunks.
+# Only one chunk and the partial record carried over from the last one are held
+# at a time. Newlines are stripped from the ends of each record, and empty
+# records are skipped.
+#
+def iter_records(file, sep = '\n', chunk_size = CHUNK_SIZE):
+    rest = ''
+    for chunk in read_chunks(file, chunk_size):
+        records = (rest + chunk).split(sep)
+        rest = records.pop()
+        for record in records:
+            record = record.strip('\r\n')
+            if record:
+                yield record
+
+    rest = rest.strip('\r\n')
+    if rest:
+        yield rest
+
+#
+# Add every record to the fold object and return its result. If 'every' is
+# given, report(count, partial result) is called after every that many records.
+#
+def fold(folder, records, every = None, report = None):
+    return fold_all([ folder ], records, every,
+        None if report == None else lambda count, results: report(count, results[0]))[0]
+
+#
+# Same as fold(), for several fold objects taking the same records, such as
+# both parts of a day. The stream is only read once. Results are returned (and
+# reported) as a list.
+#
+def fold_all(folders, records, every = None, report = None):
+    count = 0
+    for record in records:
+        for folder in folders:
+            folder.add(record)
+        count += 1
+        if every and count % every == 0 and report != None:
+            report(count, [ folder.result() for folder in folders ])
+
+    return [ folder.result() for folder in folders ]